@@ -3,7 +3,6 @@ import sys
 import os
 from dotenv import load_dotenv
 from typing import Literal
-from langgraph.graph import StateGraph, END
 from pathlib import Path
 
 # Charger les variables d'environnement
@@ -15,6 +14,12 @@ from src.state import AgentState
 from src.agents.auditor import auditor_agent
 from src.agents.fixer import fixer_agent
 from src.agents.judge import judge_agent
+from src.utils.logger import export_experiment_data
+from src.utils.file_status import initial_file_status, files_to_fix
+from src.utils.workspace import exclude_patterns
+from src.tools.discovery import discover_python_files
+from src.utils.incremental import select_changed_files
+from src.utils.checkpoint import checkpoint_store, with_checkpoint
 
 
 def should_continue(state: AgentState) -> Literal["continue", "end"]:
@@ -52,7 +57,7 @@ def should_continue(state: AgentState) -> Literal["continue", "end"]:
     # Continuer la boucle
     return "continue"
 
-def build_workflow() -> StateGraph:
+def build_workflow(entry_point: str = "auditor", checkpoint: tuple = None) -> "StateGraph":
     """
     Construit le graphe d'exécution des agents.
     
@@ -60,13 +65,29 @@ def build_workflow() -> StateGraph:
     Auditeur → Correcteur → Juge
                     ↑         ↓
                     └─────────┘ (si échec, reboucle)
+    
+    Args:
+        entry_point: Nœud de départ ("auditor", ou "fixer"/"judge" en reprise)
+        checkpoint: (CheckpointStore, run_id) pour persister l'état après chaque nœud
     """
+    # Import différé : langgraph n'est pas chargé par les commandes qui n'exécutent pas le graphe
+    from langgraph.graph import StateGraph, END
+    
     workflow = StateGraph(AgentState)
     
+    nodes = {
+        "auditor": auditor_agent,
+        "fixer": fixer_agent,
+        "judge": judge_agent,
+    }
+    if checkpoint is not None:
+        store, run_id = checkpoint
+        nodes = {name: with_checkpoint(name, fn, store, run_id) for name, fn in nodes.items()}
+    
     # Ajouter les nœuds (agents)
-    workflow.add_node("auditor", auditor_agent)
-    workflow.add_node("fixer", fixer_agent)
-    workflow.add_node("judge", judge_agent)
+    workflow.add_node("auditor", nodes["auditor"])
+    workflow.add_node("fixer", nodes["fixer"])
+    workflow.add_node("judge", nodes["judge"])
     
     # Définir le flux
     workflow.add_edge("auditor", "fixer")   # Auditeur → Correcteur
@@ -83,95 +104,855 @@ def build_workflow() -> StateGraph:
     )
     
     # Définir le point d'entrée
-    workflow.set_entry_point("auditor")
+    workflow.set_entry_point(entry_point)
     
     return workflow
 
 
-def initialize_state(target_dir: str) -> AgentState:
+def next_node_after(last_node: str, state: AgentState):
+    """
+    Nœud à exécuter lors d'une reprise, d'après le dernier nœud terminé.
+    
+    Returns:
+        Nom du nœud, ou None si l'exécution était déjà terminée
+    """
+    if last_node == "auditor":
+        return "fixer"
+    if last_node == "fixer":
+        return "judge"
+    return "fixer" if should_continue(state) == "continue" else None
+
+
+def initialize_state(target_dir: str, fixer_workers: int = None) -> AgentState:
     """
     Crée l'état initial pour le workflow.
+    
+    Args:
+        target_dir: Dossier contenant le code à refactorer
+        fixer_workers: Nombre de fichiers corrigés en parallèle (None = config)
     """
-    # Trouver tous les fichiers Python dans le dossier cible
-    python_files = []
-    for root, dirs, files in os.walk(target_dir):
-        for file in files:
-            if file.endswith('.py'):
-                
-                full_path = os.path.join(root, file)
-                rel_path = os.path.relpath(full_path, start=target_dir)                    
-                python_files.append(rel_path)
-                
+    # Trouver tous les fichiers Python dans le dossier cible (scandir avec élagage,
+    # .gitignore respecté), sans nos propres artefacts ni caches/environnements virtuels
+    python_files = discover_python_files(target_dir, exclude_patterns(target_dir))
     
     return {
         "target_dir": target_dir,
         "python_files": python_files,
+        "context_files": None,
         "current_file": None,
         "audit_report": None,
         "issues_found": [],
+        "issue_store": None,
         "pylint_score_before": None,
         "fixed_code": {},
         "changes_made": [],
+        "file_status": initial_file_status(python_files),
         "test_passed": False,
         "test_output": None,
+        "test_results": None,
         "pylint_score_after": None,
         "iteration_count": 0,
         "status": "running",
         "error_message": None,
-        "repo_type": None
+        "repo_type": None,
+        "fixer_workers": fixer_workers,
+        "run_id": None
+    }
+
+
+def apply_since(state: AgentState, since: str) -> dict:
+    """
+    Mode incrémental : restreint python_files aux fichiers modifiés depuis
+    `since` et à leurs importateurs ; le reste du dépôt ne sert que de contexte.
+    
+    Returns:
+        Résultat de select_changed_files
+    """
+    selection = select_changed_files(state["target_dir"], state["python_files"], since)
+    if selection["success"]:
+        state["context_files"] = state["python_files"]
+        state["python_files"] = selection["selected"]
+        state["file_status"] = initial_file_status(selection["selected"])
+    return selection
+
+
+def run_workflow(initial_state: AgentState, run_id: str, entry_point: str = "auditor") -> AgentState:
+    """
+    Construit le workflow, l'exécute et enregistre le statut final de l'exécution.
+    """
+    workflow = build_workflow(entry_point, checkpoint=(checkpoint_store, run_id))
+    app = workflow.compile()
+    final_state = app.invoke(initial_state, config={"recursion_limit": 50})  # Au lieu de 25 par défaut
+    checkpoint_store.set_run_status(run_id, final_state['status'])
+    return final_state
+
+
+# ==============================================================================
+# MODE BATCH (--targets / --manifest)
+# ==============================================================================
+
+def read_manifest(path: str) -> list:
+    """Dossiers cibles d'un manifeste : un chemin par ligne, lignes vides et # ignorées."""
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.strip().startswith("#")]
+
+
+def _init_batch_worker(llm_slots):
+    """Initialise un processus du pool : sémaphore LLM commun à tout le batch."""
+    from src.utils.llm_helper import set_global_llm_slots
+    set_global_llm_slots(llm_slots)
+
+
+def run_batch_target(target_dir: str, fixer_workers: int = None, since: str = None) -> dict:
+    """
+    Exécute le workflow complet sur un dossier cible (dans un processus du pool).
+    
+    La sortie est redirigée vers un fichier de log propre à la cible.
+    
+    Returns:
+        Ligne du tableau récapitulatif : target, status, iterations,
+        score_before, score_after, tokens, llm_calls, wall_time, run_id, log, error
+    """
+    import time
+    import traceback
+    from contextlib import redirect_stderr, redirect_stdout
+    from src.config import CACHE_DIR
+    from src.tools.file_tools import set_sandbox_root
+    from src.utils.llm_helper import get_token_usage, reset_token_usage
+    from src.utils.logger import flush_logs
+    from src.utils.result_cache import hash_content
+    
+    start = time.perf_counter()
+    reset_token_usage()
+    log_dir = os.path.join(CACHE_DIR, "batch")
+    os.makedirs(log_dir, exist_ok=True)
+    absolute = os.path.abspath(target_dir)
+    log_path = os.path.join(log_dir, f"{os.path.basename(absolute) or 'root'}_{hash_content(absolute)[:8]}.log")
+    row = {
+        "target": target_dir, "status": "error", "iterations": 0,
+        "score_before": None, "score_after": None, "tokens": 0, "llm_calls": 0,
+        "wall_time": 0.0, "run_id": None, "log": log_path, "error": None,
+    }
+    
+    with open(log_path, "w", encoding="utf-8") as log, redirect_stdout(log), redirect_stderr(log):
+        try:
+            if not os.path.isdir(target_dir):
+                raise FileNotFoundError(f"Le dossier '{target_dir}' n'existe pas")
+            set_sandbox_root(target_dir)
+            state = initialize_state(target_dir, fixer_workers=fixer_workers)
+            if since:
+                selection = apply_since(state, since)
+                if not selection["success"]:
+                    raise RuntimeError(f"--since : {selection['error']}")
+            if not state["python_files"]:
+                row["status"] = "skipped"
+            else:
+                row["run_id"] = state["run_id"] = checkpoint_store.new_run(target_dir)
+                final_state = run_workflow(state, row["run_id"])
+                row.update(
+                    status=final_state["status"],
+                    iterations=final_state["iteration_count"],
+                    score_before=final_state.get("pylint_score_before"),
+                    score_after=final_state.get("pylint_score_after"),
+                )
+        except Exception as e:
+            row["error"] = str(e)
+            traceback.print_exc()
+            if row["run_id"]:
+                checkpoint_store.set_run_status(row["run_id"], "interrupted")
+        finally:
+            # Les processus du pool ne passent pas par atexit
+            flush_logs()
+    
+    usage = get_token_usage()
+    row["tokens"] = usage["total_tokens"]
+    row["llm_calls"] = usage["calls"]
+    row["wall_time"] = round(time.perf_counter() - start, 1)
+    return row
+
+
+def run_batch(targets: list, workers: int, llm_concurrency: int, fixer_workers: int = None, since: str = None) -> list:
+    """
+    Exécute des workflows indépendants dans un pool de processus.
+    
+    Les caches (LLM, résultats, checkpoints) et le limiteur de débit sont
+    partagés via leurs fichiers SQLite ; un sémaphore commun limite le
+    nombre de requêtes LLM en vol sur l'ensemble du batch.
+    
+    Returns:
+        Lignes du récapitulatif, dans l'ordre de targets
+    """
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    
+    llm_slots = multiprocessing.BoundedSemaphore(max(1, llm_concurrency))
+    rows = {}
+    with ProcessPoolExecutor(
+        max_workers=max(1, min(workers, len(targets))),
+        initializer=_init_batch_worker,
+        initargs=(llm_slots,)
+    ) as executor:
+        futures = {
+            executor.submit(run_batch_target, target, fixer_workers, since): index
+            for index, target in enumerate(targets)
+        }
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                row = future.result()
+            except Exception as e:  # Processus du pool tué
+                row = {"target": targets[index], "status": "error", "error": str(e)}
+            rows[index] = row
+            print(f"  [{len(rows)}/{len(targets)}] {row['target']}: {row['status']}"
+                  + (f" ({row['error']})" if row.get("error") else ""))
+    return [rows[index] for index in range(len(targets))]
+
+
+def format_batch_summary(rows: list) -> str:
+    """Tableau récapitulatif du batch (une ligne par dépôt)."""
+    def score(value):
+        return f"{value:.2f}" if isinstance(value, (int, float)) else "-"
+    
+    header = ("Cible", "Statut", "Itér.", "Avant", "Après", "Tokens", "Appels", "Durée (s)")
+    lines = [
+        (
+            row["target"], row["status"], str(row.get("iterations", 0)),
+            score(row.get("score_before")), score(row.get("score_after")),
+            str(row.get("tokens", 0)), str(row.get("llm_calls", 0)), f"{row.get('wall_time', 0.0):.1f}",
+        )
+        for row in rows
+    ]
+    widths = [max(len(cells[i]) for cells in [header, *lines]) for i in range(len(header))]
+    render = lambda cells: " | ".join(cell.ljust(width) for cell, width in zip(cells, widths))
+    separator = "-+-".join("-" * width for width in widths)
+    return "\n".join([render(header), separator, *(render(cells) for cells in lines)])
+
+
+def main_batch(targets: list, args) -> int:
+    """
+    Point d'entrée du mode batch.
+    
+    Returns:
+        Code de sortie (1 si au moins une cible est en erreur)
+    """
+    import json
+    import time
+    from src.config import BATCH_WORKERS, LLM_GLOBAL_CONCURRENCY, CACHE_DIR
+    
+    workers = args.batch_workers or BATCH_WORKERS or os.cpu_count() or 1
+    llm_concurrency = args.llm_concurrency or LLM_GLOBAL_CONCURRENCY
+    print("🐝 Démarrage du Refactoring Swarm (mode batch)...")
+    print(f"📁 {len(targets)} cible(s), {min(workers, len(targets))} processus, "
+          f"{llm_concurrency} requête(s) LLM simultanée(s) au maximum")
+    print("=" * 70)
+    
+    start = time.perf_counter()
+    rows = run_batch(targets, workers, llm_concurrency, args.fixer_workers, args.since)
+    
+    summary_path = os.path.join(CACHE_DIR, "batch", f"summary_{time.strftime('%Y%m%d_%H%M%S')}.json")
+    os.makedirs(os.path.dirname(summary_path), exist_ok=True)
+    with open(summary_path, "w", encoding="utf-8") as f:
+        json.dump(rows, f, indent=2, ensure_ascii=False)
+    
+    print("\n" + "=" * 70)
+    print(f"🏁 Batch terminé en {time.perf_counter() - start:.1f}s")
+    print("=" * 70)
+    print(format_batch_summary(rows))
+    print(f"\n📝 Récapitulatif : {summary_path} (logs par cible dans {os.path.dirname(summary_path)})")
+    
+    exported = export_experiment_data()
+    print(f"📝 {exported} entrée(s) de log exportée(s) vers logs/experiment_data.json")
+    return 1 if any(row["status"] == "error" for row in rows) else 0
+
+
+# ==============================================================================
+# FILE DE TÂCHES (python main.py submit / worker / status)
+# ==============================================================================
+
+QUEUE_COMMANDS = ("submit", "worker", "status", "serve")
+JOB_KINDS = ("auditor", "fix_file", "fixer", "judge")
+
+
+def submit_run(queue, target_dir: str, since: str = None, fixer_workers: int = None, max_attempts: int = None) -> str:
+    """
+    Enregistre une exécution et soumet sa première tâche (audit).
+    
+    Returns:
+        run_id de l'exécution (suivi avec `python main.py status <run_id>`)
+    """
+    run_id = checkpoint_store.new_run(target_dir)
+    checkpoint_store.set_run_status(run_id, "queued")
+    queue.submit(
+        "auditor",
+        {"target_dir": os.path.abspath(target_dir), "since": since, "fixer_workers": fixer_workers},
+        run_id=run_id, dedup_key=f"{run_id}:auditor", max_attempts=max_attempts
+    )
+    return run_id
+
+
+def _schedule_fixes(queue, run_id: str, state: AgentState) -> int:
+    """
+    Planifie une itération : une tâche "fix_file" par fichier à corriger, puis
+    la tâche "fixer" qui attend qu'elles soient toutes terminées.
+    
+    Les tâches ouvertes d'une exécution déjà commencée passent avant les
+    audits des nouvelles exécutions (priorité 1).
+    
+    Returns:
+        Nombre de tâches "fix_file" planifiées
+    """
+    iteration = state["iteration_count"]
+    files = []
+    if state.get("audit_report"):
+        files = files_to_fix(state["python_files"], state.get("file_status") if iteration > 1 else None)
+    jobs = [
+        {
+            "kind": "fix_file", "run_id": run_id, "payload": {"filepath": filepath, "iteration": iteration},
+            "dedup_key": f"{run_id}:fix_file:{iteration}:{filepath}", "priority": 1,
+        }
+        for filepath in files
+    ]
+    jobs.append({
+        "kind": "fixer", "run_id": run_id, "payload": {"iteration": iteration},
+        "dedup_key": f"{run_id}:fixer:{iteration}", "wait_for": "fix_file", "priority": 1,
+    })
+    queue.submit_many(jobs)
+    return len(files)
+
+
+def _load_run_state(run_id: str, routed: bool = False):
+    """
+    Dernier checkpoint d'une exécution.
+    
+    Args:
+        routed: Après le Juge, appliquer sa décision (comme --resume) :
+            le nœud renvoyé devient "end" si l'exécution est terminée
+    
+    Returns:
+        (dernier nœud, état)
+    """
+    loaded = checkpoint_store.load_latest(run_id)
+    if loaded is None:
+        raise RuntimeError(f"Aucun checkpoint pour l'exécution '{run_id}'")
+    last_node, state = loaded
+    if routed and last_node == "judge" and should_continue(state) == "end":
+        last_node = "end"
+    return last_node, state
+
+
+def _job_auditor(queue, job) -> dict:
+    """Tâche "auditor" : initialise l'exécution, audite, puis planifie les corrections."""
+    from src.tools.file_tools import set_sandbox_root
+    
+    payload, run_id = job["payload"], job["run_id"]
+    loaded = checkpoint_store.load_latest(run_id)
+    if loaded is not None and loaded[0] == "auditor":
+        # Nouvelle tentative après un audit déjà enregistré
+        state = loaded[1]
+    else:
+        target_dir = payload["target_dir"]
+        if not os.path.isdir(target_dir):
+            raise FileNotFoundError(f"Le dossier '{target_dir}' n'existe pas")
+        set_sandbox_root(target_dir)
+        state = initialize_state(target_dir, fixer_workers=payload.get("fixer_workers"))
+        if payload.get("since"):
+            selection = apply_since(state, payload["since"])
+            if not selection["success"]:
+                raise RuntimeError(f"--since : {selection['error']}")
+        if not state["python_files"]:
+            checkpoint_store.set_run_status(run_id, "skipped")
+            return {"status": "skipped", "files": 0}
+        state["run_id"] = run_id
+        checkpoint_store.set_run_status(run_id, "running")
+        state = with_checkpoint("auditor", auditor_agent, checkpoint_store, run_id)(state)
+    
+    fix_jobs = _schedule_fixes(queue, run_id, state)
+    return {"files": len(state["python_files"]), "fix_jobs": fix_jobs, "score_before": state.get("pylint_score_before")}
+
+
+def _job_fix_file(queue, job) -> dict:
+    """Tâche "fix_file" : corrige un fichier (résultat repris par la tâche "fixer")."""
+    from src.agents.fixer import corriger_fichier_depuis_etat
+    from src.tools.file_tools import set_sandbox_root
+    
+    payload = job["payload"]
+    last_node, state = _load_run_state(job["run_id"], routed=True)
+    if last_node not in ("auditor", "judge") or state["iteration_count"] != payload["iteration"]:
+        return {"filepath": payload["filepath"], "skipped": f"exécution déjà au nœud {last_node}"}
+    set_sandbox_root(state["target_dir"])
+    result = corriger_fichier_depuis_etat(state, payload["filepath"])
+    return {"filepath": payload["filepath"], "fixed": result["fixed_code"] is not None, "change": result["change"]}
+
+
+def _job_fixer(queue, job) -> dict:
+    """Tâche "fixer" : agrège les corrections de l'itération, puis planifie le Juge."""
+    from src.tools.file_tools import set_sandbox_root
+    
+    run_id, iteration = job["run_id"], job["payload"]["iteration"]
+    last_node, state = _load_run_state(run_id, routed=True)
+    if state["iteration_count"] != iteration or last_node not in ("auditor", "judge", "fixer"):
+        return {"skipped": f"exécution déjà au nœud {last_node}"}
+    if last_node != "fixer":
+        set_sandbox_root(state["target_dir"])
+        state = with_checkpoint("fixer", fixer_agent, checkpoint_store, run_id)(state)
+    queue.submit("judge", {"iteration": iteration}, run_id=run_id, dedup_key=f"{run_id}:judge:{iteration}", priority=1)
+    return {"changes": state.get("changes_made") or []}
+
+
+def _job_judge(queue, job) -> dict:
+    """Tâche "judge" : teste, puis termine l'exécution ou planifie l'itération suivante."""
+    from src.tools.file_tools import set_sandbox_root
+    
+    run_id, iteration = job["run_id"], job["payload"]["iteration"]
+    last_node, state = _load_run_state(run_id)
+    if state["iteration_count"] != iteration or last_node not in ("fixer", "judge"):
+        return {"skipped": f"exécution déjà au nœud {last_node}"}
+    if last_node == "fixer":
+        set_sandbox_root(state["target_dir"])
+        state = with_checkpoint("judge", judge_agent, checkpoint_store, run_id)(state)
+    
+    if should_continue(state) == "continue":
+        fix_jobs = _schedule_fixes(queue, run_id, state)
+        return {"decision": "continue", "next_iteration": state["iteration_count"], "fix_jobs": fix_jobs}
+    checkpoint_store.set_run_status(run_id, state["status"])
+    return {
+        "decision": "end",
+        "status": state["status"],
+        "iterations": state["iteration_count"],
+        "score_before": state.get("pylint_score_before"),
+        "score_after": state.get("pylint_score_after"),
+        "test_passed": state.get("test_passed"),
     }
 
 
+_JOB_HANDLERS = {
+    "auditor": _job_auditor,
+    "fix_file": _job_fix_file,
+    "fixer": _job_fixer,
+    "judge": _job_judge,
+}
+
+
+def run_worker(queue, kinds: list = None, idle_exit: bool = False, max_jobs: int = None) -> int:
+    """
+    Boucle d'un worker : prend une tâche, l'exécute en renouvelant son bail,
+    enregistre son résultat ou son échec (relancé plus tard par la file).
+    
+    Args:
+        queue: File de tâches (JobQueue)
+        kinds: Types de tâches acceptés (None = tous)
+        idle_exit: S'arrêter quand la file ne contient plus de tâche ouverte
+        max_jobs: Nombre maximal de tâches à traiter
+    
+    Returns:
+        Nombre de tâches traitées
+    """
+    import socket
+    import threading
+    import time
+    import traceback
+    from src.config import JOB_POLL_INTERVAL
+    from src.utils.job_queue import JOB_FAILED
+    
+    owner = f"{socket.gethostname()}:{os.getpid()}"
+    processed = 0
+    while max_jobs is None or processed < max_jobs:
+        job = queue.lease(owner, kinds)
+        if job is None:
+            if idle_exit and queue.open_jobs() == 0:
+                break
+            time.sleep(JOB_POLL_INTERVAL)
+            continue
+        
+        print(f"\n📥 [{owner}] Tâche #{job['id']} {job['kind']} (exécution {job['run_id']}, "
+              f"tentative {job['attempts']}/{job['max_attempts']})")
+        stop = threading.Event()
+        
+        def _heartbeat(job_id=job["id"]):
+            while not stop.wait(queue.lease_seconds / 3):
+                if not queue.heartbeat(job_id, owner):
+                    break
+        
+        beat = threading.Thread(target=_heartbeat, name="job-heartbeat", daemon=True)
+        beat.start()
+        try:
+            handler = _JOB_HANDLERS.get(job["kind"])
+            if handler is None:
+                raise ValueError(f"Type de tâche inconnu : {job['kind']}")
+            result = handler(queue, job)
+        except KeyboardInterrupt:
+            queue.fail(job["id"], owner, "Worker interrompu")
+            raise
+        except Exception as e:
+            traceback.print_exc()
+            status = queue.fail(job["id"], owner, f"{type(e).__name__}: {e}")
+            print(f"❌ Tâche #{job['id']} en échec ({status or 'bail perdu'}) : {e}")
+            # Une correction de fichier perdue est refaite par la tâche "fixer"
+            if status == JOB_FAILED and job["kind"] != "fix_file" and job["run_id"]:
+                checkpoint_store.set_run_status(job["run_id"], "failed")
+        else:
+            if queue.complete(job["id"], owner, result):
+                print(f"✅ Tâche #{job['id']} terminée")
+            else:
+                print(f"⚠️  Tâche #{job['id']} terminée après la perte de son bail : résultat ignoré")
+        finally:
+            stop.set()
+            beat.join()
+        processed += 1
+    return processed
+
+
+def _worker_process(kinds, idle_exit, max_jobs):
+    """Processus worker lancé par `main.py worker --processes N`."""
+    from src.utils.job_queue import job_queue
+    from src.utils.logger import flush_logs
+    try:
+        run_worker(job_queue, kinds, idle_exit, max_jobs)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        # Les processus enfants ne passent pas par atexit
+        flush_logs()
+
+
+def warm_up() -> float:
+    """
+    Initialise une fois pour toutes ce que chaque exécution rechargerait :
+    google.generativeai, prompts système, encodeur tiktoken, pylint/astroid,
+    langgraph et ses modules de compilation. Les workers forkés en héritent.
+    
+    Aucun client API n'est créé ici (les connexions ne survivent pas au fork).
+    
+    Returns:
+        Durée de l'initialisation (secondes)
+    """
+    import time
+    start = time.perf_counter()
+    
+    from src.utils.llm_helper import get_genai
+    get_genai()
+    from src.prompts.context_manager import context_manager
+    for agent in ("auditor", "fixer", "judge"):
+        try:
+            context_manager.get_system_prompt(agent)
+        except FileNotFoundError:
+            pass
+    try:
+        from src.prompts.prompt_optimizer import prompt_optimizer
+        prompt_optimizer.compter_tokens("warm-up")
+    except ImportError:
+        pass
+    try:
+        import pylint.lint  # noqa: F401
+        import astroid  # noqa: F401
+    except ImportError:
+        pass
+    build_workflow().compile()
+    return time.perf_counter() - start
+
+
+def serve(args, queue) -> int:
+    """
+    Mode serveur : initialise les dépendances, forke les workers, puis sert l'API HTTP.
+    
+    Returns:
+        Code de sortie
+    """
+    from src.utils.server import SwarmAPI, WorkerSupervisor, make_server
+    
+    if args.no_cache:
+        from src.utils.llm_cache import llm_cache
+        from src.utils.result_cache import result_cache
+        llm_cache.bypass = True
+        result_cache.bypass = True
+    
+    print("🐝 Refactoring Swarm - mode serveur")
+    print(f"🔥 Dépendances initialisées en {warm_up():.2f}s")
+    
+    def submit(body):
+        return submit_run(queue, body["target_dir"], body.get("since"), body.get("fixer_workers"), body.get("max_attempts"))
+    
+    # Les workers sont forkés avant le démarrage des threads HTTP
+    supervisor = WorkerSupervisor(_server_worker, args.workers)
+    supervisor.start()
+    server = make_server(SwarmAPI(queue, checkpoint_store, submit, supervisor), args.host, args.port, args.socket)
+    address = args.socket or f"http://{args.host}:{server.server_address[1]}"
+    print(f"🌐 API sur {address} ({args.workers} worker(s), file {queue.db_path})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n⏹️  Arrêt du serveur")
+    finally:
+        server.server_close()
+        supervisor.stop()
+        if args.socket and os.path.exists(args.socket):
+            os.unlink(args.socket)
+    return 0
+
+
+def _server_worker():
+    """Worker du mode serveur : boucle sur la file jusqu'à son arrêt."""
+    _worker_process(None, False, None)
+
+
+def _format_job_stats(stats: dict) -> str:
+    """Avancement par type de tâche, ex: "fix_file 3/5 (1 en échec)"."""
+    parts = []
+    for kind in sorted(stats, key=lambda k: JOB_KINDS.index(k) if k in JOB_KINDS else len(JOB_KINDS)):
+        counts = stats[kind]
+        part = f"{kind} {counts.get('done', 0)}/{sum(counts.values())}"
+        if counts.get("failed"):
+            part += f" ({counts['failed']} en échec)"
+        parts.append(part)
+    return ", ".join(parts) or "aucune tâche"
+
+
+def main_queue(command: str, argv: list) -> int:
+    """
+    Sous-commandes de la file de tâches :
+    
+    - submit DIR... : soumet une exécution par dossier
+    - worker        : traite les tâches (auditor, fix_file, fixer, judge)
+    - status [RUN]  : avancement des exécutions
+    - serve         : serveur HTTP local (API submit/status/results) et workers
+    
+    Returns:
+        Code de sortie
+    """
+    from src.utils.job_queue import job_queue
+    
+    parser = argparse.ArgumentParser(prog=f"main.py {command}")
+    if command == "submit":
+        parser.description = "Soumet des dossiers cibles à la file de tâches"
+        parser.add_argument('targets', nargs='*', metavar='DIR', help='Dossiers cibles')
+        parser.add_argument('--manifest', metavar='FILE', help='Fichier listant les dossiers cibles (un par ligne)')
+        parser.add_argument('--since', metavar='GIT_REF', help='Mode incrémental (voir main.py --since)')
+        parser.add_argument('--fixer_workers', type=int, default=None, help='Fichiers corrigés en parallèle par tâche "fixer"')
+        parser.add_argument('--max_attempts', type=int, default=None, help='Tentatives par tâche avant échec définitif')
+        args = parser.parse_args(argv)
+        
+        targets = list(args.targets) + (read_manifest(args.manifest) if args.manifest else [])
+        if not targets:
+            parser.error("Aucun dossier cible")
+        missing = [target for target in targets if not os.path.isdir(target)]
+        if missing:
+            parser.error(f"Dossier(s) introuvable(s) : {', '.join(missing)}")
+        for target in targets:
+            run_id = submit_run(job_queue, target, args.since, args.fixer_workers, args.max_attempts)
+            print(f"📨 {target} → exécution {run_id}")
+        print("💡 Traiter la file : python main.py worker --processes N")
+        return 0
+    
+    if command == "worker":
+        parser.description = "Traite les tâches de la file"
+        parser.add_argument('--processes', type=int, default=1, help='Nombre de processus worker sur cette machine')
+        parser.add_argument('--kinds', nargs='+', choices=JOB_KINDS, help='Types de tâches acceptés (défaut : tous)')
+        parser.add_argument('--idle_exit', action='store_true', help="S'arrêter quand la file est vide")
+        parser.add_argument('--max_jobs', type=int, default=None, help='Tâches traitées par processus avant arrêt')
+        parser.add_argument('--no_cache', action='store_true', help='Ignorer les caches (réponses LLM, résultats)')
+        args = parser.parse_args(argv)
+        
+        if args.no_cache:
+            from src.utils.llm_cache import llm_cache
+            from src.utils.result_cache import result_cache
+            llm_cache.bypass = True
+            result_cache.bypass = True
+        
+        print(f"🐝 Worker(s) de la file {job_queue.db_path} : {args.processes} processus")
+        if args.processes <= 1:
+            try:
+                run_worker(job_queue, args.kinds, args.idle_exit, args.max_jobs)
+            except KeyboardInterrupt:
+                print("\n⏹️  Worker arrêté")
+            return 0
+        
+        import multiprocessing
+        processes = [
+            multiprocessing.Process(target=_worker_process, args=(args.kinds, args.idle_exit, args.max_jobs),
+                                    name=f"worker-{index}")
+            for index in range(args.processes)
+        ]
+        for process in processes:
+            process.start()
+        try:
+            for process in processes:
+                process.join()
+        except KeyboardInterrupt:
+            for process in processes:
+                process.join()
+            print("\n⏹️  Workers arrêtés")
+        return 0
+    
+    if command == "serve":
+        from src.config import SERVER_HOST, SERVER_PORT, SERVER_WORKERS
+        parser.description = "Serveur local : API submit/status/results, dépendances chargées une seule fois"
+        parser.add_argument('--host', default=SERVER_HOST, help='Adresse d\'écoute (défaut : %(default)s)')
+        parser.add_argument('--port', type=int, default=SERVER_PORT, help='Port TCP (défaut : %(default)s)')
+        parser.add_argument('--socket', metavar='PATH', help='Écouter sur un socket Unix au lieu de TCP')
+        parser.add_argument('--workers', type=int, default=SERVER_WORKERS, help='Processus workers (défaut : %(default)s)')
+        parser.add_argument('--no_cache', action='store_true', help='Ignorer les caches (réponses LLM, résultats)')
+        args = parser.parse_args(argv)
+        return serve(args, job_queue)
+    
+    parser.description = "Avancement des exécutions soumises"
+    parser.add_argument('run_ids', nargs='*', metavar='RUN_ID', help='Exécutions (défaut : les 20 dernières)')
+    args = parser.parse_args(argv)
+    runs = checkpoint_store.list_runs()
+    if args.run_ids:
+        runs = [run for run in map(checkpoint_store.get_run, args.run_ids) if run is not None]
+    for run in runs:
+        print(f"{run['run_id']}  {run['status']:<14} {run['target_dir']}")
+        print(f"    tâches : {_format_job_stats(job_queue.stats(run['run_id']))}")
+        if args.run_ids:
+            for row in job_queue.results(run["run_id"]):
+                print(f"    #{row['job_id']:<5} {row['kind']:<8} {'✅' if row['success'] else '❌'} {row['result']}")
+    return 0
+
+
 def main():
     """
     Point d'entrée du Refactoring Swarm.
     """
+    if len(sys.argv) > 1 and sys.argv[1] in QUEUE_COMMANDS:
+        sys.exit(main_queue(sys.argv[1], sys.argv[2:]))
+    
     # Parser les arguments de ligne de commande
     parser = argparse.ArgumentParser(
-        description="The Refactoring Swarm - Système de Refactoring Autonome"
+        description="The Refactoring Swarm - Système de Refactoring Autonome",
+        epilog="File de tâches : python main.py submit DIR... | worker [--processes N] | status [RUN_ID...] | serve"
     )
     parser.add_argument(
         '--target_dir',
-        required=True,
         help='Dossier contenant le code Python à refactorer'
     )
+    parser.add_argument(
+        '--resume',
+        metavar='RUN_ID',
+        help='Reprendre une exécution interrompue depuis son dernier checkpoint'
+    )
+    parser.add_argument(
+        '--fixer_workers',
+        type=int,
+        default=None,
+        help='Nombre de fichiers corrigés en parallèle par le Correcteur (1 = séquentiel)'
+    )
+    parser.add_argument(
+        '--targets',
+        nargs='+',
+        metavar='DIR',
+        help='Mode batch : plusieurs dossiers cibles traités en parallèle (pool de processus)'
+    )
+    parser.add_argument(
+        '--manifest',
+        metavar='FILE',
+        help='Mode batch : fichier listant les dossiers cibles (un par ligne)'
+    )
+    parser.add_argument(
+        '--batch_workers',
+        type=int,
+        default=None,
+        help='Mode batch : nombre de dépôts traités simultanément (défaut : un par CPU)'
+    )
+    parser.add_argument(
+        '--llm_concurrency',
+        type=int,
+        default=None,
+        help='Mode batch : requêtes LLM simultanées au maximum, tous processus confondus'
+    )
+    parser.add_argument(
+        '--since',
+        metavar='GIT_REF',
+        help='Ne traiter que les fichiers modifiés depuis cette référence git et les modules qui les importent'
+    )
+    parser.add_argument(
+        '--no_cache',
+        action='store_true',
+        help='Ignorer les caches (réponses LLM, résultats pylint/audit) : ni lecture ni écriture'
+    )
     args = parser.parse_args()
     
+    from src.utils.llm_cache import llm_cache
+    from src.utils.result_cache import result_cache
+    if args.no_cache:
+        llm_cache.bypass = True
+        result_cache.bypass = True
+    
+    if args.targets or args.manifest:
+        targets = list(args.targets or []) + (read_manifest(args.manifest) if args.manifest else [])
+        if args.target_dir or args.resume:
+            parser.error("--targets/--manifest ne se combinent pas avec --target_dir ni --resume")
+        if not targets:
+            parser.error("Aucune cible dans --targets/--manifest")
+        sys.exit(main_batch(targets, args))
+    
+    if not args.target_dir and not args.resume:
+        parser.error("--target_dir est requis (sauf avec --resume, --targets ou --manifest)")
+    
+    entry_point = "auditor"
+    if args.resume:
+        # Reprendre depuis le dernier nœud terminé
+        loaded = checkpoint_store.load_latest(args.resume)
+        if loaded is None:
+            print(f"❌ Erreur : Aucun checkpoint pour l'exécution '{args.resume}' !")
+            sys.exit(1)
+        last_node, initial_state = loaded
+        run_id = args.resume
+        target_dir = initial_state["target_dir"]
+        if args.fixer_workers:
+            initial_state["fixer_workers"] = args.fixer_workers
+        entry_point = next_node_after(last_node, initial_state)
+    else:
+        target_dir = args.target_dir
+    
     # Valider le dossier cible
-    if not os.path.exists(args.target_dir):
-        print(f"❌ Erreur : Le dossier '{args.target_dir}' n'existe pas !")
+    if not os.path.exists(target_dir):
+        print(f"❌ Erreur : Le dossier '{target_dir}' n'existe pas !")
         sys.exit(1)
     
     from src.tools.file_tools import set_sandbox_root
-    set_sandbox_root(args.target_dir)
+    set_sandbox_root(target_dir)
     
     print("🐝 Démarrage du Refactoring Swarm...")
-    print(f"📁 Dossier Cible : {args.target_dir}")
+    print(f"📁 Dossier Cible : {target_dir}")
     print("=" * 70)
     
-    # Initialiser l'état
-    initial_state = initialize_state(args.target_dir)
-    print(f"📄 Trouvé {len(initial_state['python_files'])} fichier(s) Python")
-    
-    if len(initial_state['python_files']) == 0:
-        print("⚠️  Aucun fichier Python trouvé dans le dossier cible !")
-        sys.exit(0)
-    
-    print("\n🏗️  Construction du workflow...")
-    
-    # Construire et compiler le workflow
-    workflow = build_workflow()
-    app = workflow.compile()
-    config = {
-    "recursion_limit": 50  # Au lieu de 25 par défaut
-    }
+    if args.resume:
+        print(f"♻️  Reprise de l'exécution {run_id} (dernier nœud terminé: {last_node})")
+    else:
+        # Initialiser l'état
+        initial_state = initialize_state(target_dir, fixer_workers=args.fixer_workers)
+        print(f"📄 Trouvé {len(initial_state['python_files'])} fichier(s) Python")
+        
+        if len(initial_state['python_files']) == 0:
+            print("⚠️  Aucun fichier Python trouvé dans le dossier cible !")
+            sys.exit(0)
+        
+        if args.since:
+            # Mode incrémental : le reste du dépôt ne sert que de contexte
+            selection = apply_since(initial_state, args.since)
+            if not selection["success"]:
+                print(f"❌ Erreur --since : {selection['error']}")
+                sys.exit(1)
+            print(f"🔀 Depuis {args.since} : {len(selection['changed'])} fichier(s) modifié(s), "
+                  f"{len(selection['selected'])} à traiter avec leurs importateurs")
+            if not selection["selected"]:
+                print("✅ Aucun fichier Python modifié : rien à refactorer")
+                sys.exit(0)
+        
+        run_id = checkpoint_store.new_run(target_dir)
+        initial_state["run_id"] = run_id
+    print(f"🆔 Exécution : {run_id} (reprise possible avec --resume {run_id})")
     
-    print("✅ Workflow construit avec succès !")
     print("\n🚀 Lancement du processus de refactoring...\n")
     
-    # Exécuter le workflow
+    # Construire et exécuter le workflow
     try:
-        final_state = app.invoke(initial_state , config=config)
+        if entry_point is None:
+            print("ℹ️  Exécution déjà terminée - affichage des résultats enregistrés")
+            final_state = initial_state
+            checkpoint_store.set_run_status(run_id, final_state['status'])
+        else:
+            final_state = run_workflow(initial_state, run_id, entry_point)
         
         # Afficher les résultats
         print("\n" + "=" * 70)
@@ -184,6 +965,14 @@ def main():
         if final_state.get('pylint_score_before') and final_state.get('pylint_score_after'):
             print(f"📈 Score Qualité    : {final_state['pylint_score_before']:.2f} → {final_state['pylint_score_after']:.2f}")
         
+        cache_stats = llm_cache.get_stats()
+        if not cache_stats["bypass"]:
+            print(f"💾 Cache LLM        : {cache_stats['hits']} hit(s) / {cache_stats['misses']} miss(es) "
+                  f"({cache_stats['hit_rate']:.0%})")
+        for namespace, stats in result_cache.get_stats().items():
+            print(f"💾 Cache {namespace:<10} : {stats['hits']} hit(s) / {stats['misses']} miss(es) "
+                  f"({stats['hit_rate']:.0%})")
+        
         print()
         if final_state['status'] == 'success':
             print("✅ SUCCÈS : Code refactorisé et tous les tests passent !")
@@ -194,9 +983,15 @@ def main():
             
     except Exception as e:
         print(f"\n❌ ERREUR CRITIQUE : {str(e)}")
+        checkpoint_store.set_run_status(run_id, "interrupted")
+        print(f"💡 Reprendre avec : python main.py --resume {run_id}")
         import traceback
         traceback.print_exc()
         sys.exit(1)
+    finally:
+        # Produire logs/experiment_data.json à partir du journal JSONL
+        exported = export_experiment_data()
+        print(f"📝 {exported} entrée(s) de log exportée(s) vers logs/experiment_data.json")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,130 @@
+"""
+Mesure du temps de démarrage : import de main.py (et des agents) dans un
+interpréteur neuf.
+
+Chaque module est importé --runs fois dans un nouveau processus (après une
+exécution de chauffe qui compile les .pyc) ; on rapporte la médiane et le
+minimum, les imports les plus coûteux (python -X importtime) et les modules
+lourds chargés alors qu'ils ne devraient l'être qu'au premier usage.
+
+Usage :
+    python scripts/benchmark_startup.py
+    python scripts/benchmark_startup.py --runs 10 --budget 0.5 --json startup.json
+
+Code de sortie 1 si un import échoue, si la médiane de main dépasse
+--budget ou si un module interdit est chargé au démarrage (usage en CI).
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_MODULES = ("main", "src.agents.auditor", "src.agents.fixer", "src.agents.judge")
+
+# Chargés au premier usage seulement (voir llm_helper.get_genai, PromptOptimizer.encoder, build_workflow)
+DEFAULT_FORBIDDEN = ("google.generativeai", "tiktoken", "langgraph", "pylint")
+
+_IMPORTTIME = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def _python(code, extra_args=()):
+    return subprocess.run(
+        [sys.executable, *extra_args, "-c", code],
+        cwd=ROOT, capture_output=True, text=True
+    )
+
+
+def time_import(module, runs):
+    """Durées (secondes) d'import du module, chacune dans un processus neuf."""
+    code = f"import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+    warm = _python(code)
+    if warm.returncode != 0:
+        raise RuntimeError(warm.stderr.strip().splitlines()[-1] if warm.stderr.strip() else "import impossible")
+    durations = []
+    for _ in range(runs):
+        result = _python(code)
+        durations.append(float(result.stdout.strip().splitlines()[-1]))
+    return durations
+
+
+def heaviest_imports(module, top):
+    """Imports les plus coûteux (temps cumulé, en secondes) d'après -X importtime."""
+    result = _python(f"import {module}", ("-X", "importtime"))
+    entries = []
+    for line in result.stderr.splitlines():
+        match = _IMPORTTIME.match(line)
+        if match:
+            entries.append((int(match.group(2)) / 1e6, match.group(4)))
+    # Modules de premier niveau de l'arbre ou paquets du projet : les plus parlants
+    return sorted(entries, reverse=True)[:top]
+
+
+def loaded_forbidden(module, forbidden):
+    """Modules de `forbidden` présents dans sys.modules après l'import."""
+    code = (
+        f"import json, sys; import {module}; "
+        f"print(json.dumps(sorted(m for m in {list(forbidden)!r} if m in sys.modules)))"
+    )
+    result = _python(code)
+    return json.loads(result.stdout.strip().splitlines()[-1]) if result.returncode == 0 else []
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Temps d'import de main.py et des agents")
+    parser.add_argument("--modules", nargs="+", default=list(DEFAULT_MODULES), help="Modules à mesurer")
+    parser.add_argument("--runs", type=int, default=5, help="Imports mesurés par module (défaut : 5)")
+    parser.add_argument("--top", type=int, default=10, help="Imports les plus coûteux affichés pour le 1er module")
+    parser.add_argument("--budget", type=float, default=None, help="Médiane maximale (s) pour le 1er module")
+    parser.add_argument("--forbid", nargs="*", default=list(DEFAULT_FORBIDDEN),
+                        help="Modules qui ne doivent pas être chargés à l'import")
+    parser.add_argument("--json", metavar="FILE", help="Écrire les mesures dans un fichier JSON")
+    args = parser.parse_args()
+
+    report = {"python": sys.version.split()[0], "timestamp": time.time(), "modules": {}}
+    failed = False
+    print(f"⏱️  Temps d'import ({args.runs} exécution(s) par module, Python {report['python']})")
+    print("=" * 70)
+    for module in args.modules:
+        try:
+            durations = time_import(module, args.runs)
+        except RuntimeError as e:
+            print(f"❌ {module:<22} {e}")
+            report["modules"][module] = {"error": str(e)}
+            failed = True
+            continue
+        forbidden = loaded_forbidden(module, args.forbid)
+        report["modules"][module] = {
+            "median": statistics.median(durations), "min": min(durations), "runs": durations, "forbidden": forbidden,
+        }
+        print(f"{'❌' if forbidden else '✅'} {module:<22} médiane {statistics.median(durations) * 1000:7.1f} ms"
+              f"   min {min(durations) * 1000:7.1f} ms"
+              + (f"   chargés à l'import : {', '.join(forbidden)}" if forbidden else ""))
+        failed = failed or bool(forbidden)
+
+    first = args.modules[0]
+    if "median" in report["modules"].get(first, {}) and args.top:
+        print(f"\n🐢 Imports les plus coûteux pour {first} (cumulé) :")
+        for seconds, name in heaviest_imports(first, args.top):
+            print(f"   {seconds * 1000:8.1f} ms  {name}")
+
+    if args.budget is not None and "median" in report["modules"].get(first, {}):
+        median = report["modules"][first]["median"]
+        within = median <= args.budget
+        print(f"\n{'✅' if within else '❌'} Budget {first} : {median:.3f}s / {args.budget:.3f}s")
+        failed = failed or not within
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n📝 Mesures écrites dans {args.json}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
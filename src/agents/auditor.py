@@ -1,26 +1,24 @@
 import os
 import json
-import google.generativeai as genai
-from dotenv import load_dotenv
+from typing import Dict, List, Optional, Tuple
 
 from src.state import AgentState
 from src.utils.logger import log_experiment, ActionType
-from src.tools.tool_adapter import read_file, run_pylint
-from src.config import DEFAULT_MODEL, DEV_MODE, MOCK_AUDIT_RESPONSE
-from src.utils.llm_helper import call_gemini_with_retry
+from src.tools.tool_adapter import read_file, run_pylint_batch
+from src.tools.static_audit import static_audit_file, static_score, STATIC_TYPES
+from src.config import DEFAULT_MODEL, DEV_MODE, MOCK_AUDIT_RESPONSE, AUDIT_BATCH_TOKENS, STATIC_AUDIT_ENABLED
+from src.utils.llm_helper import call_llm_batch, estimate_tokens, truncate_for_context
+from src.utils.file_status import initial_file_status
+from src.utils.issue_store import IssueStore
+from src.utils.result_cache import result_cache, hash_content, make_key
 
-# Import the optimized prompt builder
+# Import the optimized prompt builder (its tokenizer and prompts load on first use)
 try:
     from src.prompts.prompt_builder import prompt_builder
     USE_PROMPT_BUILDER = True
-    print("✅ Utilisation du prompt builder optimisé")
-except ImportError as e:
+except ImportError:
     USE_PROMPT_BUILDER = False
-    print(f"⚠️  Prompt builder non disponible: {e}")
 
-load_dotenv()
-if not DEV_MODE:
-    genai.configure(api_key=os.getenv('GOOGLE_API_KEY'))
 
 
 def clean_json_response(response: str) -> str:
@@ -61,6 +59,229 @@ def clean_json_response(response: str) -> str:
     return response_clean
 
 
+# Bump when the audit prompt or the findings format changes (invalidates cached findings)
+AUDIT_CACHE_VERSION = "1.2.0"
+
+# Prepended to audit prompts when the static pre-audit already covers style issues
+STATIC_AUDIT_NOTE = (
+    "# NOTE: style (PEP8), nommage et documentation sont déjà vérifiés localement.\n"
+    "# Signale uniquement les bugs (logique, exceptions, valeurs limites).\n"
+)
+
+
+def audit_cache_key(filepath: str, code_content: str) -> str:
+    """
+    Clé du cache des problèmes détectés pour un fichier.
+    
+    Args:
+        filepath: Chemin relatif du fichier (apparaît dans les problèmes)
+        code_content: Contenu du fichier
+        
+    Returns:
+        Clé pour l'espace de noms "audit" du cache de résultats
+    """
+    return make_key(AUDIT_CACHE_VERSION, DEFAULT_MODEL, STATIC_AUDIT_ENABLED, filepath, hash_content(code_content))
+
+
+def _as_score(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 5.0
+
+
+def probleme_concerne(probleme: dict, filepath: str) -> bool:
+    """Indique si un problème signalé par le LLM porte sur le fichier donné."""
+    fichier = str(probleme.get("fichier", "")).replace("\\", "/")
+    filepath = filepath.replace("\\", "/")
+    return fichier == filepath or os.path.basename(fichier) == os.path.basename(filepath)
+
+
+def construire_prompt_audit(code_source: str, nom_fichier: str, score_pylint: Optional[float]) -> str:
+    """
+    Construit le prompt d'audit d'un lot de fichiers.
+    
+    Args:
+        code_source: Code des fichiers du lot (précédé de "# Fichier: ...")
+        nom_fichier: Fichier principal du lot
+        score_pylint: Score Pylint moyen du lot
+        
+    Returns:
+        Prompt complet
+    """
+    if USE_PROMPT_BUILDER:
+        print("📝 Utilisation du prompt builder optimisé")
+        system_prompt, user_prompt = prompt_builder.construire_prompt_auditeur(
+            code_source=code_source,
+            nom_fichier=nom_fichier,
+            score_pylint=score_pylint
+        )
+        full_prompt = f"{system_prompt}\n\n{user_prompt}"
+        
+        # Analyze and log prompt cost
+        cout = prompt_builder.analyser_couts(system_prompt, user_prompt, "Auditor")
+        print(f"💰 Tokens estimés: ~{cout.get('tokens_total_input', 0)} entrée, "
+              f"~{cout.get('tokens_total_output_estime', 0)} sortie")
+    else:
+        # Fallback to enhanced prompt with repo classification
+        print("⚠️  Utilisation du prompt amélioré (fallback)")
+        full_prompt = f"""Tu es un expert Python senior en analyse de code.
+
+MISSION: Analyser du code Python et identifier les problèmes de qualité.
+
+TYPES DE PROBLÈMES:
+1. BUGS: Division par zéro, variables non définies, erreurs de types, exceptions non gérées
+2. PEP8: Nommage incorrect, lignes >79 car, imports désorganisés, espaces manquants
+3. DOCUMENTATION: Fonctions sans docstring, format non-Google Style
+4. NAMING: Variables à une lettre, noms non descriptifs
+
+FORMAT SORTIE (STRICT):
+JSON uniquement, pas de texte, pas de markdown.
+
+{{
+  "score_qualite": <0-10>,
+  "problemes": [
+    {{
+      "fichier": "nom.py",
+      "ligne": <int>,
+      "type": "bug|pep8|documentation|naming",
+      "severite": "critique|majeur|mineur",
+      "description": "<max 80 car>",
+      "suggestion": "<max 100 car>"
+    }}
+  ],
+  "resume": "<max 150 car>"
+}}
+
+RÈGLES ANTI-HALLUCINATION:
+- Ne jamais inventer de problèmes inexistants
+- Vérifier chaque numéro de ligne
+- Être factuel et précis
+- Si aucun problème: {{"score_qualite": 10, "problemes": [], "resume": "Code conforme"}}
+
+CRITÈRES SCORE:
+10: Parfait | 8-9: Mineurs | 6-7: PEP8/doc | 4-5: Bugs mineurs | 0-3: Bugs critiques
+
+PRIORITÉ: bugs > documentation > pep8 > naming
+
+CODE À ANALYSER:
+{code_source}
+
+Score Pylint actuel: {score_pylint:.2f}/10 si disponible
+
+Retourne UNIQUEMENT le JSON."""
+    
+    return full_prompt
+
+
+def decouper_en_lots(code_files: Dict[str, str], budget_tokens: int) -> List[List[str]]:
+    """
+    Regroupe les fichiers en lots dont le code tient dans un budget de tokens.
+    
+    L'ordre des fichiers est conservé ; un fichier plus gros que le budget
+    forme un lot à lui seul (il sera tronqué dans le prompt).
+    
+    Args:
+        code_files: {chemin: code}
+        budget_tokens: Tokens de code maximum par lot
+        
+    Returns:
+        Liste de lots (listes de chemins)
+    """
+    lots, lot, taille = [], [], 0
+    for filepath, code in code_files.items():
+        tokens = estimate_tokens(code)
+        if lot and taille + tokens > budget_tokens:
+            lots.append(lot)
+            lot, taille = [], 0
+        lot.append(filepath)
+        taille += tokens
+    if lot:
+        lots.append(lot)
+    return lots
+
+
+def analyser_reponse_audit(reponse: str) -> Optional[dict]:
+    """
+    Parse la réponse JSON d'un lot et complète les champs manquants.
+    
+    Returns:
+        Rapport {"score_qualite", "problemes", "resume"}, ou None si le JSON est invalide
+    """
+    reponse_clean = clean_json_response(reponse)
+    try:
+        json_data = json.loads(reponse_clean)
+    except json.JSONDecodeError as e:
+        print(f"⚠️  JSON invalide du LLM: {e}")
+        print(f"📄 Réponse brute (premiers 300 chars): {reponse[:300]}")
+        return None
+    if not isinstance(json_data, dict):
+        return None
+    
+    missing_fields = [f for f in ("score_qualite", "problemes", "resume") if f not in json_data]
+    if missing_fields:
+        print(f"⚠️  Champs manquants dans le JSON: {missing_fields}")
+    json_data.setdefault("score_qualite", 5.0)
+    json_data.setdefault("problemes", [])
+    json_data.setdefault("resume", "Analyse partielle")
+    return json_data
+
+
+def reponse_audit_valide(reponse: str) -> bool:
+    """Indique si la réponse d'un lot est un objet JSON exploitable (sans affichage)."""
+    try:
+        return isinstance(json.loads(clean_json_response(reponse)), dict)
+    except ValueError:
+        return False
+
+
+def rapport_fallback(fichiers: List[str]) -> dict:
+    """Rapport de remplacement pour un lot dont la réponse est inexploitable."""
+    return {
+        "score_qualite": 5.0,
+        "problemes": [{
+            "fichier": fichiers[0] if fichiers else "unknown.py",
+            "ligne": 1,
+            "type": "general",
+            "severite": "majeur",
+            "description": "Erreur parsing réponse LLM - analyse manuelle requise",
+            "suggestion": "Vérifier le rapport brut dans les logs"
+        }],
+        "resume": "Erreur de parsing - rapport incomplet"
+    }
+
+
+def fusionner_audits(rapports: List[Tuple[dict, int]]) -> dict:
+    """
+    Fusionne les rapports des lots (étape reduce, sans appel LLM).
+    
+    Args:
+        rapports: (rapport, nombre de fichiers couverts) pour chaque lot
+        
+    Returns:
+        Rapport unique : problèmes dédoublonnés, score moyen pondéré par fichier
+    """
+    problemes, vus = [], set()
+    scores, poids, resumes = 0.0, 0, []
+    for rapport, nb_fichiers in rapports:
+        for prob in rapport.get("problemes", []):
+            cle = (prob.get("fichier"), prob.get("ligne"), prob.get("type"), prob.get("description"))
+            if cle not in vus:
+                vus.add(cle)
+                problemes.append(prob)
+        scores += _as_score(rapport.get("score_qualite")) * nb_fichiers
+        poids += nb_fichiers
+        resume = rapport.get("resume")
+        if resume and resume not in resumes:
+            resumes.append(resume)
+    
+    return {
+        "score_qualite": round(scores / poids, 2) if poids else 10,
+        "problemes": problemes,
+        "resume": " | ".join(resumes)[:300] if resumes else "Code conforme"
+    }
+
+
 def classify_repository_type(json_data: dict, pylint_results: list) -> list:
     """
     Classifie le type de dépôt basé sur l'analyse des problèmes.
@@ -193,7 +414,7 @@ def auditor_agent(state: AgentState) -> AgentState:
             return state
         
         # Read all code files
-        all_code = ""
+        code_files = {}
         pylint_results = []
         
         for filepath in python_files:
@@ -202,11 +423,13 @@ def auditor_agent(state: AgentState) -> AgentState:
             # Read file (relative path for file tools)
             code_content = read_file(filepath)
             if code_content:
-                all_code += f"\n\n# Fichier: {filepath}\n{code_content}\n"
-            
-            # Run pylint (needs full path from sandbox root)
-            full_path = os.path.join(target_dir, filepath)
-            pylint_result = run_pylint(full_path)
+                code_files[filepath] = code_content
+        
+        # Run pylint once on all files (needs full paths from sandbox root)
+        full_paths = {filepath: os.path.join(target_dir, filepath) for filepath in python_files}
+        pylint_batch = run_pylint_batch(list(full_paths.values()))
+        for filepath, full_path in full_paths.items():
+            pylint_result = pylint_batch.get(full_path)
             if pylint_result:
                 pylint_results.append({
                     "file": filepath,
@@ -220,149 +443,149 @@ def auditor_agent(state: AgentState) -> AgentState:
             avg_score = sum(r["score"] for r in pylint_results) / len(pylint_results)
             state["pylint_score_before"] = avg_score
         
-        # Build prompt using optimized builder
-        if USE_PROMPT_BUILDER:
-            print("📝 Utilisation du prompt builder optimisé")
-            system_prompt, user_prompt = prompt_builder.construire_prompt_auditeur(
-                code_source=all_code,
-                nom_fichier=python_files[0] if python_files else "unknown.py",
-                score_pylint=avg_score
-            )
-            full_prompt = f"{system_prompt}\n\n{user_prompt}"
-            
-            # Analyze and log prompt cost
-            cout = prompt_builder.analyser_couts(system_prompt, user_prompt, "Auditor")
-            print(f"💰 Tokens estimés: ~{cout.get('tokens_total_input', 0)} entrée, "
-                  f"~{cout.get('tokens_total_output_estime', 0)} sortie")
-        else:
-            # Fallback to enhanced prompt with repo classification
-            print("⚠️  Utilisation du prompt amélioré (fallback)")
-            full_prompt = f"""Tu es un expert Python senior en analyse de code.
-
-MISSION: Analyser du code Python et identifier les problèmes de qualité.
-
-TYPES DE PROBLÈMES:
-1. BUGS: Division par zéro, variables non définies, erreurs de types, exceptions non gérées
-2. PEP8: Nommage incorrect, lignes >79 car, imports désorganisés, espaces manquants
-3. DOCUMENTATION: Fonctions sans docstring, format non-Google Style
-4. NAMING: Variables à une lettre, noms non descriptifs
-
-FORMAT SORTIE (STRICT):
-JSON uniquement, pas de texte, pas de markdown.
-
-{{
-  "score_qualite": <0-10>,
-  "problemes": [
-    {{
-      "fichier": "nom.py",
-      "ligne": <int>,
-      "type": "bug|pep8|documentation|naming",
-      "severite": "critique|majeur|mineur",
-      "description": "<max 80 car>",
-      "suggestion": "<max 100 car>"
-    }}
-  ],
-  "resume": "<max 150 car>"
-}}
-
-RÈGLES ANTI-HALLUCINATION:
-- Ne jamais inventer de problèmes inexistants
-- Vérifier chaque numéro de ligne
-- Être factuel et précis
-- Si aucun problème: {{"score_qualite": 10, "problemes": [], "resume": "Code conforme"}}
-
-CRITÈRES SCORE:
-10: Parfait | 8-9: Mineurs | 6-7: PEP8/doc | 4-5: Bugs mineurs | 0-3: Bugs critiques
-
-PRIORITÉ: bugs > documentation > pep8 > naming
-
-CODE À ANALYSER:
-{all_code}
-
-Score Pylint actuel: {avg_score:.2f}/10 si disponible
-
-Retourne UNIQUEMENT le JSON."""
+        scores_by_file = {r["file"]: r["score"] for r in pylint_results}
         
-        # Call Gemini
-        print(f"🤖 Appel à Gemini ({DEFAULT_MODEL if not DEV_MODE else 'MOCK'})...")
+        # Static pre-audit: deterministic issues are found locally, the LLM only
+        # sees files with constructs whose correctness depends on runtime values
+        static_reports = {}
+        if STATIC_AUDIT_ENABLED:
+            for filepath, code_content in code_files.items():
+                pylint_result = pylint_batch.get(full_paths[filepath]) or {}
+                static_reports[filepath] = static_audit_file(filepath, code_content, pylint_result.get("messages"))
+        llm_candidates = [
+            filepath for filepath in code_files
+            if filepath not in static_reports or static_reports[filepath]["needs_llm"]
+        ]
+        if STATIC_AUDIT_ENABLED:
+            print(f"🧮 Pré-audit statique: {len(code_files) - len(llm_candidates)}/{len(code_files)} "
+                  f"fichier(s) traité(s) sans LLM")
         
-        # Create intelligent mock for DEV mode
-        if DEV_MODE:
-            mock_audit = MOCK_AUDIT_RESPONSE
-        else:
-            mock_audit = None
-            
-        audit_report_raw = call_gemini_with_retry(
-            full_prompt, 
-            model_name=DEFAULT_MODEL,
-            mock_response=mock_audit
-        )
+        # Findings of unchanged files are reused (mocks are never cached)
+        cached_findings = {}
+        if not DEV_MODE:
+            for filepath in llm_candidates:
+                entry = result_cache.get("audit", audit_cache_key(filepath, code_files[filepath]))
+                if entry is not None:
+                    cached_findings[filepath] = entry
+        files_to_audit = [filepath for filepath in llm_candidates if filepath not in cached_findings]
+        if cached_findings:
+            print(f"💾 Audit réutilisé pour {len(cached_findings)}/{len(llm_candidates)} fichier(s) inchangé(s)")
         
-        # Clean the JSON response
-        audit_report_clean = clean_json_response(audit_report_raw)
+        # Map: token-budgeted batches of files, audited concurrently
+        lots = decouper_en_lots({fp: code_files[fp] for fp in files_to_audit}, AUDIT_BATCH_TOKENS)
+        prompts = []
+        for lot in lots:
+            code_source = "".join(
+                f"\n\n# Fichier: {fp}\n{truncate_for_context(code_files[fp], AUDIT_BATCH_TOKENS)}\n"
+                for fp in lot
+            )
+            if STATIC_AUDIT_ENABLED:
+                code_source = STATIC_AUDIT_NOTE + code_source
+            lot_scores = [scores_by_file[fp] for fp in lot if fp in scores_by_file]
+            score_lot = sum(lot_scores) / len(lot_scores) if lot_scores else avg_score
+            prompts.append(construire_prompt_audit(code_source, lot[0], score_lot))
         
-        # Validate JSON
-        try:
-            json_data = json.loads(audit_report_clean)
-            print(f"✅ JSON valide parsé ({len(json_data.get('problemes', []))} problèmes détectés)")
-            
-            # Verify required fields
-            required_fields = ["score_qualite", "problemes", "resume"]
-            missing_fields = [f for f in required_fields if f not in json_data]
-            
-            if missing_fields:
-                print(f"⚠️  Champs manquants dans le JSON: {missing_fields}")
-                # Add default values
-                if "score_qualite" not in json_data:
-                    json_data["score_qualite"] = 5.0
-                if "problemes" not in json_data:
-                    json_data["problemes"] = []
-                if "resume" not in json_data:
-                    json_data["resume"] = "Analyse partielle"
-            
-            # ===== NOUVEAUTÉ v1.1.0: Classification du dépôt =====
-            print("\n🏷️  Classification du type de dépôt...")
-            repo_type = classify_repository_type(json_data, pylint_results)
-            json_data["repo_type"] = repo_type
-            
-            print(f"📊 Type de dépôt détecté: {repo_type}")
-            
-            # Ajouter des statistiques de classification dans les logs
-            type_stats = {}
-            for prob in json_data.get("problemes", []):
-                prob_type = prob.get("type", "unknown")
-                type_stats[prob_type] = type_stats.get(prob_type, 0) + 1
-            
-            print(f"📈 Distribution des problèmes: {type_stats}")
-            # ===================================================
-            
-            # Re-serialize with repo_type
-            audit_report_clean = json.dumps(json_data, ensure_ascii=False, indent=2)
-            audit_report = audit_report_clean
+        if lots:
+            print(f"🤖 Appel à Gemini ({DEFAULT_MODEL if not DEV_MODE else 'MOCK'}) : "
+                  f"{len(lots)} lot(s) de fichiers en parallèle...")
+            responses = call_llm_batch(
+                prompts,
+                model_name=DEFAULT_MODEL,
+                mock_responses=[MOCK_AUDIT_RESPONSE] * len(lots) if DEV_MODE else None,
+                return_exceptions=True,
+                validate=reponse_audit_valide  # un JSON invalide n'est pas rejoué depuis le cache
+            )
+            if not cached_findings and all(isinstance(r, Exception) for r in responses):
+                raise responses[0]
+        else:
+            print("💾 Aucun fichier à soumettre au LLM (cache / pré-audit statique): appel évité")
+            responses = []
+        
+        # Reduce: local merge of the batch reports (+ reused findings), then one classification
+        rapports = []
+        lots_invalides = 0
+        for index, (lot, prompt, response) in enumerate(zip(lots, prompts, responses)):
+            rapport = None
+            if isinstance(response, Exception):
+                print(f"⚠️  Échec de l'audit du lot {lot[0]}...: {response}")
+            else:
+                rapport = analyser_reponse_audit(response)
             
-        except json.JSONDecodeError as e:
-            print(f"⚠️  JSON invalide du LLM: {e}")
-            print(f"📄 Réponse brute (premiers 300 chars): {audit_report_raw[:300]}")
-            print(f"📄 Réponse nettoyée (premiers 300 chars): {audit_report_clean[:300]}")
+            # Chaque appel LLM du map est journalisé avec son propre prompt et sa réponse brute
+            log_experiment(
+                agent_name="Auditor",
+                model_used=DEFAULT_MODEL if not DEV_MODE else "MOCK-DEV",
+                action=ActionType.ANALYSIS,
+                details={
+                    "audit_batch": index + 1,
+                    "audit_batches": len(lots),
+                    "files_analyzed": lot,
+                    "input_prompt": prompt,
+                    "output_response": f"ERROR: {response}" if isinstance(response, Exception) else response,
+                    "json_valid": rapport is not None,
+                    "dev_mode": DEV_MODE
+                },
+                status="FAILED" if isinstance(response, Exception) else "SUCCESS"
+            )
             
-            # Create fallback JSON
-            fallback_json = {
-                "score_qualite": 5.0,
-                "problemes": [{
-                    "fichier": python_files[0] if python_files else "unknown.py",
-                    "ligne": 1,
-                    "type": "general",
-                    "severite": "majeur",
-                    "description": "Erreur parsing réponse LLM - analyse manuelle requise",
-                    "suggestion": "Vérifier le rapport brut dans les logs"
-                }],
-                "resume": "Erreur de parsing - rapport incomplet",
-                "repo_type": "MIXED"  # Default safe value
-            }
-            audit_report = json.dumps(fallback_json, ensure_ascii=False, indent=2)
-            print(f"⚠️  Utilisation d'un rapport fallback")
-        
-        # Log this interaction
+            if rapport is None:
+                lots_invalides += 1
+                rapport = rapport_fallback(lot)
+            else:
+                if STATIC_AUDIT_ENABLED:
+                    # Style, naming and documentation come from the static engine
+                    rapport["problemes"] = [p for p in rapport["problemes"] if p.get("type") not in STATIC_TYPES]
+                if not DEV_MODE:
+                    for filepath in lot:
+                        result_cache.put("audit", audit_cache_key(filepath, code_files[filepath]), {
+                            "score_qualite": rapport["score_qualite"],
+                            "problemes": [p for p in rapport["problemes"] if probleme_concerne(p, filepath)]
+                        })
+            rapports.append((rapport, len(lot)))
+        
+        for entry in cached_findings.values():
+            rapports.append((entry, 1))
+        
+        # Static findings: files audited by the LLM are already scored by it (weight 0)
+        for filepath, static_report in static_reports.items():
+            problemes = static_report["problemes"]
+            rapports.append(({
+                "score_qualite": scores_by_file.get(filepath, static_score(problemes)),
+                "problemes": problemes,
+                "resume": "Problèmes détectés par l'analyse statique" if problemes else ""
+            }, 0 if static_report["needs_llm"] else 1))
+        
+        json_data = fusionner_audits(rapports)
+        if not lots:
+            json_data["resume"] = f"Audit local sans appel LLM ({len(json_data['problemes'])} problème(s))"
+        print(f"✅ Audit fusionné: {len(json_data['problemes'])} problèmes détectés "
+              f"({len(lots)} lot(s), {lots_invalides} invalide(s))")
+        
+        # ===== NOUVEAUTÉ v1.1.0: Classification du dépôt =====
+        print("\n🏷️  Classification du type de dépôt...")
+        repo_type = classify_repository_type(json_data, pylint_results)
+        if lots_invalides and repo_type == ["CLEAN"]:
+            repo_type = ["MIXED"]  # Unparsed batches: never claim the code is clean
+        json_data["repo_type"] = repo_type
+        
+        print(f"📊 Type de dépôt détecté: {repo_type}")
+        
+        # Ajouter des statistiques de classification dans les logs
+        type_stats = {}
+        for prob in json_data.get("problemes", []):
+            prob_type = prob.get("type", "unknown")
+            type_stats[prob_type] = type_stats.get(prob_type, 0) + 1
+        
+        print(f"📈 Distribution des problèmes: {type_stats}")
+        # ===================================================
+        
+        audit_report = json.dumps(json_data, ensure_ascii=False, indent=2)
+        if lots:
+            full_prompt = f"Fusion locale des rapports de {len(lots)} lot(s) (prompts journalisés par lot)"
+        else:
+            full_prompt = "Audit servi par le cache de résultats"
+        
+        # Log the reduce step (merged report and classification)
         log_experiment(
             agent_name="Auditor",
             model_used=DEFAULT_MODEL if not DEV_MODE else "MOCK-DEV",
@@ -372,10 +595,13 @@ Retourne UNIQUEMENT le JSON."""
                 "input_prompt": full_prompt[:1000] + "..." if len(full_prompt) > 1000 else full_prompt,
                 "output_response": audit_report[:1000] + "..." if len(audit_report) > 1000 else audit_report,
                 "pylint_scores": pylint_results,
-                "code_length": len(all_code),
+                "code_length": sum(len(code) for code in code_files.values()),
+                "audit_batches": len(lots),
+                "cached_files": len(cached_findings),
+                "static_only_files": len(code_files) - len(llm_candidates),
                 "dev_mode": DEV_MODE,
                 "used_prompt_builder": USE_PROMPT_BUILDER,
-                "json_valid": True,
+                "json_valid": lots_invalides == 0,
                 "repo_type": json_data.get("repo_type", "UNKNOWN"),  # Log the classification
                 "version": "1.1.0"
             },
@@ -384,7 +610,9 @@ Retourne UNIQUEMENT le JSON."""
         
         # Update state
         state["audit_report"] = audit_report
+        state["issue_store"] = IssueStore.from_problemes(json_data["problemes"], python_files)
         state["iteration_count"] = 1
+        state["file_status"] = initial_file_status(python_files)
         state["repo_type"] = json_data.get("repo_type", "MIXED")  # Store in state
         
         print("✅ Analyse de l'auditeur terminée")
@@ -11,19 +11,23 @@ from src.tools.tool_adapter import (
     read_file,
     run_pytest,
     validate_test_syntax,
-    run_pylint,
+    run_pylint_batch,
+    compact_test_results,
+    summarize_test_results,
 )
 
 from src.config import DEFAULT_MODEL, DEV_MODE
+from src.utils.file_status import implicated_files, FILE_CLEAN, FILE_FAILING
+from src.utils.issue_store import issue_store_from_state
+from src.utils.regression_suite import RegressionSuite
+from src.utils.workspace import workspace_dir
 
-# Import the optimized prompt builder
+# Import the optimized prompt builder (its tokenizer and prompts load on first use)
 try:
     from src.prompts.prompt_builder import prompt_builder
     USE_PROMPT_BUILDER = True
-    print("✅ Utilisation du prompt builder optimisé")
-except ImportError as e:
+except ImportError:
     USE_PROMPT_BUILDER = False
-    print(f"⚠️  Prompt builder non disponible: {e}")
 
 
 def extract_functions_from_code(code: str) -> list:
@@ -70,14 +74,21 @@ def build_module_documentation(code_files: dict) -> str:
 
 def generate_tests_with_llm(
     code_files: dict,
-    audit_report: str,
+    issues_summary: str,
     target_dir: str,
     iteration: int,
     repo_type: list = None,
-    previous_test_results: str = None
+    previous_test_results: str = None,
+    cibles: list = None,
+    context_files: dict = None
 ) -> str:
     """
     Génère des tests unitaires intelligents via LLM.
+    
+    Args:
+        cibles: Définitions à couvrir ('module.nom') ; None = tout le code fourni
+        context_files: {fichier: contenu} de tout le dépôt pour la documentation
+            des modules (mode --since) ; None = code_files
     """
     files_summary = "\n\n".join([
         f"# Fichier: {name}\n{content[:500]}..." 
@@ -85,9 +96,16 @@ def generate_tests_with_llm(
         for name, content in code_files.items()
     ])
     
-    module_doc = build_module_documentation(code_files)
+    module_doc = build_module_documentation(context_files or code_files)
     repo_type_str = ', '.join(repo_type) if repo_type else 'Non spécifié'
     
+    cibles_section = ""
+    if cibles:
+        cibles_section = (
+            "DÉFINITIONS À TESTER (uniquement celles-ci, les autres ont déjà des tests valides):\n"
+            + "\n".join(f"   - {cible}" for cible in cibles) + "\n"
+        )
+    
     feedback_section = ""
     if previous_test_results and iteration > 1:
         feedback_section = f"""
@@ -117,12 +135,12 @@ MISSION: Générer des tests unitaires INTELLIGENTS pour valider le code corrig
 {feedback_section}
 
 {module_doc}
-
+{cibles_section}
 CODE À TESTER:
 {files_summary}
 
 RAPPORT D'AUDIT (problèmes détectés):
-{audit_report[:1000] if len(audit_report) > 1000 else audit_report}
+{issues_summary}
 
 Type de problèmes à résoudre: {repo_type_str}
 
@@ -183,7 +201,59 @@ def test_process_string():
 '''
         return call_gemini_with_retry(prompt, mock_response=mock_test)
     
-    return call_gemini_with_retry(prompt, model_name=DEFAULT_MODEL)
+    # Une réponse invalide n'est pas mise en cache : la nouvelle tentative interroge le LLM
+    return call_gemini_with_retry(prompt, model_name=DEFAULT_MODEL, validate=reponse_tests_valide)
+
+
+# Test minimal utilisé quand le LLM ne produit pas de tests valides
+FALLBACK_TEST = """import pytest
+
+def test_basic_imports_compile():
+    \"\"\"Test basique - vérifier que les modules s'importent.\"\"\"
+    assert True
+"""
+
+MAX_TEST_RETRIES = 2
+
+
+def nettoyer_reponse_tests(test_content: str) -> str:
+    """Retire les balises markdown éventuelles autour du code de test."""
+    test_content_clean = test_content.strip()
+    if "```python" in test_content_clean:
+        test_content_clean = test_content_clean.split("```python")[1].split("```")[0].strip()
+    elif "```" in test_content_clean:
+        parts = test_content_clean.split("```")
+        if len(parts) >= 3:
+            test_content_clean = parts[1].strip()
+    return test_content_clean
+
+
+def reponse_tests_valide(reponse: str) -> bool:
+    """Indique si la réponse du LLM contient un fichier de test syntaxiquement valide."""
+    return validate_test_syntax(nettoyer_reponse_tests(reponse))["valid"]
+
+
+def generer_tests_valides(**kwargs) -> tuple:
+    """
+    Génère des tests via generate_tests_with_llm, avec MAX_TEST_RETRIES
+    nouvelles tentatives si la syntaxe est invalide.
+    
+    Returns:
+        (réponse brute, code de test nettoyé, résultat de validate_test_syntax)
+    """
+    test_content = generate_tests_with_llm(**kwargs)
+    test_content_clean = nettoyer_reponse_tests(test_content)
+    validation = validate_test_syntax(test_content_clean)
+    
+    test_retry = 0
+    while not validation["valid"] and test_retry < MAX_TEST_RETRIES:
+        print(f"  🔄 Retry génération tests (tentative {test_retry + 1}/{MAX_TEST_RETRIES})...")
+        test_content = generate_tests_with_llm(**kwargs)
+        test_content_clean = nettoyer_reponse_tests(test_content)
+        validation = validate_test_syntax(test_content_clean)
+        test_retry += 1
+    
+    return test_content, test_content_clean, validation
 
 
 def judge_agent(state: AgentState) -> AgentState:
@@ -198,6 +268,8 @@ def judge_agent(state: AgentState) -> AgentState:
         python_files = state["python_files"]
         fixed_code = state.get("fixed_code", {})
         audit_report = state.get("audit_report", "")
+        issue_store = issue_store_from_state(state)
+        issues_summary = issue_store.summary(max_chars=1000) if issue_store else (audit_report or "")[:1000]
         iteration = state["iteration_count"]
         repo_type = state.get("repo_type", [])
         
@@ -214,10 +286,16 @@ def judge_agent(state: AgentState) -> AgentState:
                     fixed_code[filepath] = content
         
         # ✅ Extract feedback from previous test iterations
+        previous_results = state.get("test_results")
         previous_test_output = state.get("test_output", "")
         test_failures_summary = ""
         
-        if iteration > 1 and previous_test_output:
+        if iteration > 1 and previous_results:
+            print(f"  📜 Analyse des résultats de l'itération précédente...")
+            test_failures_summary = summarize_test_results(previous_results, max_failures=12, max_tracebacks=2)
+            print(f"  📋 Feedback intégré: {len(previous_results.get('failures', []))} échec(s) structuré(s)")
+        elif iteration > 1 and previous_test_output:
+            # État issu d'une ancienne version (sortie brute uniquement)
             print(f"  📜 Analyse des résultats de l'itération précédente...")
             
             error_lines = [
@@ -244,69 +322,58 @@ def judge_agent(state: AgentState) -> AgentState:
                 test_failures_summary = "\n".join(feedback_parts)
                 print(f"  📋 Feedback intégré: {len(feedback_parts)} lignes d'erreur/info")
         
-        # 1. GENERATE TESTS via LLM
-        print("\n📝 Génération des tests unitaires...")
-        test_content = generate_tests_with_llm(
-            code_files=fixed_code,
-            audit_report=audit_report,
-            target_dir=target_dir,
-            iteration=iteration,
-            repo_type=repo_type,
-            previous_test_results=test_failures_summary
-        )
+        # Mode --since : tout le dépôt documente les modules importables par les tests
+        contexte = None
+        if state.get("context_files"):
+            contexte = dict(fixed_code)
+            for filepath in state["context_files"]:
+                if filepath not in contexte:
+                    content = read_file(filepath)
+                    if content:
+                        contexte[filepath] = content
         
-        # Clean response (remove markdown if present)
-        test_content_clean = test_content.strip()
-        if "```python" in test_content_clean:
-            test_content_clean = test_content_clean.split("```python")[1].split("```")[0].strip()
-        elif "```" in test_content_clean:
-            parts = test_content_clean.split("```")
-            if len(parts) >= 3:
-                test_content_clean = parts[1].strip()
+        # 1. TESTS: regression suite + new tests for changed definitions only
+        suite = RegressionSuite(fixed_code, target_dir)
+        tests_reutilises = suite.reused
+        cibles = suite.stale_targets()
+        if tests_reutilises:
+            print(f"♻️  {tests_reutilises} test(s) repris de la suite de régression")
         
-        # Validate test syntax
-        validation = validate_test_syntax(test_content_clean)
-
-        MAX_TEST_RETRIES = 2
-        test_retry = 0
-
-        while not validation["valid"] and test_retry < MAX_TEST_RETRIES:
-            print(f"  🔄 Retry génération tests (tentative {test_retry + 1}/{MAX_TEST_RETRIES})...")
-
-            test_content = generate_tests_with_llm(
-                code_files=fixed_code,
-                audit_report=audit_report,
+        llm_appele = False
+        test_content_clean = ""
+        if cibles or not tests_reutilises:
+            print(f"\n📝 Génération des tests unitaires ({len(cibles)} définition(s) à couvrir)...")
+            code_cible = {filepath: fixed_code[filepath] for filepath in suite.stale_files()} or fixed_code
+            test_content, test_content_clean, validation = generer_tests_valides(
+                code_files=code_cible,
+                issues_summary=issues_summary,
                 target_dir=target_dir,
                 iteration=iteration,
                 repo_type=repo_type,
-                previous_test_results=test_failures_summary
+                previous_test_results=test_failures_summary,
+                cibles=cibles or None,
+                context_files=contexte
             )
-
-            test_content_clean = test_content.strip()
-            if "```python" in test_content_clean:
-                test_content_clean = test_content_clean.split("```python")[1].split("```")[0].strip()
-            elif "```" in test_content_clean:
-                parts = test_content_clean.split("```")
-                if len(parts) >= 3:
-                    test_content_clean = parts[1].strip()
-
-            validation = validate_test_syntax(test_content_clean)
-            test_retry += 1
-
-        # If still invalid after retries -> fallback minimal test but mark fallback_used
-        if not validation["valid"]:
-            print(f"⚠️  Tests générés invalides après {MAX_TEST_RETRIES} tentatives: {validation['error']}")
-            print(f"📄 Contenu reçu (200 premiers chars): {test_content[:200]}")
-            fallback_used = True
-            test_content_clean = """import pytest
-
-def test_basic_imports_compile():
-    \"\"\"Test basique - vérifier que les modules s'importent.\"\"\"
-    assert True
-"""
+            llm_appele = True
+            
+            # If still invalid after retries -> fallback minimal test but mark fallback_used
+            if validation["valid"]:
+                suite.add_generated(test_content_clean)
+            else:
+                print(f"⚠️  Tests générés invalides après {MAX_TEST_RETRIES} tentatives: {validation['error']}")
+                print(f"📄 Contenu reçu (200 premiers chars): {test_content[:200]}")
+                fallback_used = True
+                test_content_clean = FALLBACK_TEST
+        else:
+            print("✅ Aucune définition modifiée: tests de régression réutilisés sans appel LLM")
+        
+        if suite.units:
+            test_content_clean = suite.render()
+        
         # 2. WRITE TEST FILE
         test_filename = f"test_iteration_{iteration}.py"
-        test_filepath = os.path.join(target_dir, test_filename)
+        # Écrit dans l'espace de travail : jamais audité ni corrigé par une exécution suivante
+        test_filepath = os.path.join(workspace_dir(target_dir), test_filename)
         
         write_success = write_test_file(test_filepath, test_content_clean)
         
@@ -314,18 +381,31 @@ def test_basic_imports_compile():
             print("❌ Échec création fichier de test")
             state["test_passed"] = False
             state["test_output"] = "Échec création fichier de test"
+            state["test_results"] = None
             return state
         
         # 3. RUN TESTS
         print(f"\n🧪 Exécution des tests: {test_filename}")
-        test_results = run_pytest(test_filepath, list(fixed_code.keys()))
+        test_results = run_pytest(test_filepath, list(fixed_code.keys()), import_root=target_dir)
+        resultats_compacts = compact_test_results(test_results)
+        
+        # Les tests qui passent rejoignent la suite de régression
+        resultats_tests = suite.record_results(resultats_compacts["outcomes"] or test_results.get("output", ""))
+        if suite.regressions:
+            print(f"  ⚠️  Régression: {len(suite.regressions)} test(s) de la suite échouent: {', '.join(suite.regressions)}")
+        if suite.evicted:
+            print(f"  🗑️  {len(suite.evicted)} test(s) en échec répété retirés de la suite: {', '.join(suite.evicted)}")
+        suite_path = suite.export(target_dir, resultats_tests)
+        if suite_path:
+            print(f"  💾 Suite de régression: {sum(resultats_tests.values())} test(s) valide(s) → {suite_path}")
         
         # 4. CALCULATE NEW PYLINT SCORE
         print("\n📊 Calcul du score Pylint après corrections...")
         pylint_scores = {}
-        for filepath in python_files:
-            full_path = os.path.join(target_dir, filepath)
-            pylint_result = run_pylint(full_path)
+        full_paths = {filepath: os.path.join(target_dir, filepath) for filepath in python_files}
+        pylint_batch = run_pylint_batch(list(full_paths.values()))
+        for filepath, full_path in full_paths.items():
+            pylint_result = pylint_batch.get(full_path)
             if pylint_result:
                 pylint_scores[filepath] = pylint_result["score"]
                 print(f"  {filepath}: {pylint_result['score']:.1f}/10")
@@ -347,7 +427,8 @@ def test_basic_imports_compile():
             print("⚠️ Test fallback utilisé — le résultat ne constitue pas une validation réelle.")
         
         print(f"\n📋 Résultats:")
-        print(f"  Tests: {passed_tests}/{total_tests} passés ({pass_rate:.1f}%)")
+        print(f"  Tests: {passed_tests}/{total_tests} passés ({pass_rate:.1f}%) "
+              f"en {test_results.get('execution_time', 0.0):.1f}s sur {test_results.get('shards', 1)} shard(s)")
         print(f"  Score Pylint: {avg_score_after:.2f}/10" if avg_score_after else "  Score Pylint: N/A")
         
         # 6. DECISION
@@ -363,7 +444,24 @@ def test_basic_imports_compile():
             decision = "ECHEC"
         
         # 7. STORE RESULTS
-        state["test_output"] = test_results.get("output", "")
+        state["test_results"] = resultats_compacts
+        state["test_output"] = summarize_test_results(resultats_compacts)
+        
+        # Statut par fichier : seuls les fichiers impliqués seront re-corrigés
+        fichiers_impliques = implicated_files(
+            python_files,
+            test_output=test_results.get("output", ""),
+            code_files=fixed_code,
+            pylint_scores=pylint_scores,
+            tests_failed=not tests_passed and pass_rate < 100,
+            failures=resultats_compacts["failures"] if resultats_compacts["outcomes"] else None
+        )
+        file_status = dict(state.get("file_status") or {})
+        for filepath in python_files:
+            file_status[filepath] = FILE_FAILING if filepath in fichiers_impliques else FILE_CLEAN
+        state["file_status"] = file_status
+        if decision == "ECHEC":
+            print(f"  🎯 Fichiers impliqués dans l'échec: {len(fichiers_impliques)}/{len(python_files)}")
         
         # 8. LOG EXPERIMENT
         log_experiment(
@@ -383,7 +481,12 @@ def test_basic_imports_compile():
                 "dev_mode": DEV_MODE,
                 "used_previous_feedback": bool(test_failures_summary),
                 "module_aware": True,
-                "fallback_used": fallback_used
+                "fallback_used": fallback_used,
+                "llm_test_generation": llm_appele,
+                "reused_tests": tests_reutilises,
+                "stale_definitions": len(cibles),
+                "test_shards": test_results.get("shards", 1),
+                "implicated_files": sorted(fichiers_impliques)
             },
             status="SUCCESS" if tests_passed else "FAILED"
         )
@@ -64,4 +64,86 @@ MOCK_AUDIT_RESPONSE = """{
 
 # Rate limiting
 MAX_RETRIES = 3
-RETRY_DELAY = 60
\ No newline at end of file
+RETRY_DELAY = 60
+# Async LLM client: maximum number of in-flight requests per event loop
+LLM_MAX_CONCURRENCY = int(os.getenv('LLM_MAX_CONCURRENCY', '4'))
+
+# Batch mode (--targets/--manifest): repos processed at once (0 = one per CPU) and
+# maximum LLM requests in flight across all batch processes
+BATCH_WORKERS = int(os.getenv('BATCH_WORKERS', '0'))
+LLM_GLOBAL_CONCURRENCY = int(os.getenv('LLM_GLOBAL_CONCURRENCY', str(LLM_MAX_CONCURRENCY)))
+
+# Local cache/state directory (LLM cache, lint cache, checkpoints, ...)
+CACHE_DIR = os.getenv('SWARM_CACHE_DIR', '.swarm_cache')
+
+# Adaptive rate limiter (token buckets shared by every run using the same API key)
+RATE_LIMIT_RPM = float(os.getenv('RATE_LIMIT_RPM', '15'))          # requests per minute
+RATE_LIMIT_TPM = float(os.getenv('RATE_LIMIT_TPM', '250000'))      # tokens per minute
+RATE_LIMIT_DB = os.getenv(
+    'RATE_LIMIT_DB',
+    os.path.join(os.path.expanduser('~'), '.refactoring_swarm', 'rate_limiter.db')
+)
+
+# Persistent LLM response cache (SQLite WAL, shared by parallel runs)
+LLM_CACHE_DB = os.getenv('LLM_CACHE_DB', os.path.join(CACHE_DIR, 'llm_cache.db'))
+LLM_CACHE_MAX_MB = float(os.getenv('LLM_CACHE_MAX_MB', '200'))
+LLM_CACHE_MAX_AGE_DAYS = float(os.getenv('LLM_CACHE_MAX_AGE_DAYS', '30'))
+LLM_CACHE_BYPASS = os.getenv('LLM_CACHE_BYPASS', 'false').lower() == 'true'
+
+# Fixer: number of files corrected concurrently (1 = sequential)
+FIXER_MAX_WORKERS = int(os.getenv('FIXER_MAX_WORKERS', '4'))
+
+# Incremental iterations: files scoring below this pylint score are re-fixed
+FILE_SCORE_THRESHOLD = float(os.getenv('FILE_SCORE_THRESHOLD', '7.0'))
+
+# Workflow checkpoints (resume with: python main.py --resume <run_id>)
+CHECKPOINT_DB = os.getenv('CHECKPOINT_DB', os.path.join(CACHE_DIR, 'checkpoints.db'))
+
+# Durable job queue (python main.py submit / worker). Workers on several hosts can
+# share the file; use JOB_QUEUE_JOURNAL_MODE=DELETE on network filesystems (no WAL there)
+JOB_QUEUE_DB = os.getenv('JOB_QUEUE_DB', os.path.join(CACHE_DIR, 'jobs.db'))
+JOB_QUEUE_JOURNAL_MODE = os.getenv('JOB_QUEUE_JOURNAL_MODE', 'WAL')
+JOB_LEASE_SECONDS = float(os.getenv('JOB_LEASE_SECONDS', '600'))   # renewed by a heartbeat while a job runs
+JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', '3'))
+JOB_RETRY_DELAY = float(os.getenv('JOB_RETRY_DELAY', '30'))        # doubled after each failed attempt
+JOB_POLL_INTERVAL = float(os.getenv('JOB_POLL_INTERVAL', '2'))
+
+# Server mode (python main.py serve): local API address and worker processes
+SERVER_HOST = os.getenv('SERVER_HOST', '127.0.0.1')
+SERVER_PORT = int(os.getenv('SERVER_PORT', '8765'))
+SERVER_WORKERS = int(os.getenv('SERVER_WORKERS', '2'))
+
+# Pylint: parallel jobs for batch analysis (0 = one per CPU)
+PYLINT_JOBS = int(os.getenv('PYLINT_JOBS', '0'))
+
+# Persistent lint server (keeps pylint/astroid warm between iterations)
+LINT_SERVER_ENABLED = os.getenv('LINT_SERVER_ENABLED', 'true').lower() == 'true'
+LINT_SERVER_TIMEOUT = float(os.getenv('LINT_SERVER_TIMEOUT', '300'))
+
+# Warm pytest pool (test runs execute in forks of a pytest-initialized process)
+PYTEST_POOL_ENABLED = os.getenv('PYTEST_POOL_ENABLED', 'true').lower() == 'true'
+
+# Sharded test execution: parallel shards (0 = one per CPU core) and per-test timeout (seconds)
+PYTEST_WORKERS = int(os.getenv('PYTEST_WORKERS', '0')) or (os.cpu_count() or 1)
+PYTEST_TEST_TIMEOUT = float(os.getenv('PYTEST_TEST_TIMEOUT', '10'))
+
+# Persistent cache of per-file analysis results (pylint, audit findings)
+RESULT_CACHE_DB = os.getenv('RESULT_CACHE_DB', os.path.join(CACHE_DIR, 'results.db'))
+RESULT_CACHE_MAX_AGE_DAYS = float(os.getenv('RESULT_CACHE_MAX_AGE_DAYS', '30'))
+RESULT_CACHE_BYPASS = os.getenv('RESULT_CACHE_BYPASS', 'false').lower() == 'true'
+
+# Token counting: memoized counts kept in memory, and the chars/token ratio of the
+# fallback estimator, calibrated from the token usage reported by the API
+TOKEN_COUNT_CACHE_SIZE = int(os.getenv('TOKEN_COUNT_CACHE_SIZE', '4096'))
+TOKEN_CALIBRATION_FILE = os.getenv('TOKEN_CALIBRATION_FILE', os.path.join(CACHE_DIR, 'token_calibration.json'))
+
+# Map-reduce audit: maximum tokens of source code per audit prompt
+AUDIT_BATCH_TOKENS = int(os.getenv('AUDIT_BATCH_TOKENS', '12000'))
+
+# Static pre-audit (ast + pylint): style/naming/docs found locally, LLM only for risky files
+STATIC_AUDIT_ENABLED = os.getenv('STATIC_AUDIT_ENABLED', 'true').lower() == 'true'
+
+# Workspace for generated artifacts (judge tests, scratch files), kept out of the target tree
+WORKSPACE_DIR = os.getenv('WORKSPACE_DIR', os.path.join(CACHE_DIR, 'workspace'))
+# Extra glob patterns excluded from file discovery (comma-separated, e.g. "migrations,*_pb2.py")
+DISCOVERY_EXCLUDE = [p.strip() for p in os.getenv('DISCOVERY_EXCLUDE', '').split(',') if p.strip()]
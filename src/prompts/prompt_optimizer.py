@@ -3,8 +3,13 @@ Optimisation de la consommation de tokens.
 Responsabilité 2 : Optimiser les prompts pour minimiser le coût en tokens.
 """
 
-import tiktoken
-from typing import Optional
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import List, Optional
+
+from src.config import TOKEN_COUNT_CACHE_SIZE
+from src.utils.token_estimator import token_estimator
 
 
 class PromptOptimizer:
@@ -12,22 +17,118 @@ class PromptOptimizer:
     Optimise les prompts pour réduire la consommation de tokens.
     """
     
-    def __init__(self):
-        """Initialise l'optimiseur avec l'encodeur tiktoken."""
-        # Utiliser l'encodeur compatible avec la plupart des modèles
-        self.encoder = tiktoken.get_encoding("cl100k_base")
+    def __init__(self, cache_size: int = TOKEN_COUNT_CACHE_SIZE):
+        """
+        Initialise l'optimiseur (l'encodeur tiktoken est chargé au premier usage).
+        
+        Args:
+            cache_size: Nombre de comptages mémorisés (LRU, clé = empreinte du texte)
+        """
+        self._encoder = None
+        self._encoder_lock = threading.Lock()
+        self.cache_size = cache_size
+        self._counts: "OrderedDict[bytes, int]" = OrderedDict()
+        self._counts_lock = threading.Lock()
+    
+    @property
+    def encoder(self):
+        """
+        Encodeur tiktoken, chargé au premier accès : get_encoding lit (voire
+        télécharge) le vocabulaire, ce qui ne doit pas se faire à l'import.
+        
+        Returns:
+            L'encodeur, ou None si tiktoken ou son vocabulaire est indisponible
+            (hors ligne) : les comptages passent alors par l'estimateur calibré
+        """
+        if self._encoder is None:
+            with self._encoder_lock:
+                if self._encoder is None:
+                    try:
+                        import tiktoken
+                        # Utiliser l'encodeur compatible avec la plupart des modèles
+                        self._encoder = tiktoken.get_encoding("cl100k_base")
+                    except Exception as e:
+                        print(f"⚠️  Encodeur tiktoken indisponible ({type(e).__name__}) : estimation calibrée utilisée")
+                        self._encoder = False
+        return self._encoder if self._encoder is not False else None
+    
+    @staticmethod
+    def _cle(texte: str) -> bytes:
+        return hashlib.blake2b(texte.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+    
+    def _lire_cache(self, cle: bytes) -> Optional[int]:
+        with self._counts_lock:
+            count = self._counts.get(cle)
+            if count is not None:
+                self._counts.move_to_end(cle)
+            return count
+    
+    def _ecrire_cache(self, cle: bytes, count: int):
+        with self._counts_lock:
+            self._counts[cle] = count
+            self._counts.move_to_end(cle)
+            while len(self._counts) > self.cache_size:
+                self._counts.popitem(last=False)
     
     def compter_tokens(self, texte: str) -> int:
         """
         Compte le nombre de tokens dans un texte.
         
+        Le résultat est mémorisé par empreinte du texte : un texte déjà
+        compté (code inchangé entre deux itérations) n'est pas ré-encodé.
+        
         Args:
             texte: Le texte à analyser
         
         Returns:
-            Nombre de tokens
+            Nombre de tokens (tiktoken, ou estimation calibrée hors ligne)
+        """
+        cle = self._cle(texte)
+        count = self._lire_cache(cle)
+        if count is None:
+            encoder = self.encoder
+            count = len(encoder.encode(texte)) if encoder is not None else token_estimator.estimate(texte)
+            self._ecrire_cache(cle, count)
+        return count
+    
+    def compter_tokens_batch(self, textes: List[str]) -> List[int]:
+        """
+        Compte les tokens de plusieurs textes en un seul appel.
+        
+        Les textes déjà comptés viennent du cache ; les autres sont encodés
+        ensemble (tiktoken encode_batch, multi-thread).
+        
+        Returns:
+            Nombres de tokens, dans l'ordre de textes
+        """
+        cles = [self._cle(texte) for texte in textes]
+        counts = [self._lire_cache(cle) for cle in cles]
+        manquants = {}
+        for index, count in enumerate(counts):
+            if count is None:
+                manquants.setdefault(cles[index], index)
+        if manquants:
+            indices = list(manquants.values())
+            encoder = self.encoder
+            if encoder is not None:
+                nouveaux = [len(tokens) for tokens in encoder.encode_batch([textes[i] for i in indices])]
+            else:
+                nouveaux = [token_estimator.estimate(textes[i]) for i in indices]
+            for index, count in zip(indices, nouveaux):
+                self._ecrire_cache(cles[index], count)
+            calcules = dict(zip(manquants, nouveaux))
+            counts = [count if count is not None else calcules[cle] for cle, count in zip(cles, counts)]
+        return counts
+    
+    def compter_tokens_systeme(self, system_prompt: str) -> int:
+        """
+        Tokens d'un prompt système, comptés une seule fois par contenu.
+        
+        Passe par le même cache LRU (borné, protégé par un verrou) que
+        compter_tokens : relu à chaque prompt, il reste parmi les entrées
+        les plus récentes et n'est pas évincé.
         """
-        return len(self.encoder.encode(texte))
+        return self.compter_tokens(system_prompt)
     
     def analyser_prompt(
         self, 
@@ -48,7 +149,7 @@ class PromptOptimizer:
         Returns:
             Dictionnaire avec statistiques et coût estimé
         """
-        tokens_system = self.compter_tokens(system_prompt)
+        tokens_system = self.compter_tokens_systeme(system_prompt)
         tokens_user = self.compter_tokens(user_prompt)
         tokens_total_input = tokens_system + tokens_user
         
@@ -1,5 +1,7 @@
 from typing import TypedDict, List, Dict, Optional
 
+from src.utils.issue_store import IssueStore
+
 
 
 # This is the primary version of the state used by all agents.
@@ -13,21 +15,25 @@ class AgentState(TypedDict):
     target_dir: str                    # Directory containing code to refactor
     
     # File Management
-    python_files: List[str]            # List of .py files found
+    python_files: List[str]            # List of .py files to process (changed files with --since)
+    context_files: Optional[List[str]]  # Every .py file of the repo, for context (None = python_files)
     current_file: Optional[str]        # File currently being processed
     
     # Auditor Output
     audit_report: Optional[str]        # Full analysis from Auditor
     issues_found: List[Dict]           # Structured list of issues
+    issue_store: Optional[IssueStore]  # Issues indexed by file/type/severity (see issue_store.py)
     pylint_score_before: Optional[float]  # Initial quality score
     
     # Fixer Output
     fixed_code: Optional[Dict[str, str]]  # {filename: fixed_code_content}
     changes_made: List[str]            # Description of changes
+    file_status: Dict[str, str]        # {filename: "clean" | "fixed" | "failing" | "untouched"}
     
     # Judge Output
     test_passed: bool                  # Did pytest pass?
-    test_output: Optional[str]         # Pytest results
+    test_output: Optional[str]         # Compact pytest summary (see summarize_test_results)
+    test_results: Optional[Dict]       # Structured pytest results: counts, outcomes, failures
     pylint_score_after: Optional[float]   # Final quality score
     
     # Loop Control
@@ -35,4 +41,8 @@ class AgentState(TypedDict):
     status: str                        # "running", "success", "failed", "max_iterations"
     error_message: Optional[str]       # If something goes wrong
     repo_type: Optional[List[str]]  # ← ADD THIS
-    # I want to make this field as an array of strings
\ No newline at end of file
+    # I want to make this field as an array of strings
+    
+    # Execution Settings
+    run_id: Optional[str]              # Checkpoint run identifier (see --resume)
+    fixer_workers: Optional[int]       # Files fixed concurrently (None = config default)
\ No newline at end of file
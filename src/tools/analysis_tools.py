@@ -1,6 +1,8 @@
+import ast
+import io
+import json
+import os
 import re
-import subprocess
-import sys
 
 
 
@@ -47,41 +49,247 @@ def parse_pylint_messages(stdout: str) -> dict:
     }
 
 
-def run_pylint(filepath:str) -> dict:
+# Pylint message categories, keyed by the JSON reporter "type" field
+_CATEGORY_BUCKETS = {
+    "error": "errors",
+    "fatal": "errors",
+    "warning": "warnings",
+    "convention": "conventions",
+    "refactor": "conventions",  # Treat refactor as convention
+}
+
+
+def _module_score(module_stats: dict) -> float:
+    """
+    Per-module score using pylint's default evaluation formula:
+    10 - ((5 * error + warning + refactor + convention) / statement) * 10
+    """
+    if module_stats.get("fatal", 0):
+        return 0.0
+    statements = module_stats.get("statement", 0)
+    weighted = (
+        5 * module_stats.get("error", 0)
+        + module_stats.get("warning", 0)
+        + module_stats.get("refactor", 0)
+        + module_stats.get("convention", 0)
+    )
+    if statements == 0:
+        return 0.0 if weighted else 10.0
+    return max(0.0, 10.0 - (weighted / statements) * 10.0)
+
+
+def _message_record(msg: dict) -> dict:
+    """Converts a JSON reporter message into a structured record."""
+    return {
+        "path": msg.get("path"),
+        "module": msg.get("module"),
+        "obj": msg.get("obj", ""),
+        "line": msg.get("line"),
+        "column": msg.get("column"),
+        "code": msg.get("message-id"),
+        "symbol": msg.get("symbol"),
+        "category": msg.get("type"),
+        "message": msg.get("message"),
+    }
+
+
+def run_pylint_batch(filepaths: list, jobs: int = None) -> dict:
+    """
+    Lints a whole set of files in a single in-process pylint run.
+    
+    Uses the JSON reporter and pylint's parallel jobs; per-file scores are
+    computed from pylint's per-module statistics.
+    
+    Args:
+        filepaths: Files to lint
+        jobs: Parallel pylint jobs (0 = one per CPU, None = PYLINT_JOBS)
+    
+    Returns:
+        {
+            "success": bool,
+            "files": {filepath: {"success", "score", "messages", "errors",
+                                 "warnings", "conventions", "total_issues",
+                                 "statements"}},
+            "global_score": float | None,
+        }
+        Each message is a record with path, module, obj, line, column,
+        code, symbol, category and message.
+    """
+    if not filepaths:
+        return {"success": True, "files": {}, "global_score": None}
+    
     try:
-        # always invoke via the same Python interpreter to ensure the module exists
-        result = subprocess.run(
-            [sys.executable, "-m", "pylint", filepath, "--output-format=text"],
-            capture_output=True,
-            text=True,
-            timeout=30
-        )
-
-        score = extract_pylint_score(result.stdout)
-        messages = parse_pylint_messages(result.stdout)
-        total_issues = (
-            len(messages["errors"]) + 
-            len(messages["warnings"]) + 
-            len(messages["conventions"])
-        )
-        print(score)
+        from pylint.lint import Run
+        from pylint.reporters import JSONReporter
+    except ImportError:
+        return {"success": False, "error": "Pylint not installed"}
+    
+    from src.config import PYLINT_JOBS
+    
+    class _MappingJSONReporter(JSONReporter):
+        """JSON reporter that also remembers which module each file maps to."""
         
-        return {
-            "success": True,
-            "score": score,
-            "errors": messages["errors"],
-            "warnings": messages["warnings"],
-            "conventions": messages["conventions"],
-            "total_issues": total_issues,
-            "returncode": result.returncode,
-            "stdout": result.stdout,
-            "stderr": result.stderr
-        }
+        def __init__(self, output):
+            super().__init__(output)
+            self.modules_by_path = {}
         
-    except subprocess.TimeoutExpired:
-        return {"success": False, "error": "Pylint timed out"}
-
-    except FileNotFoundError:
-        return {"success": False, "error": "Pylint not installed"}
+        def on_set_current_module(self, module, filepath):
+            super().on_set_current_module(module, filepath)
+            if filepath:
+                self.modules_by_path[_normalize_path(filepath)] = module
+    
+    stream = io.StringIO()
+    reporter = _MappingJSONReporter(stream)
+    args = [
+        *filepaths,
+        f"--jobs={PYLINT_JOBS if jobs is None else jobs}",
+        "--persistent=n",
+    ]
+    
+    try:
+        run = Run(args, reporter=reporter, exit=False)
+    except SystemExit:
+        # Bad command line / configuration: pylint exits early
+        return {"success": False, "error": "Pylint exited before linting"}
     except Exception as e:
-        return {"success": False, "error": str(e)}
\ No newline at end of file
+        return {"success": False, "error": str(e)}
+    
+    linter = run.linter
+    raw_output = stream.getvalue().strip()
+    try:
+        raw_messages = json.loads(raw_output) if raw_output else []
+    except json.JSONDecodeError as e:
+        return {"success": False, "error": f"Invalid pylint JSON output: {e}"}
+    
+    messages_by_module = {}
+    for msg in raw_messages:
+        messages_by_module.setdefault(msg.get("module"), []).append(_message_record(msg))
+    
+    by_module = getattr(linter.stats, "by_module", {}) or {}
+    files = {}
+    for filepath in filepaths:
+        module = reporter.modules_by_path.get(_normalize_path(filepath))
+        records = messages_by_module.get(module, [])
+        module_stats = dict(by_module.get(module, {})) if module else {}
+        buckets = {"errors": [], "warnings": [], "conventions": []}
+        for record in records:
+            bucket = _CATEGORY_BUCKETS.get(record["category"])
+            if bucket:
+                buckets[bucket].append(record)
+        
+        files[filepath] = {
+            "success": module is not None,
+            "score": _module_score(module_stats) if module else 0.0,
+            "messages": records,
+            "errors": buckets["errors"],
+            "warnings": buckets["warnings"],
+            "conventions": buckets["conventions"],
+            "total_issues": sum(len(b) for b in buckets.values()),
+            "statements": module_stats.get("statement", 0),
+        }
+        if module is None:
+            files[filepath]["error"] = "File was not linted (not found or not a Python module)"
+    
+    return {
+        "success": True,
+        "files": files,
+        "global_score": getattr(linter.stats, "global_note", None),
+    }
+
+
+def run_pylint(filepath: str) -> dict:
+    """
+    Lints a single file (see run_pylint_batch for the result format).
+    """
+    batch = run_pylint_batch([filepath], jobs=1)
+    if not batch["success"]:
+        return batch
+    return batch["files"][filepath]
+
+
+def _normalize_path(filepath: str) -> str:
+    return os.path.normcase(os.path.abspath(filepath))
+
+
+# Configuration files pylint may pick up (besides PYLINTRC)
+_PYLINT_CONFIG_FILES = (
+    "pylintrc", ".pylintrc", "pylintrc.toml", ".pylintrc.toml",
+    "pyproject.toml", "setup.cfg", "tox.ini",
+)
+
+
+def imported_modules(filepath: str) -> set:
+    """
+    Names of the modules imported by a file: every component of the dotted
+    module path, plus the names imported with `from X import name` (which
+    may be submodules, e.g. `from pkg import mod`).
+    """
+    try:
+        with open(filepath, "r", encoding="utf-8") as f:
+            tree = ast.parse(f.read())
+    except (OSError, SyntaxError, ValueError):
+        return set()
+    
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                names.update(alias.name.split("."))
+        elif isinstance(node, ast.ImportFrom):
+            if node.module:
+                names.update(node.module.split("."))
+            names.update(alias.name for alias in node.names if alias.name != "*")
+    return names
+
+
+def _pylint_version() -> str:
+    try:
+        from importlib.metadata import version
+        return version("pylint")
+    except Exception:
+        return "unknown"
+
+
+def _pylint_config_hash(filepath: str) -> str:
+    """Hash of every pylint configuration file that may apply to a file."""
+    from src.utils.result_cache import hash_file, make_key
+    
+    candidates = [os.environ.get("PYLINTRC", "")]
+    for directory in {os.getcwd(), os.path.dirname(os.path.abspath(filepath))}:
+        candidates.extend(os.path.join(directory, name) for name in _PYLINT_CONFIG_FILES)
+    candidates.extend([
+        os.path.expanduser(os.path.join("~", ".pylintrc")),
+        os.path.expanduser(os.path.join("~", ".config", "pylintrc")),
+    ])
+    return make_key(*sorted((path, hash_file(path)) for path in candidates if path and os.path.isfile(path)))
+
+
+def pylint_cache_key(filepath: str) -> str:
+    """
+    Result cache key for a file's pylint result: content hash, pylint
+    version, configuration hash and hashes of the sibling modules it
+    imports (their changes can alter inference results).
+    
+    Returns:
+        The key, or None if the file cannot be read
+    """
+    from src.utils.result_cache import hash_file, make_key
+    
+    content_hash = hash_file(filepath)
+    if content_hash is None:
+        return None
+    
+    directory = os.path.dirname(os.path.abspath(filepath))
+    dependencies = []
+    for name in sorted(imported_modules(filepath)):
+        for candidate in (os.path.join(directory, f"{name}.py"), os.path.join(directory, name, "__init__.py")):
+            if os.path.isfile(candidate):
+                dependencies.append((name, hash_file(candidate)))
+    
+    return make_key(
+        _normalize_path(filepath),
+        content_hash,
+        _pylint_version(),
+        _pylint_config_hash(filepath),
+        dependencies,
+    )
@@ -0,0 +1,225 @@
+"""
+File discovery built on os.scandir.
+
+Directories are pruned before descending (VCS metadata, virtualenvs,
+node_modules, ... never get listed), `.gitignore`-style rules are honoured
+at every level, and results are streamed as a generator. Entries can carry
+their size and mtime (from the scandir entry) for scheduling.
+"""
+import os
+import re
+from typing import Iterable, Iterator, List, NamedTuple, Optional
+
+# Directories and artifacts that never contain code to analyse
+DEFAULT_EXCLUDES = (
+    "__pycache__", ".git", ".hg", ".svn",
+    "venv", ".venv", "env", ".env", "virtualenv",
+    ".tox", ".nox", ".mypy_cache", ".pytest_cache", ".ruff_cache",
+    "node_modules", "build", "dist", "*.egg-info", ".swarm_cache",
+)
+
+
+class FileEntry(NamedTuple):
+    """A discovered file; size and mtime are None unless stats were requested."""
+    path: str
+    size: Optional[int] = None
+    mtime: Optional[float] = None
+
+
+def _translate(pattern: str) -> str:
+    """Regex for a gitignore glob (`*`, `?`, `[...]`, `**`), matched against a '/'-separated path."""
+    regex, i = "", 0
+    while i < len(pattern):
+        char = pattern[i]
+        if pattern.startswith("**/", i):
+            regex += "(?:.*/)?"
+            i += 3
+            continue
+        if pattern.startswith("/**", i) and i + 3 == len(pattern):
+            regex += "/.*"
+            i += 3
+            continue
+        if pattern.startswith("**", i):
+            regex += ".*"
+            i += 2
+            continue
+        if char == "*":
+            regex += "[^/]*"
+        elif char == "?":
+            regex += "[^/]"
+        elif char == "[":
+            end = pattern.find("]", i + 1)
+            if end == -1:
+                regex += re.escape(char)
+            else:
+                body = pattern[i + 1:end]
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                regex += f"[{body}]"
+                i = end
+        elif char == "\\" and i + 1 < len(pattern):
+            i += 1
+            regex += re.escape(pattern[i])
+        else:
+            regex += re.escape(char)
+        i += 1
+    return regex
+
+
+class IgnoreRules:
+    """
+    Ordered gitignore-style rules relative to a base directory.
+
+    Supported syntax: comments, `!` negation, trailing `/` (directories
+    only), patterns containing `/` anchored at the base, `*`, `?`, `[...]`
+    and `**`. As in git, the last matching rule wins.
+    """
+
+    __slots__ = ("base", "_rules")
+
+    def __init__(self, patterns: Iterable[str] = (), base: str = ""):
+        """
+        Args:
+            patterns: Pattern lines
+            base: Directory the patterns are relative to ('/'-separated, '' = root)
+        """
+        self.base = base.strip("/")
+        self._rules = []  # (compiled regex, negated, directories only, anchored)
+        for line in patterns:
+            self.add(line)
+
+    def add(self, line: str):
+        """Adds one pattern line (blank lines and comments are ignored)."""
+        line = line.rstrip("\n").rstrip()
+        if not line or line.startswith("#"):
+            return
+        negated = line.startswith("!")
+        if negated:
+            line = line[1:]
+        elif line.startswith("\\"):
+            line = line[1:]
+        dir_only = line.endswith("/")
+        line = line.rstrip("/")
+        if not line:
+            return
+        anchored = "/" in line
+        regex = re.compile(_translate(line.lstrip("/")) + r"\Z", re.DOTALL)
+        self._rules.append((regex, negated, dir_only, anchored))
+
+    @classmethod
+    def from_file(cls, path: str, base: str = "") -> Optional["IgnoreRules"]:
+        """Rules of an ignore file, or None if it is missing or empty."""
+        try:
+            with open(path, encoding="utf-8", errors="replace") as f:
+                rules = cls(f, base)
+        except OSError:
+            return None
+        return rules if rules._rules else None
+
+    def match(self, rel_path: str, is_dir: bool) -> Optional[bool]:
+        """
+        Args:
+            rel_path: '/'-separated path relative to the discovery root
+            is_dir: Whether the path is a directory
+
+        Returns:
+            True if ignored, False if re-included by a negation, None if no rule applies
+        """
+        if self.base:
+            if not rel_path.startswith(self.base + "/"):
+                return None
+            rel_path = rel_path[len(self.base) + 1:]
+        name = rel_path.rsplit("/", 1)[-1]
+        result = None
+        for regex, negated, dir_only, anchored in self._rules:
+            if dir_only and not is_dir:
+                continue
+            if regex.match(rel_path if anchored else name):
+                result = not negated
+        return result
+
+
+def _ignored(rule_sets: List[IgnoreRules], rel_path: str, is_dir: bool) -> bool:
+    ignored = False
+    for rules in rule_sets:
+        result = rules.match(rel_path, is_dir)
+        if result is not None:
+            ignored = result
+    return ignored
+
+
+def iter_files(
+    root: str,
+    suffixes: Optional[Iterable[str]] = (".py",),
+    exclude: Iterable[str] = DEFAULT_EXCLUDES,
+    gitignore: bool = True,
+    with_stats: bool = False,
+) -> Iterator[FileEntry]:
+    """
+    Streams the files under `root`, pruning ignored directories before descending.
+
+    Args:
+        root: Directory to scan
+        suffixes: Kept file extensions (None = every file)
+        exclude: Extra gitignore-style patterns, relative to root
+        gitignore: Honour the .gitignore files found in root and its subdirectories
+        with_stats: Fill FileEntry.size and FileEntry.mtime
+
+    Yields:
+        FileEntry with `path` relative to root (os.sep-separated), in sorted
+        order within each directory
+    """
+    suffixes = tuple(suffixes) if suffixes is not None else None
+    base_rules = [IgnoreRules(exclude)]
+    stack = [("", base_rules)]
+
+    while stack:
+        rel_dir, rule_sets = stack.pop()
+        directory = os.path.join(root, *rel_dir.split("/")) if rel_dir else root
+        if gitignore:
+            local = IgnoreRules.from_file(os.path.join(directory, ".gitignore"), rel_dir)
+            if local is not None:
+                rule_sets = rule_sets + [local]
+        try:
+            with os.scandir(directory) as scanner:
+                entries = sorted(scanner, key=lambda e: e.name)
+        except OSError:
+            continue
+
+        subdirs = []
+        for entry in entries:
+            rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+            except OSError:
+                continue
+            if is_dir:
+                if not _ignored(rule_sets, rel_path, True):
+                    subdirs.append(rel_path)
+                continue
+            if suffixes is not None and not entry.name.endswith(suffixes):
+                continue
+            try:
+                if not entry.is_file():
+                    continue
+            except OSError:
+                continue
+            if _ignored(rule_sets, rel_path, False):
+                continue
+            path = rel_path.replace("/", os.sep)
+            if with_stats:
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                yield FileEntry(path, stat.st_size, stat.st_mtime)
+            else:
+                yield FileEntry(path)
+
+        # Reversed so that subdirectories are visited in sorted order
+        stack.extend((subdir, rule_sets) for subdir in reversed(subdirs))
+
+
+def discover_python_files(root: str, exclude: Iterable[str] = DEFAULT_EXCLUDES, gitignore: bool = True) -> List[str]:
+    """Relative paths of the Python files under root (see iter_files)."""
+    return [entry.path for entry in iter_files(root, (".py",), exclude, gitignore)]
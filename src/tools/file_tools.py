@@ -1,6 +1,8 @@
 from pathlib import Path
 import os
 
+from src.tools.discovery import iter_files
+
 # Le SANDBOX_ROOT sera défini dynamiquement
 _SANDBOX_ROOT = None
 
@@ -63,9 +65,8 @@ def list_files(relative_path: str = ".") -> dict:
         
         sandbox_root = get_sandbox_root()
         files = [
-            str(p.relative_to(sandbox_root))
-            for p in path.rglob("*")
-            if p.is_file()
+            str((path / entry.path).relative_to(sandbox_root))
+            for entry in iter_files(str(path), suffixes=None)
         ]
         return {"success": True, "files": files}
     except Exception as e:
@@ -0,0 +1,53 @@
+"""
+Git helpers for incremental runs (--since).
+"""
+import subprocess
+from typing import Dict, List
+
+
+def _git(repo_dir: str, *args: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        ["git", "-C", repo_dir, *args],
+        capture_output=True,
+        text=True,
+        timeout=60
+    )
+
+
+def changed_files(repo_dir: str, ref: str) -> Dict:
+    """
+    Files changed since a git ref, relative to repo_dir.
+
+    The diff is taken against the merge-base of `ref` and HEAD (what a pull
+    request touches, even if `ref` moved on since), and includes uncommitted
+    and untracked files. Deleted files are left out.
+
+    Returns:
+        {"success": True, "files": [...], "base": commit} or
+        {"success": False, "error": str}
+    """
+    try:
+        verified = _git(repo_dir, "rev-parse", "--verify", "--quiet", f"{ref}^{{commit}}")
+        if verified.returncode != 0:
+            return {"success": False, "error": f"Unknown git ref: {ref}"}
+        base = verified.stdout.strip()
+
+        merge_base = _git(repo_dir, "merge-base", base, "HEAD")
+        if merge_base.returncode == 0 and merge_base.stdout.strip():
+            base = merge_base.stdout.strip()
+
+        diff = _git(repo_dir, "diff", "--name-only", "--relative", "--diff-filter=ACMR", base, "--")
+        if diff.returncode != 0:
+            return {"success": False, "error": diff.stderr.strip() or "git diff failed"}
+        untracked = _git(repo_dir, "ls-files", "--others", "--exclude-standard")
+
+        files: List[str] = []
+        for line in diff.stdout.splitlines() + untracked.stdout.splitlines():
+            line = line.strip()
+            if line and line not in files:
+                files.append(line)
+        return {"success": True, "files": files, "base": base}
+    except FileNotFoundError:
+        return {"success": False, "error": "git is not installed"}
+    except subprocess.TimeoutExpired:
+        return {"success": False, "error": "git timed out"}
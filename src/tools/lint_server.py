@@ -0,0 +1,172 @@
+"""
+Persistent lint worker process.
+
+Pylint and astroid are imported once in a long-lived child process; the
+parent talks to it over a multiprocessing pipe. Between requests the
+worker keeps astroid's module cache and the last result of every file:
+- files whose content hash is unchanged are answered from memory,
+- changed files (and files importing them) are invalidated in astroid's
+  cache and re-linted.
+"""
+import atexit
+import hashlib
+import multiprocessing
+import os
+import threading
+from typing import Dict, Optional
+
+
+def _content_hash(filepath: str) -> Optional[str]:
+    try:
+        with open(filepath, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+def _invalidate_astroid(filepaths: list):
+    """Drops astroid's cached module trees for the given files."""
+    try:
+        from astroid import MANAGER
+    except ImportError:
+        return
+    
+    targets = {os.path.normcase(os.path.abspath(p)) for p in filepaths}
+    for name, module in list(MANAGER.astroid_cache.items()):
+        module_file = getattr(module, "file", None)
+        if module_file and os.path.normcase(os.path.abspath(module_file)) in targets:
+            del MANAGER.astroid_cache[name]
+
+
+def _serve(conn):
+    """Worker loop: answers lint requests until 'stop' or pipe closure."""
+    from src.tools.analysis_tools import imported_modules, run_pylint_batch
+    
+    results = {}  # abs path -> (content hash, result)
+    
+    while True:
+        try:
+            request = conn.recv()
+        except (EOFError, OSError):
+            break
+        
+        op = request.get("op")
+        if op == "stop":
+            break
+        if op == "ping":
+            conn.send({"success": True})
+            continue
+        if op != "lint":
+            conn.send({"success": False, "error": f"Unknown op: {op}"})
+            continue
+        
+        try:
+            paths = {p: os.path.abspath(p) for p in request["files"]}
+            hashes = {p: _content_hash(abs_path) for p, abs_path in paths.items()}
+            
+            changed = [p for p in paths if results.get(paths[p], (None,))[0] != hashes[p]]
+            changed_modules = {os.path.splitext(os.path.basename(p))[0] for p in changed}
+            # Unchanged files importing a changed module may get different inference results
+            dependents = [
+                p for p in paths
+                if p not in changed and changed_modules and imported_modules(paths[p]) & changed_modules
+            ]
+            to_lint = changed + dependents
+            
+            if to_lint:
+                _invalidate_astroid([paths[p] for p in to_lint])
+                batch = run_pylint_batch(to_lint, jobs=1)
+                if not batch["success"]:
+                    conn.send(batch)
+                    continue
+                for p in to_lint:
+                    results[paths[p]] = (hashes[p], batch["files"][p])
+            
+            conn.send({
+                "success": True,
+                "files": {p: results[paths[p]][1] for p in paths},
+                "linted": len(to_lint),
+                "cached": len(paths) - len(to_lint),
+            })
+        except Exception as e:
+            conn.send({"success": False, "error": f"Lint server error: {e}"})
+
+
+class LintServer:
+    """
+    Client for the persistent lint worker (started lazily, restarted on failure).
+    """
+    
+    def __init__(self, timeout: Optional[float] = None):
+        if timeout is None:
+            from src.config import LINT_SERVER_TIMEOUT
+            timeout = LINT_SERVER_TIMEOUT
+        self.timeout = timeout
+        self._process = None
+        self._conn = None
+        self._pid = None
+        self._lock = threading.Lock()
+    
+    def _ensure_started(self):
+        if self._process is not None and self._pid == os.getpid() and self._process.is_alive():
+            return
+        parent_conn, child_conn = multiprocessing.Pipe()
+        process = multiprocessing.Process(
+            target=_serve, args=(child_conn,), name="lint-server", daemon=True
+        )
+        process.start()
+        child_conn.close()
+        self._process, self._conn, self._pid = process, parent_conn, os.getpid()
+    
+    def _kill(self):
+        if self._process is not None and self._pid == os.getpid():
+            self._process.kill()
+            self._process.join(timeout=5)
+        self._process = self._conn = None
+    
+    def lint(self, filepaths: list) -> Dict:
+        """
+        Lints files through the worker.
+        
+        Returns:
+            Same format as analysis_tools.run_pylint_batch, plus
+            "linted"/"cached" counters
+        """
+        with self._lock:
+            try:
+                self._ensure_started()
+                self._conn.send({"op": "lint", "files": list(filepaths)})
+                if not self._conn.poll(self.timeout):
+                    self._kill()
+                    return {"success": False, "error": f"Lint server timed out after {self.timeout:.0f}s"}
+                return self._conn.recv()
+            except (EOFError, OSError, BrokenPipeError) as e:
+                self._kill()
+                return {"success": False, "error": f"Lint server unavailable: {e}"}
+            except (AssertionError, RuntimeError) as e:
+                # Cannot start a child here (daemonic process, interpreter shutdown)
+                self._kill()
+                return {"success": False, "error": f"Lint server cannot start: {e}"}
+    
+    def stop(self):
+        """Stops the worker process."""
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                try:
+                    self._conn.send({"op": "stop"})
+                    self._process.join(timeout=5)
+                except (OSError, BrokenPipeError):
+                    pass
+                self._kill()
+
+
+_server = None
+
+
+def get_lint_server() -> LintServer:
+    """Returns the process-wide lint server client."""
+    global _server
+    if _server is None:
+        _server = LintServer()
+        atexit.register(_server.stop)
+    return _server
@@ -0,0 +1,284 @@
+"""
+Warm pytest worker pool.
+
+A long-lived "zygote" process imports pytest and its plugins once; every
+test run is executed in a fresh fork of it. Forking gives each run a clean
+interpreter state (the modules under test are imported by the child and die
+with it), while the per-run cost drops from interpreter start-up + pytest
+import to a fork.
+
+The parent talks to the zygote over a multiprocessing pipe, like the lint
+server. Platforms without os.fork fall back to subprocess in test_tools.
+"""
+import atexit
+import multiprocessing
+import os
+import signal
+import sys
+import tempfile
+import threading
+import time
+from typing import Dict, List, Optional
+
+# Exit code reported for a run killed by its timeout
+TIMEOUT_EXIT_CODE = -signal.SIGKILL
+
+
+def fork_available() -> bool:
+    """True if runs can be executed in forked workers."""
+    return hasattr(os, "fork")
+
+
+def _preload():
+    """Imports pytest and its entry-point plugins so every fork starts warm."""
+    import pytest  # noqa: F401
+    import _pytest.config  # noqa: F401
+    try:
+        from importlib.metadata import entry_points
+        try:
+            plugins = entry_points(group="pytest11")
+        except TypeError:  # Python < 3.10
+            plugins = entry_points().get("pytest11", [])
+        for plugin in plugins:
+            try:
+                plugin.load()
+            except Exception:
+                pass
+    except ImportError:
+        pass
+
+
+def _shadowed_modules(directories: List[str]) -> List[str]:
+    """
+    Modules already loaded in the zygote whose top-level name is also a
+    module or package in one of the directories (e.g. a target repo with
+    its own "src" package): they must be re-imported from the target.
+    """
+    local = set()
+    for directory in directories:
+        try:
+            entries = os.listdir(directory)
+        except OSError:
+            continue
+        for entry in entries:
+            stem, ext = os.path.splitext(entry)
+            if ext == ".py" or os.path.isdir(os.path.join(directory, entry)):
+                local.add(stem)
+    return [name for name in sys.modules if name.split(".")[0] in local]
+
+
+def _run_child(job: Dict, output_path: str):
+    """Body of a forked worker: runs pytest with its output sent to a file."""
+    code = 1
+    try:
+        import importlib
+        # Plugins are imported before the purge so a target package cannot shadow them
+        plugins = [importlib.import_module(name) for name in job.get("plugins", ())]
+
+        os.chdir(job["cwd"])
+        test_dirs = {os.path.dirname(os.path.abspath(a.split("::")[0])) for a in job["args"] if ".py" in a}
+        for name in _shadowed_modules([job["cwd"], *test_dirs, *job.get("sys_path", ())]):
+            sys.modules.pop(name, None)
+        sys.path[:0] = job.get("sys_path", [])
+
+        fd = os.open(output_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        devnull = os.open(os.devnull, os.O_RDONLY)
+        os.dup2(devnull, 0)
+        os.dup2(fd, 1)
+        os.dup2(fd, 2)
+
+        import pytest
+        code = int(pytest.main(list(job["args"]), plugins=plugins))
+    except BaseException:
+        import traceback
+        traceback.print_exc()
+    finally:
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        except Exception:
+            pass
+        os._exit(code)
+
+
+def _read_output(path: str) -> str:
+    try:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            return f.read()
+    except OSError:
+        return ""
+
+
+def _run_jobs(jobs: List[Dict], max_parallel: int) -> List[Dict]:
+    """
+    Forks one worker per job (at most max_parallel at a time) and waits for
+    them, killing those that exceed their timeout.
+    """
+    results: List[Optional[Dict]] = [None] * len(jobs)
+    pending = list(range(len(jobs)))
+    running = {}  # pid -> (index, output path, deadline, start)
+
+    with tempfile.TemporaryDirectory(prefix="swarm_pytest_") as tmp:
+        while pending or running:
+            while pending and len(running) < max(1, max_parallel):
+                index = pending.pop(0)
+                output_path = os.path.join(tmp, f"run_{index}.log")
+                pid = os.fork()
+                if pid == 0:
+                    _run_child(jobs[index], output_path)
+                start = time.perf_counter()
+                running[pid] = (index, output_path, start + jobs[index]["timeout"], start)
+
+            pid, status = os.waitpid(-1, os.WNOHANG)
+            if pid == 0:
+                now = time.perf_counter()
+                for child, (index, output_path, deadline, start) in list(running.items()):
+                    if now > deadline:
+                        os.kill(child, signal.SIGKILL)
+                        os.waitpid(child, 0)
+                        del running[child]
+                        results[index] = {
+                            "returncode": TIMEOUT_EXIT_CODE,
+                            "output": _read_output(output_path),
+                            "timed_out": True,
+                            "duration": round(now - start, 3),
+                        }
+                time.sleep(0.005)
+                continue
+            if pid not in running:
+                continue
+            index, output_path, _, start = running.pop(pid)
+            results[index] = {
+                "returncode": os.waitstatus_to_exitcode(status) if hasattr(os, "waitstatus_to_exitcode")
+                else (os.WEXITSTATUS(status) if os.WIFEXITED(status) else -os.WTERMSIG(status)),
+                "output": _read_output(output_path),
+                "timed_out": False,
+                "duration": round(time.perf_counter() - start, 3),
+            }
+    return results
+
+
+def _serve(conn):
+    """Zygote loop: answers run requests until 'stop' or pipe closure."""
+    _preload()
+
+    while True:
+        try:
+            request = conn.recv()
+        except (EOFError, OSError):
+            break
+
+        op = request.get("op")
+        if op == "stop":
+            break
+        if op == "ping":
+            conn.send({"success": True})
+            continue
+        if op != "run":
+            conn.send({"success": False, "error": f"Unknown op: {op}"})
+            continue
+
+        try:
+            conn.send({"success": True, "runs": _run_jobs(request["jobs"], request.get("max_parallel", 1))})
+        except Exception as e:
+            conn.send({"success": False, "error": f"Pytest pool error: {e}"})
+
+
+class PytestPool:
+    """
+    Client for the pytest zygote (started lazily, restarted on failure).
+    """
+
+    def __init__(self):
+        self._process = None
+        self._conn = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self):
+        if self._process is not None and self._pid == os.getpid() and self._process.is_alive():
+            return
+        parent_conn, child_conn = multiprocessing.Pipe()
+        process = multiprocessing.Process(
+            target=_serve, args=(child_conn,), name="pytest-pool", daemon=True
+        )
+        process.start()
+        child_conn.close()
+        self._process, self._conn, self._pid = process, parent_conn, os.getpid()
+
+    def _kill(self):
+        if self._process is not None and self._pid == os.getpid():
+            self._process.kill()
+            self._process.join(timeout=5)
+        self._process = self._conn = None
+
+    def run(
+        self,
+        args_list: List[List[str]],
+        timeout: float,
+        max_parallel: int = 1,
+        plugins: tuple = (),
+        sys_path: Optional[List[str]] = None
+    ) -> Dict:
+        """
+        Runs pytest once per argument list, each in a fresh fork.
+
+        Args:
+            args_list: pytest command-line arguments, one list per run
+            timeout: Per-run timeout in seconds
+            max_parallel: Number of runs executed concurrently
+            plugins: Plugin modules to register (importable names, like `-p`)
+            sys_path: Directories prepended to sys.path (code under test)
+
+        Returns:
+            {"success": bool, "runs": [{"returncode", "output", "timed_out", "duration"}]}
+            in the order of args_list, or {"success": False, "error": str}
+        """
+        jobs = [
+            {
+                "args": list(args), "timeout": timeout, "cwd": os.getcwd(),
+                "plugins": list(plugins), "sys_path": list(sys_path or []),
+            }
+            for args in args_list
+        ]
+        # Margin for fork/wait bookkeeping on top of the slowest possible batch
+        waves = -(-len(jobs) // max(1, max_parallel))
+        budget = timeout * waves + 10
+        with self._lock:
+            try:
+                self._ensure_started()
+                self._conn.send({"op": "run", "jobs": jobs, "max_parallel": max_parallel})
+                if not self._conn.poll(budget):
+                    self._kill()
+                    return {"success": False, "error": f"Pytest pool timed out after {budget:.0f}s"}
+                return self._conn.recv()
+            except (EOFError, OSError, BrokenPipeError) as e:
+                self._kill()
+                return {"success": False, "error": f"Pytest pool unavailable: {e}"}
+            except (AssertionError, RuntimeError) as e:
+                # Cannot start a child here (daemonic process, interpreter shutdown)
+                self._kill()
+                return {"success": False, "error": f"Pytest pool cannot start: {e}"}
+
+    def stop(self):
+        """Stops the zygote process."""
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                try:
+                    self._conn.send({"op": "stop"})
+                    self._process.join(timeout=5)
+                except (OSError, BrokenPipeError):
+                    pass
+                self._kill()
+
+
+_pool = None
+
+
+def get_pytest_pool() -> PytestPool:
+    """Returns the process-wide pytest pool client."""
+    global _pool
+    if _pool is None:
+        _pool = PytestPool()
+        atexit.register(_pool.stop)
+    return _pool
@@ -0,0 +1,297 @@
+"""
+Static pre-audit engine.
+
+Finds the deterministic issues (syntax errors, undefined names, missing
+docstrings, naming conventions, layout) with `ast` and the pylint message
+stream, and reports them in the auditor's "problemes" schema:
+    {"fichier", "ligne", "type", "severite", "description", "suggestion"}
+
+It also decides whether a file still needs the LLM: only files containing
+constructs whose correctness depends on runtime values (division by a
+variable, indexing, conversions, bare except, ...) are sent to it.
+"""
+import ast
+import builtins
+import re
+from typing import Dict, List, Optional
+
+# Names pylint accepts regardless of naming rules
+GOOD_NAMES = {"i", "j", "k", "ex", "Run", "_"}
+
+_SNAKE_CASE = re.compile(r"^_{0,2}[a-z][a-z0-9_]*_{0,2}$")
+_PASCAL_CASE = re.compile(r"^_?[A-Z][a-zA-Z0-9]*$")
+_QUOTED = re.compile(r"['\"]([^'\"]+)['\"]")
+_BUILTINS = set(dir(builtins)) | {"__file__", "__name__", "__doc__", "__spec__", "__path__", "__builtins__"}
+
+MAX_LINE_LENGTH = 79
+
+# pylint symbol -> (type, severite) in the auditor schema
+PYLINT_MAPPING = {
+    "syntax-error": ("bug", "critique"),
+    "undefined-variable": ("bug", "critique"),
+    "used-before-assignment": ("bug", "critique"),
+    "import-error": ("bug", "critique"),
+    "no-name-in-module": ("bug", "critique"),
+    "not-callable": ("bug", "majeur"),
+    "no-member": ("bug", "majeur"),
+    "too-many-function-args": ("bug", "majeur"),
+    "no-value-for-parameter": ("bug", "majeur"),
+    "dangerous-default-value": ("bug", "majeur"),
+    "bare-except": ("bug", "majeur"),
+    "missing-module-docstring": ("documentation", "mineur"),
+    "missing-class-docstring": ("documentation", "mineur"),
+    "missing-function-docstring": ("documentation", "mineur"),
+    "invalid-name": ("naming", "mineur"),
+    "disallowed-name": ("naming", "mineur"),
+    "line-too-long": ("pep8", "mineur"),
+    "trailing-whitespace": ("pep8", "mineur"),
+    "multiple-statements": ("pep8", "mineur"),
+    "bad-indentation": ("pep8", "mineur"),
+    "wrong-import-order": ("pep8", "mineur"),
+    "wrong-import-position": ("pep8", "mineur"),
+    "unused-import": ("pep8", "mineur"),
+    "unused-variable": ("pep8", "mineur"),
+    "no-else-return": ("pep8", "mineur"),
+    "simplifiable-if-statement": ("pep8", "mineur"),
+    "singleton-comparison": ("pep8", "mineur"),
+}
+
+# Issue types the engine decides on its own (the LLM is only asked about bugs)
+STATIC_TYPES = ("pep8", "documentation", "naming")
+
+
+def _issue(filepath: str, line: int, kind: str, severity: str, description: str, suggestion: str) -> dict:
+    return {
+        "fichier": filepath,
+        "ligne": line or 1,
+        "type": kind,
+        "severite": severity,
+        "description": description[:80],
+        "suggestion": suggestion[:100],
+        "source": "static",
+    }
+
+
+def _bound_names(node: ast.AST) -> set:
+    """Names bound anywhere inside a node (assignments, defs, imports, loops, ...)."""
+    names = set()
+    for child in ast.walk(node):
+        if isinstance(child, ast.Name) and isinstance(child.ctx, (ast.Store, ast.Del)):
+            names.add(child.id)
+        elif isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            names.add(child.name)
+        elif isinstance(child, (ast.Import, ast.ImportFrom)):
+            for alias in child.names:
+                names.add((alias.asname or alias.name).split(".")[0])
+        elif isinstance(child, ast.arg):
+            names.add(child.arg)
+        elif isinstance(child, ast.ExceptHandler) and child.name:
+            names.add(child.name)
+        elif isinstance(child, (ast.Global, ast.Nonlocal)):
+            names.update(child.names)
+        elif hasattr(ast, "MatchAs") and isinstance(child, (ast.MatchAs, ast.MatchStar)) and child.name:
+            names.add(child.name)
+    return names
+
+
+def _undefined_names(filepath: str, tree: ast.Module) -> List[dict]:
+    """
+    Loaded names bound nowhere in the module (conservative: any binding in
+    the module counts, so only names that cannot resolve are reported).
+    """
+    if any(isinstance(n, ast.ImportFrom) and any(a.name == "*" for a in n.names) for n in ast.walk(tree)):
+        return []
+
+    known = _bound_names(tree) | _BUILTINS
+    issues, seen = [], set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load) and node.id not in known:
+            if node.id not in seen:
+                seen.add(node.id)
+                issues.append(_issue(
+                    filepath, node.lineno, "bug", "critique",
+                    f"Nom non défini (undefined name): '{node.id}'",
+                    f"Définir ou importer '{node.id}' avant son utilisation"
+                ))
+    return issues
+
+
+def _docstring_issues(filepath: str, tree: ast.Module) -> List[dict]:
+    issues = []
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            if node.name.startswith("_"):
+                continue
+            if ast.get_docstring(node) is None:
+                kind = "Classe" if isinstance(node, ast.ClassDef) else "Fonction"
+                issues.append(_issue(
+                    filepath, node.lineno, "documentation", "mineur",
+                    f"{kind} '{node.name}' sans docstring",
+                    "Ajouter une docstring au format Google Style"
+                ))
+    return issues
+
+
+def _naming_issues(filepath: str, tree: ast.Module) -> List[dict]:
+    issues = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ClassDef):
+            if not _PASCAL_CASE.match(node.name):
+                issues.append(_issue(
+                    filepath, node.lineno, "naming", "mineur",
+                    f"Classe '{node.name}' pas en PascalCase",
+                    "Renommer la classe en PascalCase (ex: MaClasse)"
+                ))
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            if node.name.startswith("__") and node.name.endswith("__"):
+                continue
+            if not _SNAKE_CASE.match(node.name):
+                issues.append(_issue(
+                    filepath, node.lineno, "naming", "mineur",
+                    f"Fonction '{node.name}' pas en snake_case",
+                    "Renommer la fonction en snake_case"
+                ))
+            elif len(node.name.strip("_")) < 3:
+                issues.append(_issue(
+                    filepath, node.lineno, "naming", "mineur",
+                    f"Nom de fonction peu descriptif: '{node.name}'",
+                    "Utiliser un nom décrivant le comportement de la fonction"
+                ))
+            for child in ast.walk(node):
+                if (
+                    isinstance(child, ast.Name) and isinstance(child.ctx, ast.Store)
+                    and len(child.id) == 1 and child.id not in GOOD_NAMES
+                ):
+                    issues.append(_issue(
+                        filepath, child.lineno, "naming", "mineur",
+                        f"Variable à une lettre: '{child.id}'",
+                        "Utiliser un nom de variable descriptif"
+                    ))
+    return issues
+
+
+def _layout_issues(filepath: str, code: str, tree: ast.Module) -> List[dict]:
+    issues = []
+    for lineno, line in enumerate(code.splitlines(), start=1):
+        if len(line) > MAX_LINE_LENGTH:
+            issues.append(_issue(
+                filepath, lineno, "pep8", "mineur",
+                f"Ligne trop longue ({len(line)} > {MAX_LINE_LENGTH} caractères)",
+                "Découper la ligne"
+            ))
+
+    compound = (ast.If, ast.For, ast.AsyncFor, ast.While, ast.With, ast.AsyncWith, ast.Try)
+    for node in ast.walk(tree):
+        if isinstance(node, compound) and node.body and node.body[0].lineno == node.lineno:
+            issues.append(_issue(
+                filepath, node.lineno, "pep8", "mineur",
+                "Plusieurs instructions sur une même ligne",
+                "Placer le corps du bloc sur sa propre ligne"
+            ))
+    return issues
+
+
+def _pylint_issues(filepath: str, messages: List[dict]) -> List[dict]:
+    """Maps pylint message records (see analysis_tools) to the problemes schema."""
+    issues = []
+    for msg in messages:
+        mapped = PYLINT_MAPPING.get(msg.get("symbol"))
+        if mapped:
+            issues.append(_issue(
+                filepath, msg.get("line"), mapped[0], mapped[1],
+                f"{msg.get('symbol')}: {msg.get('message', '')}",
+                f"Corriger l'avertissement pylint {msg.get('code')}"
+            ))
+    return issues
+
+
+def risky_constructs(tree: ast.Module) -> List[str]:
+    """
+    Constructs whose correctness depends on runtime values, which only the
+    LLM (or the tests) can judge.
+
+    Returns:
+        Sorted descriptions of the constructs found (empty = engine decides alone)
+    """
+    reasons = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.BinOp) and isinstance(node.op, (ast.Div, ast.FloorDiv, ast.Mod)):
+            if not isinstance(node.right, ast.Constant):
+                reasons.add("division par une valeur non constante")
+        elif isinstance(node, ast.Subscript) and isinstance(node.ctx, ast.Load):
+            index = node.slice
+            if not isinstance(index, (ast.Constant, ast.Slice)):
+                reasons.add("accès indexé non constant")
+        elif isinstance(node, ast.Call) and isinstance(node.func, ast.Name):
+            if node.func.id in ("int", "float", "open", "eval", "exec", "next"):
+                reasons.add(f"appel à {node.func.id}()")
+        elif isinstance(node, ast.ExceptHandler) and node.type is None:
+            reasons.add("except nu")
+        elif isinstance(node, ast.While) and isinstance(node.test, ast.Constant) and node.test.value:
+            reasons.add("boucle while True")
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            for default in node.args.defaults + node.args.kw_defaults:
+                if isinstance(default, (ast.List, ast.Dict, ast.Set)):
+                    reasons.add("argument par défaut mutable")
+    return sorted(reasons)
+
+
+def _dedupe(issues: List[dict]) -> List[dict]:
+    """Keeps one issue per (line, type, subject); AST findings win over pylint ones."""
+    kept, seen = [], set()
+    for issue in issues:
+        if issue["type"] == "documentation":
+            subject = None  # One missing docstring per definition line
+        else:
+            names = _QUOTED.findall(issue["description"])
+            subject = names[0] if names else issue["description"]
+        key = (issue["ligne"], issue["type"], subject)
+        if key not in seen:
+            seen.add(key)
+            kept.append(issue)
+    return kept
+
+
+def static_audit_file(filepath: str, code: str, pylint_messages: Optional[List[dict]] = None) -> Dict:
+    """
+    Runs the static pre-audit on one file.
+
+    Args:
+        filepath: Path reported in the issues
+        code: File content
+        pylint_messages: Message records from run_pylint_batch, if available
+
+    Returns:
+        {
+            "problemes": [...],        # auditor schema
+            "needs_llm": bool,         # whether the LLM must audit the file
+            "reasons": [str],          # risky constructs that require the LLM
+        }
+    """
+    try:
+        tree = ast.parse(code)
+    except SyntaxError as e:
+        issue = _issue(
+            filepath, e.lineno, "bug", "critique",
+            f"SyntaxError: {e.msg}",
+            "Corriger la syntaxe (parenthèses, deux-points, indentation)"
+        )
+        # Nothing else can be analysed reliably until the file parses
+        return {"problemes": [issue], "needs_llm": False, "reasons": []}
+
+    issues = (
+        _undefined_names(filepath, tree)
+        + _docstring_issues(filepath, tree)
+        + _naming_issues(filepath, tree)
+        + _layout_issues(filepath, code, tree)
+        + _pylint_issues(filepath, pylint_messages or [])
+    )
+    reasons = risky_constructs(tree)
+    return {"problemes": _dedupe(issues), "needs_llm": bool(reasons), "reasons": reasons}
+
+
+def static_score(problemes: List[dict]) -> float:
+    """Quality score (0-10) for a file audited without the LLM, same scale as the auditor."""
+    penalty = {"critique": 4.0, "majeur": 1.5, "mineur": 0.5}
+    total = sum(penalty.get(p.get("severite"), 0.5) for p in problemes)
+    return round(max(0.0, 10.0 - total), 2)
@@ -2,11 +2,16 @@
 Mock implementations for testing tools.
 TEMPORARY - À remplacer par le Toolsmith dans 2 jours.
 """
+import ast
 import os
+import re
 import subprocess
 import sys
 import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Optional
+from xml.etree import ElementTree
 
 
 def write_test_file(filepath: str, content: str) -> bool:
@@ -39,14 +44,287 @@ def write_test_file(filepath: str, content: str) -> bool:
         return False
 
 
-def run_pytest(test_file_path: str, code_files: list = None) -> Dict:
+# Regex de la ligne en échec dans une trace pytest ("fichier.py:12: AssertionError")
+_TB_LOCATION = re.compile(r'^(?:File "(?P<file1>[^"]+)", line (?P<line1>\d+)|(?P<file2>[^\s:]+\.py):(?P<line2>\d+):)', re.MULTILINE)
+
+# Type d'exception sur les lignes "E   KeyError: ..." d'une trace pytest
+_TB_EXCEPTION = re.compile(r"^E\s+([A-Za-z_][\w.]*(?:Error|Exception|Exit|Interrupt|Warning))\b", re.MULTILINE)
+
+# Taille maximale des messages et traces conservés par test
+MAX_MESSAGE_CHARS = 300
+MAX_TRACEBACK_CHARS = 800
+
+
+def _empty_results(errors: list, execution_time: float = 0.0) -> Dict:
+    return {
+        "success": False,
+        "passed": False,
+        "total_tests": 0,
+        "passed_tests": 0,
+        "failed_tests": 0,
+        "error_tests": 0,
+        "skipped_tests": 0,
+        "tests": [],
+        "output": "",
+        "errors": errors,
+        "execution_time": execution_time
+    }
+
+
+def _node_id(testcase, default_file: str) -> str:
+    """Reconstruit l'identifiant pytest (fichier::Classe::test) depuis un <testcase> xunit1."""
+    test_file = (testcase.get("file") or default_file).replace("\\", "/")
+    classname = testcase.get("classname", "")
+    module = os.path.splitext(test_file)[0].replace("/", ".")
+    class_part = classname[len(module) + 1:] if classname.startswith(module + ".") else ""
+    parts = [test_file] + ([class_part.replace(".", "::")] if class_part else []) + [testcase.get("name", "")]
+    return "::".join(part for part in parts if part)
+
+
+def _failing_location(traceback_text: str) -> tuple:
+    """Dernière position (fichier, ligne) citée dans une trace."""
+    location = (None, None)
+    for match in _TB_LOCATION.finditer(traceback_text or ""):
+        path = match.group("file1") or match.group("file2")
+        line = match.group("line1") or match.group("line2")
+        location = (path, int(line))
+    return location
+
+
+def _exception_type(element, message: str, traceback_text: str) -> Optional[str]:
+    """Type de l'exception : attribut "type" du rapport, sinon déduit de la trace."""
+    if element.get("type"):
+        return element.get("type")
+    prefix = re.match(r"([A-Z][\w.]*):\s", message)
+    if prefix:
+        return prefix.group(1).rsplit(".", 1)[-1]
+    found = _TB_EXCEPTION.findall(traceback_text or "")
+    if found:
+        return found[-1].rsplit(".", 1)[-1]
+    if message.startswith("assert") or "AssertionError" in (traceback_text or ""):
+        return "AssertionError"
+    return None
+
+
+def parse_junit_xml(xml_path: str, default_file: str = "") -> list:
     """
-    MOCK - Exécute pytest sur un fichier de test.
-    Sera remplacé par l'implémentation sécurisée du Toolsmith.
+    Lit un rapport junit-xml (famille xunit1) produit par pytest.
+    
+    Returns:
+        Un enregistrement par test :
+        {"nodeid", "outcome" (passed|failed|error|skipped), "duration",
+         "exc_type", "message", "file", "line", "traceback"}
+        (les champs d'échec valent None pour un test réussi)
+    """
+    tests = []
+    root = ElementTree.parse(xml_path).getroot()
+    for testcase in root.iter("testcase"):
+        record = {
+            "nodeid": _node_id(testcase, default_file),
+            "outcome": "passed",
+            "duration": round(float(testcase.get("time") or 0.0), 4),
+            "exc_type": None,
+            "message": None,
+            "file": None,
+            "line": None,
+            "traceback": None,
+        }
+        for tag, outcome in (("failure", "failed"), ("error", "error"), ("skipped", "skipped")):
+            element = testcase.find(tag)
+            if element is None:
+                continue
+            record["outcome"] = outcome
+            if outcome != "skipped":
+                traceback_text = element.text or ""
+                message = element.get("message") or ""
+                if message in ("", "collection failure"):
+                    # Erreur de collecte : le message utile est la dernière ligne "E   ..."
+                    last = [line[1:].strip() for line in traceback_text.splitlines() if line.startswith("E ")]
+                    message = last[-1] if last else message
+                exc_type = _exception_type(element, message, traceback_text)
+                if exc_type and message.startswith(exc_type + ":"):
+                    message = message[len(exc_type) + 1:]
+                record["exc_type"] = exc_type
+                record["message"] = " ".join(message.split())[:MAX_MESSAGE_CHARS]
+                record["file"], record["line"] = _failing_location(traceback_text)
+                if record["line"] is None and testcase.get("line"):
+                    record["file"], record["line"] = testcase.get("file"), int(testcase.get("line")) + 1
+                record["traceback"] = traceback_text[-MAX_TRACEBACK_CHARS:]
+            break
+        tests.append(record)
+    return tests
+
+
+def compact_test_results(results: Dict) -> Dict:
+    """
+    Objet de résultats compact pour AgentState : compteurs, issue de chaque
+    test et détails des seuls tests en échec (sans la sortie brute).
+    """
+    tests = results.get("tests", [])
+    return {
+        "passed": results.get("passed", False),
+        "total": results.get("total_tests", 0),
+        "passed_tests": results.get("passed_tests", 0),
+        "failed_tests": results.get("failed_tests", 0),
+        "error_tests": results.get("error_tests", 0),
+        "skipped_tests": results.get("skipped_tests", 0),
+        "execution_time": results.get("execution_time", 0.0),
+        "outcomes": {t["nodeid"]: t["outcome"] for t in tests},
+        "failures": [
+            {key: t[key] for key in ("nodeid", "outcome", "exc_type", "message", "file", "line", "traceback")}
+            for t in tests if t["outcome"] in ("failed", "error")
+        ],
+        "errors": results.get("errors", []),
+        # Sans rapport structuré (pytest interrompu), seule la fin de la sortie renseigne
+        "output_tail": "" if tests else (results.get("output") or "")[-2000:],
+    }
+
+
+def failure_lines(compact: Dict, limit: int = 10) -> list:
+    """Une ligne par test en échec : "FAILED nodeid - Type: message (fichier:ligne)"."""
+    lines = []
+    for test in compact.get("failures", [])[:limit]:
+        label = "FAILED" if test["outcome"] == "failed" else "ERROR"
+        location = f" ({test['file']}:{test['line']})" if test.get("line") else ""
+        lines.append(f"{label} {test['nodeid']} - {test.get('exc_type') or 'Error'}: {test.get('message') or ''}{location}")
+    return lines
+
+
+def summarize_test_results(compact: Dict, max_failures: int = 10, max_tracebacks: int = 3) -> str:
+    """
+    Résumé texte d'un objet compact_test_results (remplace la sortie brute
+    dans l'état et dans les prompts) : compteurs, une ligne par échec, puis
+    la fin de trace des premiers échecs.
+    """
+    if not compact.get("outcomes"):
+        return compact.get("output_tail") or "\n".join(compact.get("errors", []))
+    
+    failures = compact.get("failures", [])
+    lines = [
+        f"{compact['passed_tests']} passed, {compact['failed_tests']} failed, "
+        f"{compact['error_tests']} error(s), {compact['skipped_tests']} skipped "
+        f"in {compact['execution_time']:.2f}s"
+    ]
+    lines.extend(failure_lines(compact, max_failures))
+    if len(failures) > max_failures:
+        lines.append(f"... {len(failures) - max_failures} autre(s) échec(s)")
+    for test in failures[:max_tracebacks]:
+        if test.get("traceback"):
+            lines.append(f"\n--- {test['nodeid']} ---\n{test['traceback']}")
+    return "\n".join(lines)
+
+
+# Durée minimale accordée à une exécution pytest (secondes)
+PYTEST_TIMEOUT = 30
+
+# Timeout par test (chaque phase setup/call/teardown, voir timeout_plugin)
+PER_TEST_TIMEOUT = 10
+
+# Marge par shard pour le démarrage et la collecte (secondes)
+SHARD_STARTUP_MARGIN = 15
+
+TIMEOUT_PLUGIN = "src.tools.timeout_plugin"
+
+# Racine du projet, pour que le plugin soit importable quel que soit le répertoire courant
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def discover_test_names(test_file_path: str) -> list:
+    """
+    Tests de premier niveau d'un fichier (fonctions test*, classes Test*),
+    sans exécuter pytest. Liste vide si le fichier ne compile pas.
+    """
+    try:
+        with open(test_file_path, encoding="utf-8") as f:
+            tree = ast.parse(f.read())
+    except (OSError, SyntaxError, ValueError):
+        return []
+    return [
+        node.name for node in tree.body
+        if (isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and node.name.startswith("test"))
+        or (isinstance(node, ast.ClassDef) and node.name.startswith("Test"))
+    ]
+
+
+def shard_tests(names: list, workers: int) -> list:
+    """Répartit les tests en round-robin sur au plus `workers` shards non vides."""
+    count = max(1, min(workers, len(names)))
+    return [names[i::count] for i in range(count)] if names else [[]]
+
+
+def _execute_shards(args_list: list, timeout: float, use_pool: bool, import_paths: list = None) -> list:
+    """
+    Lance une exécution pytest par liste d'arguments, en parallèle.
+    
+    Avec use_pool, chaque exécution a lieu dans un fork du processus pytest
+    préchargé (voir pytest_pool) ; sinon, ou si le pool est indisponible,
+    dans un sous-processus Python.
+    
+    Args:
+        import_paths: Dossiers ajoutés en tête de sys.path (code testé)
+    
+    Returns:
+        [(code de retour, sortie, timeout atteint)] dans l'ordre de args_list
+    """
+    import_paths = [os.path.abspath(p) for p in import_paths or []]
+    if use_pool:
+        from src.tools.pytest_pool import get_pytest_pool
+        response = get_pytest_pool().run(
+            args_list, timeout=timeout, max_parallel=len(args_list), plugins=(TIMEOUT_PLUGIN,),
+            sys_path=import_paths
+        )
+        if response.get("success"):
+            return [(run["returncode"], run["output"], run["timed_out"]) for run in response["runs"]]
+        print(f"⚠️  Pool pytest indisponible, exécution en sous-processus: {response.get('error')}")
+    
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(p for p in (*import_paths, _PROJECT_ROOT, env.get("PYTHONPATH")) if p)
+    
+    def execute(args):
+        try:
+            # invoke pytest through the current Python interpreter to guarantee availability
+            result = subprocess.run(
+                [sys.executable, '-m', 'pytest', '-p', TIMEOUT_PLUGIN, *args],
+                capture_output=True,
+                text=True,
+                timeout=timeout,
+                env=env
+            )
+            return result.returncode, result.stdout + result.stderr, False
+        except subprocess.TimeoutExpired as e:
+            output = e.stdout.decode(errors="replace") if isinstance(e.stdout, bytes) else (e.stdout or "")
+            return -1, output, True
+    
+    if len(args_list) == 1:
+        return [execute(args_list[0])]
+    with ThreadPoolExecutor(max_workers=len(args_list)) as executor:
+        return list(executor.map(execute, args_list))
+
+
+def run_pytest(
+    test_file_path: str,
+    code_files: list = None,
+    use_pool: bool = False,
+    workers: int = 1,
+    test_timeout: float = PER_TEST_TIMEOUT,
+    import_root: str = None
+) -> Dict:
+    """
+    Exécute pytest sur un fichier de test et collecte des résultats structurés
+    (rapport junit-xml) plutôt que de compter des sous-chaînes de la sortie.
+    
+    Les tests de premier niveau sont répartis en `workers` shards exécutés
+    en parallèle ; chaque test a son propre timeout, et les résultats des
+    shards sont fusionnés en un seul verdict.
     
     Args:
         test_file_path: Chemin du fichier de test
         code_files: Liste des fichiers de code à tester (optionnel)
+        use_pool: Exécuter dans des forks du processus pytest préchargé
+        workers: Nombre maximal de shards exécutés en parallèle
+        test_timeout: Timeout par test en secondes
+        import_root: Dossier du code testé, importable par les tests (le
+            fichier de test est écrit dans l'espace de travail, hors de ce dossier)
     
     Returns:
         Dict avec résultats:
@@ -56,84 +334,98 @@ def run_pytest(test_file_path: str, code_files: list = None) -> Dict:
             "total_tests": int,
             "passed_tests": int,
             "failed_tests": int,
+            "error_tests": int,
+            "skipped_tests": int,
+            "tests": [ {nodeid, outcome, duration, exc_type, message, file, line, traceback} ],
+            "shards": int,
             "output": str,
             "errors": list,
             "execution_time": float
         }
     """
+    if not os.path.exists(test_file_path):
+        return _empty_results([f"Fichier de test non trouvé: {test_file_path}"])
+    
+    start = time.perf_counter()
+    basename = os.path.basename(test_file_path)
+    shards = shard_tests(discover_test_names(test_file_path), workers)
+    # Un shard interrompu n'est tué qu'au-delà du temps cumulé de ses tests
+    shard_timeout = max(PYTEST_TIMEOUT, test_timeout * max(len(shard) for shard in shards) + SHARD_STARTUP_MARGIN)
+    
     try:
-        # Vérifier que le fichier existe
-        if not os.path.exists(test_file_path):
-            return {
-                "success": False,
-                "passed": False,
-                "total_tests": 0,
-                "passed_tests": 0,
-                "failed_tests": 0,
-                "output": "",
-                "errors": [f"Fichier de test non trouvé: {test_file_path}"],
-                "execution_time": 0.0
-            }
-        
-        # Exécuter pytest
-        # invoke pytest through the current Python interpreter to guarantee availability
-        result = subprocess.run(
-            [sys.executable, '-m', 'pytest', test_file_path, '-v', '--tb=short'],
-            capture_output=True,
-            text=True,
-            timeout=30  # Timeout de 30 secondes
-        )
-        
-        # Parser la sortie
-        output = result.stdout + result.stderr
-        
-        # Compter les tests (basique)
-        passed_tests = output.count(' PASSED')
-        failed_tests = output.count(' FAILED')
-        total_tests = passed_tests + failed_tests
-        
-        # Extraire les erreurs
-        errors = []
-        if result.returncode != 0:
-            # Extraire les lignes d'erreur
-            for line in output.split('\n'):
-                if 'FAILED' in line or 'ERROR' in line or 'AssertionError' in line:
-                    errors.append(line.strip())
-        
-        return {
-            "success": True,
-            "passed": result.returncode == 0,
-            "total_tests": total_tests,
-            "passed_tests": passed_tests,
-            "failed_tests": failed_tests,
-            "output": output,
-            "errors": errors[:10],  # Limiter à 10 erreurs
-            "execution_time": 0.0  # Mock - sera calculé par le Toolsmith
-        }
-        
-    except subprocess.TimeoutExpired:
-        return {
-            "success": False,
-            "passed": False,
-            "total_tests": 0,
-            "passed_tests": 0,
-            "failed_tests": 0,
-            "output": "",
-            "errors": ["Timeout: Les tests ont pris plus de 30 secondes"],
-            "execution_time": 30.0
-        }
-        
+        with tempfile.TemporaryDirectory(prefix="swarm_junit_") as tmp:
+            args_list = []
+            for index, shard in enumerate(shards):
+                targets = [f"{test_file_path}::{name}" for name in shard] or [test_file_path]
+                args_list.append([
+                    *targets, '-v', '--tb=short', f'--per-test-timeout={test_timeout:g}',
+                    f'--junitxml={os.path.join(tmp, f"shard_{index}.xml")}', '-o', 'junit_family=xunit1',
+                ])
+            runs = _execute_shards(args_list, shard_timeout, use_pool, [import_root] if import_root else None)
+            
+            tests, outputs, returncodes = [], [], []
+            for index, (shard, (returncode, output, timed_out)) in enumerate(zip(shards, runs)):
+                xml_path = os.path.join(tmp, f"shard_{index}.xml")
+                records = []
+                if os.path.exists(xml_path):
+                    try:
+                        records = parse_junit_xml(xml_path, default_file=basename)
+                    except ElementTree.ParseError:
+                        records = []
+                if timed_out:
+                    # Shard tué avant d'écrire son rapport : ses tests sont en erreur
+                    reported = {t["nodeid"].split("::")[1].split("[")[0] for t in records if "::" in t["nodeid"]}
+                    records.extend(
+                        {
+                            "nodeid": f"{basename}::{name}", "outcome": "error", "duration": shard_timeout,
+                            "exc_type": "Timeout", "message": f"Shard interrompu après {shard_timeout:.0f}s",
+                            "file": None, "line": None, "traceback": None,
+                        }
+                        for name in shard if name not in reported
+                    )
+                # Une erreur de collecte du fichier est rapportée par chaque shard
+                seen = {t["nodeid"] for t in tests}
+                tests.extend(t for t in records if t["nodeid"] not in seen)
+                returncodes.append(1 if timed_out else returncode)
+                header = f"===== shard {index + 1}/{len(shards)} =====\n" if len(shards) > 1 else ""
+                outputs.append(header + output)
+            output = "\n".join(outputs)
+    
     except Exception as e:
-        return {
-            "success": False,
-            "passed": False,
-            "total_tests": 0,
-            "passed_tests": 0,
-            "failed_tests": 0,
-            "output": "",
-            "errors": [f"Erreur pytest: {str(e)}"],
-            "execution_time": 0.0
-        }
+        return _empty_results([f"Erreur pytest: {str(e)}"])
+    
+    if not tests and all(timed_out for _, _, timed_out in runs):
+        return _empty_results([f"Timeout: Les tests ont pris plus de {shard_timeout:.0f} secondes"], shard_timeout)
+    
+    if tests:
+        counts = {outcome: sum(1 for t in tests if t["outcome"] == outcome)
+                  for outcome in ("passed", "failed", "error", "skipped")}
+    else:
+        # Pas de rapport (pytest interrompu avant d'écrire le XML) : comptage sur la sortie
+        counts = {"passed": output.count(' PASSED'), "failed": output.count(' FAILED'), "error": 0, "skipped": 0}
+    
+    errors = [
+        f"{t['nodeid']}: {t.get('exc_type') or 'Error'}: {t.get('message') or ''}"
+        for t in tests if t["outcome"] in ("failed", "error")
+    ]
+    if not tests and any(returncodes):
+        errors = [line.strip() for line in output.split('\n')
+                  if 'FAILED' in line or 'ERROR' in line or 'AssertionError' in line]
+    
+    return {
+        "success": True,
+        "passed": not any(returncodes),
+        "total_tests": counts["passed"] + counts["failed"] + counts["error"],
+        "passed_tests": counts["passed"],
+        "failed_tests": counts["failed"],
+        "error_tests": counts["error"],
+        "skipped_tests": counts["skipped"],
+        "tests": tests,
+        "shards": len(shards),
+        "output": output,
+        "errors": errors[:10],  # Limiter à 10 erreurs
+        "execution_time": round(time.perf_counter() - start, 3)
+    }
 
 
 def cleanup_test_files(test_file_path: str) -> bool:
@@ -0,0 +1,65 @@
+"""
+Per-test timeout for pytest.
+
+Loaded with `-p src.tools.timeout_plugin` (or passed to pytest.main) and
+enabled with `--per-test-timeout=SECONDS`: each setup, call and teardown
+phase gets its own SIGALRM timer, so one hanging test fails on its own
+instead of consuming the timeout of the whole run.
+"""
+import signal
+import threading
+
+import pytest
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--per-test-timeout", type=float, default=0.0,
+        help="Fail a test phase (setup/call/teardown) that runs longer than this many seconds (0 = off)",
+    )
+
+
+def _timed(item):
+    timeout = item.config.getoption("per_test_timeout")
+    if not timeout or not hasattr(signal, "SIGALRM") or threading.current_thread() is not threading.main_thread():
+        return None
+
+    def on_timeout(signum, frame):
+        pytest.fail(f"Timeout: test exceeded {timeout:g}s", pytrace=False)
+
+    previous = signal.signal(signal.SIGALRM, on_timeout)
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    return previous
+
+
+def _cancel(previous):
+    if previous is not None:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_setup(item):
+    previous = _timed(item)
+    try:
+        yield
+    finally:
+        _cancel(previous)
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_call(item):
+    previous = _timed(item)
+    try:
+        yield
+    finally:
+        _cancel(previous)
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_teardown(item):
+    previous = _timed(item)
+    try:
+        yield
+    finally:
+        _cancel(previous)
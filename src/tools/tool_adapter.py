@@ -2,18 +2,25 @@
 Adapter layer for tools.
 Converts dict returns to formats agents expect.
 """
+import importlib.util
 from typing import Optional, Dict
 
 # Import real tools
 from src.tools.file_tools import read_file as _read_file
 from src.tools.file_tools import write_file as _write_file
 from src.tools.file_tools import list_files as _list_python_files
-from src.tools.analysis_tools import run_pylint as _run_pylint
+from src.tools.analysis_tools import run_pylint_batch as _run_pylint_batch
+from src.tools.analysis_tools import pylint_cache_key
+from src.tools.lint_server import get_lint_server
+from src.tools.pytest_pool import fork_available
 from src.tools.test_tools import (
     write_test_file as _write_test_file,
     run_pytest as _run_pytest,
     cleanup_test_files as _cleanup_test_files,
     validate_test_syntax as _validate_test_syntax,
+    compact_test_results,
+    failure_lines,
+    summarize_test_results,
 )
 
 # ==============================================================================
@@ -53,15 +60,79 @@ def list_python_files(directory: str = ".") -> list[str]:
 # CODE ANALYSIS
 # ==============================================================================
 
+def _lint_uncached(filepaths: list) -> Dict:
+    """Lints through the persistent lint server, or directly if unavailable."""
+    from src.config import LINT_SERVER_ENABLED
+    if LINT_SERVER_ENABLED:
+        result = get_lint_server().lint(filepaths)
+        if result["success"]:
+            return result
+        print(f"⚠️  Lint server failed ({result.get('error')}), falling back to direct pylint")
+    return _run_pylint_batch(filepaths)
+
+
+def _lint(filepaths: list) -> Dict:
+    """Lints files, serving unchanged ones from the on-disk result cache."""
+    if importlib.util.find_spec("pylint") is None:
+        return _run_pylint_batch(filepaths)  # reports "Pylint not installed"
+    
+    from src.utils.result_cache import result_cache
+    
+    keys = {filepath: pylint_cache_key(filepath) for filepath in filepaths}
+    files = {}
+    for filepath, key in keys.items():
+        if key is not None:
+            cached = result_cache.get("pylint", key)
+            if cached is not None:
+                files[filepath] = cached
+    
+    missing = [filepath for filepath in filepaths if filepath not in files]
+    if missing:
+        result = _lint_uncached(missing)
+        if not result["success"]:
+            return result
+        for filepath in missing:
+            file_result = result["files"][filepath]
+            files[filepath] = file_result
+            if file_result["success"] and keys[filepath] is not None:
+                result_cache.put("pylint", keys[filepath], file_result)
+    
+    return {"success": True, "files": files}
+
+
 def run_pylint(filepath: str) -> Optional[Dict]:
     """Wrapper for pylint - returns dict with score and issues."""
-    result = _run_pylint(filepath)
+    result = _lint([filepath])
+    if result["success"]:
+        result = result["files"][filepath]
     if result["success"]:
         return result
     else:
         print(f"⚠️  Pylint failed: {result.get('error', 'Unknown error')}")
         return None
 
+
+def run_pylint_batch(filepaths: list) -> Dict[str, Dict]:
+    """
+    Wrapper for batch pylint - lints all files in one run.
+    
+    Returns:
+        {filepath: result dict} for successfully linted files only
+        (empty dict if pylint could not run)
+    """
+    result = _lint(filepaths)
+    if not result["success"]:
+        print(f"⚠️  Pylint failed: {result.get('error', 'Unknown error')}")
+        return {}
+    
+    linted = {}
+    for filepath, file_result in result["files"].items():
+        if file_result["success"]:
+            linted[filepath] = file_result
+        else:
+            print(f"⚠️  Pylint failed on {filepath}: {file_result.get('error', 'Unknown error')}")
+    return linted
+
 # ==============================================================================
 # TEST TOOLS
 # ==============================================================================
@@ -80,18 +151,29 @@ def write_test_file(filepath: str, content: str) -> bool:
     return _write_test_file(filepath, content)
 
 
-def run_pytest(test_file_path: str, code_files: list = None) -> Dict:
+def run_pytest(test_file_path: str, code_files: list = None, import_root: str = None) -> Dict:
     """
-    Exécute pytest sur un fichier de test.
+    Exécute pytest sur un fichier de test, réparti en shards parallèles
+    avec un timeout par test.
     
     Args:
         test_file_path: Chemin du fichier de test
         code_files: Liste des fichiers de code (optionnel)
+        import_root: Dossier du code testé, importable par les tests
     
     Returns:
-        Dict avec résultats détaillés
+        Dict avec résultats détaillés, dont "tests" (un enregistrement
+        structuré par test, voir compact_test_results pour l'état)
     """
-    return _run_pytest(test_file_path, code_files)
+    from src.config import PYTEST_POOL_ENABLED, PYTEST_WORKERS, PYTEST_TEST_TIMEOUT
+    return _run_pytest(
+        test_file_path,
+        code_files,
+        use_pool=PYTEST_POOL_ENABLED and fork_available(),
+        workers=PYTEST_WORKERS,
+        test_timeout=PYTEST_TEST_TIMEOUT,
+        import_root=import_root
+    )
 
 
 def cleanup_test_files(test_file_path: str) -> bool:
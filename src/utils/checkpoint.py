@@ -0,0 +1,198 @@
+"""
+Points de reprise du workflow LangGraph.
+
+L'AgentState est persisté dans un fichier SQLite après chaque nœud
+(auditor, fixer, judge). Une exécution interrompue (crash, quota épuisé)
+peut reprendre avec `python main.py --resume <run_id>` : les nœuds déjà
+terminés sont sautés et les fichiers déjà corrigés sont réutilisés.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Callable, Dict, List, Optional, Tuple
+
+from src.config import CHECKPOINT_DB
+
+
+def _json_default(obj):
+    """Objets de l'état sérialisables via to_dict() (ex: IssueStore), sinon str()."""
+    to_dict = getattr(obj, "to_dict", None)
+    if callable(to_dict):
+        return to_dict()
+    return str(obj)
+
+
+class CheckpointStore:
+    """
+    Stockage SQLite des états intermédiaires d'une exécution.
+    """
+
+    def __init__(self, db_path: str = CHECKPOINT_DB):
+        """
+        Args:
+            db_path: Fichier SQLite des checkpoints
+        """
+        self.db_path = db_path
+        self._local = threading.local()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Une connexion par thread (et par processus après un fork)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(
+            "CREATE TABLE IF NOT EXISTS runs ("
+            " run_id TEXT PRIMARY KEY,"
+            " target_dir TEXT NOT NULL,"
+            " status TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " updated_at REAL NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS checkpoints ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " run_id TEXT NOT NULL,"
+            " node TEXT NOT NULL,"
+            " state_json TEXT NOT NULL,"
+            " created_at REAL NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS idx_checkpoints_run ON checkpoints(run_id, id);"
+            "CREATE TABLE IF NOT EXISTS file_results ("
+            " run_id TEXT NOT NULL,"
+            " iteration INTEGER NOT NULL,"
+            " filepath TEXT NOT NULL,"
+            " result_json TEXT NOT NULL,"
+            " PRIMARY KEY (run_id, iteration, filepath));"
+        )
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    # ------------------------------------------------------------------
+    # Exécutions
+    # ------------------------------------------------------------------
+
+    def new_run(self, target_dir: str) -> str:
+        """
+        Enregistre une nouvelle exécution.
+
+        Returns:
+            Identifiant de l'exécution (run_id)
+        """
+        run_id = uuid.uuid4().hex[:12]
+        now = time.time()
+        self._connect().execute(
+            "INSERT INTO runs (run_id, target_dir, status, created_at, updated_at)"
+            " VALUES (?, ?, 'running', ?, ?)",
+            (run_id, os.path.abspath(target_dir), now, now)
+        )
+        return run_id
+
+    def set_run_status(self, run_id: str, status: str):
+        """Met à jour le statut d'une exécution (running, success, failed...)."""
+        self._connect().execute(
+            "UPDATE runs SET status = ?, updated_at = ? WHERE run_id = ?",
+            (status, time.time(), run_id)
+        )
+
+    def get_run(self, run_id: str) -> Optional[Dict]:
+        """Exécution enregistrée, ou None si run_id est inconnu."""
+        r = self._connect().execute(
+            "SELECT run_id, target_dir, status, created_at, updated_at FROM runs WHERE run_id = ?",
+            (run_id,)
+        ).fetchone()
+        if r is None:
+            return None
+        return {"run_id": r[0], "target_dir": r[1], "status": r[2], "created_at": r[3], "updated_at": r[4]}
+
+    def list_runs(self, limit: int = 20) -> List[Dict]:
+        """Dernières exécutions enregistrées, les plus récentes d'abord."""
+        rows = self._connect().execute(
+            "SELECT run_id, target_dir, status, created_at, updated_at"
+            " FROM runs ORDER BY updated_at DESC LIMIT ?",
+            (limit,)
+        ).fetchall()
+        return [
+            {"run_id": r[0], "target_dir": r[1], "status": r[2], "created_at": r[3], "updated_at": r[4]}
+            for r in rows
+        ]
+
+    # ------------------------------------------------------------------
+    # États après chaque nœud
+    # ------------------------------------------------------------------
+
+    def save(self, run_id: str, node: str, state: dict):
+        """Persiste l'état obtenu après l'exécution de `node`."""
+        conn = self._connect()
+        conn.execute(
+            "INSERT INTO checkpoints (run_id, node, state_json, created_at) VALUES (?, ?, ?, ?)",
+            (run_id, node, json.dumps(dict(state), ensure_ascii=False, default=_json_default), time.time())
+        )
+        conn.execute("UPDATE runs SET updated_at = ? WHERE run_id = ?", (time.time(), run_id))
+
+    def load_latest(self, run_id: str) -> Optional[Tuple[str, dict]]:
+        """
+        Dernier état persisté d'une exécution.
+
+        Returns:
+            (nom du dernier nœud terminé, état), ou None si aucun checkpoint
+        """
+        row = self._connect().execute(
+            "SELECT node, state_json FROM checkpoints WHERE run_id = ? ORDER BY id DESC LIMIT 1",
+            (run_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        return row[0], json.loads(row[1])
+
+    # ------------------------------------------------------------------
+    # Résultats par fichier (reprise au milieu du Correcteur)
+    # ------------------------------------------------------------------
+
+    def save_file_result(self, run_id: str, iteration: int, filepath: str, result: dict):
+        """Mémorise le résultat de correction d'un fichier pour une itération."""
+        self._connect().execute(
+            "INSERT OR REPLACE INTO file_results (run_id, iteration, filepath, result_json)"
+            " VALUES (?, ?, ?, ?)",
+            (run_id, iteration, filepath, json.dumps(result, ensure_ascii=False, default=str))
+        )
+
+    def load_file_results(self, run_id: str, iteration: int) -> Dict[str, dict]:
+        """Résultats de correction déjà obtenus pour une itération."""
+        rows = self._connect().execute(
+            "SELECT filepath, result_json FROM file_results WHERE run_id = ? AND iteration = ?",
+            (run_id, iteration)
+        ).fetchall()
+        return {filepath: json.loads(result_json) for filepath, result_json in rows}
+
+
+def with_checkpoint(node_name: str, node_fn: Callable, store: CheckpointStore, run_id: str) -> Callable:
+    """
+    Enveloppe un nœud du graphe pour persister l'état après son exécution.
+
+    Args:
+        node_name: Nom du nœud ("auditor", "fixer", "judge")
+        node_fn: Fonction du nœud (state -> state)
+        store: Stockage des checkpoints
+        run_id: Exécution courante
+
+    Returns:
+        Fonction de nœud équivalente, avec checkpoint
+    """
+    def node(state):
+        new_state = node_fn(state)
+        store.save(run_id, node_name, new_state if new_state is not None else state)
+        return new_state
+
+    node.__name__ = getattr(node_fn, "__name__", node_name)
+    node.__doc__ = node_fn.__doc__
+    return node
+
+
+# Instance globale (la base SQLite est créée au premier accès)
+checkpoint_store = CheckpointStore()
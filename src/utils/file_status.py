@@ -0,0 +1,177 @@
+"""
+Suivi de l'état de chaque fichier entre les itérations.
+
+Après la première itération, le Correcteur ne renvoie au LLM que les
+fichiers impliqués dans un échec (test en échec, erreur d'import, score
+Pylint trop bas) : le nombre d'appels par itération devient O(fichiers
+cassés) au lieu de O(fichiers).
+"""
+
+import ast
+import builtins
+import os
+import re
+from typing import Dict, Iterable, List, Optional, Set
+
+from src.config import FILE_SCORE_THRESHOLD
+
+# États possibles d'un fichier
+FILE_UNTOUCHED = "untouched"  # Jamais corrigé
+FILE_FIXED = "fixed"          # Corrigé, pas encore mis en cause par le Juge
+FILE_FAILING = "failing"      # Impliqué dans un échec (à re-corriger)
+FILE_CLEAN = "clean"          # Validé par le Juge
+
+# États qui déclenchent un passage par le Correcteur
+STATUTS_A_CORRIGER = (FILE_UNTOUCHED, FILE_FAILING)
+
+_FAILURE_SECTION = re.compile(r"^=+ (FAILURES|ERRORS) =+$")
+_SUMMARY_SECTION = re.compile(r"^=+ short test summary info =+$")
+_IMPORT_ERROR = re.compile(
+    r"(?:No module named|cannot import name \S+ from) ['\"]?([A-Za-z_][\w.]*)['\"]?"
+)
+# Frame de trace : 'File "x.py", line 3, in f' (Python) ou 'x.py:3: in f' (pytest)
+_TRACEBACK_FRAME = re.compile(r'File "[^"]+", line \d+, in ([A-Za-z_]\w*)|^\s*\S+\.py:\d+: in ([A-Za-z_]\w*)', re.M)
+# Appel direct 'nom(' (les appels de méthode 'obj.get(' sont ignorés)
+_CALL_SITE = re.compile(r"(?<![\w.])([A-Za-z_]\w*)\(")
+_BUILTINS = set(dir(builtins))
+
+
+def initial_file_status(python_files: Iterable[str]) -> Dict[str, str]:
+    """Tous les fichiers commencent à l'état 'untouched'."""
+    return {filepath: FILE_UNTOUCHED for filepath in python_files}
+
+
+def module_name(filepath: str) -> str:
+    """'pkg/mod.py' → 'pkg.mod'."""
+    return os.path.splitext(filepath)[0].replace("\\", "/").replace("/", ".")
+
+
+def defined_names(code: str) -> Set[str]:
+    """
+    Noms de fonctions et classes définis dans un module.
+
+    Utilise ast, avec repli sur une regex si le code ne compile pas.
+    """
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return set(re.findall(r"^\s*(?:async\s+def|def|class)\s+([A-Za-z_]\w*)", code, re.MULTILINE))
+    return {
+        node.name for node in ast.walk(tree)
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef))
+    }
+
+
+def failure_names(failure_text: str) -> Set[str]:
+    """
+    Noms mis en cause par une trace d'échec : fonctions des frames de la
+    trace et fonctions/classes appelées par le test (lignes de code et
+    messages d'assertion). Les mots quelconques du texte ne comptent pas :
+    un module qui définit `main` ou `get` n'est pas impliqué pour autant.
+    """
+    names = {a or b for a, b in _TRACEBACK_FRAME.findall(failure_text)}
+    for line in failure_text.split("\n"):
+        code = line.lstrip("> \t")
+        if _TRACEBACK_FRAME.search(line) or code.startswith(("def ", "async def ", "class ")):
+            continue
+        names.update(_CALL_SITE.findall(line))
+    return names - _BUILTINS
+
+
+def extract_failure_text(test_output: str) -> str:
+    """
+    Garde uniquement les sections d'échec d'une sortie pytest
+    (FAILURES / ERRORS + résumé), sans les lignes PASSED.
+    """
+    if not test_output:
+        return ""
+
+    kept = []
+    in_failures = False
+    for line in test_output.split("\n"):
+        stripped = line.strip()
+        if _FAILURE_SECTION.match(stripped) or _SUMMARY_SECTION.match(stripped):
+            in_failures = True
+        if in_failures or "FAILED" in line or "ERROR" in line:
+            kept.append(line)
+    return "\n".join(kept)
+
+
+def implicated_files(
+    python_files: List[str],
+    test_output: str,
+    code_files: Optional[Dict[str, str]] = None,
+    pylint_scores: Optional[Dict[str, float]] = None,
+    tests_failed: bool = False,
+    threshold: float = FILE_SCORE_THRESHOLD,
+    failures: Optional[List[dict]] = None
+) -> Set[str]:
+    """
+    Détermine les fichiers mis en cause par la dernière validation.
+
+    Un fichier est impliqué si :
+    - il est cité dans une trace d'échec (nom de fichier ou module importé),
+    - une de ses fonctions/classes apparaît dans une frame de la trace ou
+      est appelée par un test en échec (voir failure_names),
+    - son score Pylint est sous le seuil.
+
+    Si des tests échouent sans qu'aucun fichier ne puisse être identifié,
+    tous les fichiers sont considérés comme impliqués (prudence).
+
+    Args:
+        python_files: Fichiers du dépôt
+        test_output: Sortie pytest brute (utilisée si failures n'est pas fourni)
+        code_files: {fichier: contenu} pour relier fonctions et modules
+        pylint_scores: {fichier: score}
+        tests_failed: True si la validation par les tests a échoué
+        threshold: Score Pylint minimal
+        failures: Échecs structurés (voir compact_test_results)
+
+    Returns:
+        Ensemble des fichiers à re-corriger
+    """
+    implicated = set()
+    if failures is not None:
+        failure_text = "\n".join(
+            f"{f.get('nodeid')} {f.get('exc_type') or ''}: {f.get('message') or ''}\n{f.get('traceback') or ''}"
+            for f in failures
+        )
+    else:
+        failure_text = extract_failure_text(test_output or "")
+
+    if failure_text:
+        imported_modules = set(_IMPORT_ERROR.findall(failure_text))
+        names = failure_names(failure_text)
+
+        for filepath in python_files:
+            mod = module_name(filepath)
+            basename = os.path.basename(filepath)
+            if basename in failure_text or mod in imported_modules or mod.split(".")[-1] in imported_modules:
+                implicated.add(filepath)
+                continue
+            content = (code_files or {}).get(filepath)
+            if content and defined_names(content) & names:
+                implicated.add(filepath)
+
+    if tests_failed and not implicated:
+        implicated = set(python_files)
+
+    for filepath, score in (pylint_scores or {}).items():
+        if score is not None and score < threshold:
+            implicated.add(filepath)
+
+    return implicated
+
+
+def files_to_fix(python_files: List[str], file_status: Optional[Dict[str, str]]) -> List[str]:
+    """
+    Fichiers à envoyer au Correcteur, dans l'ordre de python_files.
+
+    Sans suivi d'état (première itération), tous les fichiers sont retenus.
+    """
+    if not file_status:
+        return list(python_files)
+    return [
+        filepath for filepath in python_files
+        if file_status.get(filepath, FILE_UNTOUCHED) in STATUTS_A_CORRIGER
+    ]
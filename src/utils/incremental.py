@@ -0,0 +1,62 @@
+"""
+Mode incrémental (--since <ref>) : seuls les fichiers modifiés depuis une
+référence git, et les modules qui les importent (directement ou non), sont
+audités, corrigés et testés. Le reste du dépôt sert uniquement de contexte.
+"""
+
+import os
+from typing import Dict, List, Set
+
+from src.tools.analysis_tools import imported_modules
+from src.tools.git_tools import changed_files
+from src.utils.file_status import module_name
+
+
+def _module_names(filepath: str) -> Set[str]:
+    """Noms sous lesquels un fichier peut être importé ('pkg.mod' → {'pkg.mod', 'mod'})."""
+    name = module_name(filepath)
+    if name.endswith(".__init__") or name == "__init__":
+        name = name[: -len("__init__")].rstrip(".")
+    return {name, name.rsplit(".", 1)[-1]} if name else set()
+
+
+def reverse_import_closure(target_dir: str, python_files: List[str], changed: List[str]) -> List[str]:
+    """
+    Fichiers modifiés et tous les fichiers qui les importent, transitivement.
+
+    Returns:
+        Sous-ensemble de python_files, dans l'ordre de python_files
+    """
+    imports = {f: imported_modules(os.path.join(target_dir, f)) for f in python_files}
+    selected = {f for f in python_files if f in set(changed)}
+    frontier = set(selected)
+    while frontier:
+        names = set().union(*(_module_names(f) for f in frontier))
+        frontier = {f for f in python_files if f not in selected and imports[f] & names}
+        selected |= frontier
+    return [f for f in python_files if f in selected]
+
+
+def select_changed_files(target_dir: str, python_files: List[str], since: str) -> Dict:
+    """
+    Fichiers à traiter pour une exécution incrémentale.
+
+    Args:
+        target_dir: Dossier cible (dans un dépôt git)
+        python_files: Fichiers découverts dans le dossier cible
+        since: Référence git (branche, tag, commit)
+
+    Returns:
+        {"success": True, "changed": [...], "selected": [...]} ou
+        {"success": False, "error": str}
+    """
+    result = changed_files(target_dir, since)
+    if not result["success"]:
+        return result
+    known = {os.path.normpath(f): f for f in python_files}
+    changed = [known[os.path.normpath(f)] for f in result["files"] if os.path.normpath(f) in known]
+    return {
+        "success": True,
+        "changed": changed,
+        "selected": reverse_import_closure(target_dir, python_files, changed),
+    }
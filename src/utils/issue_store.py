@@ -0,0 +1,247 @@
+"""
+Magasin indexé des problèmes détectés par l'Auditeur.
+
+Le rapport d'audit est parsé une seule fois en enregistrements compacts
+(NamedTuple, sans __dict__), indexés par fichier, type et sévérité : le
+Correcteur et le Juge obtiennent les problèmes d'un fichier en O(1) au
+lieu de re-parser le JSON et de filtrer toute la liste à chaque fois.
+"""
+
+import json
+import posixpath
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+# Ordre d'affichage des sévérités (les plus graves d'abord)
+SEVERITES = ("critique", "majeur", "mineur")
+
+
+def _normalize_path(path: str) -> str:
+    """Chemin en séparateurs "/" sans "./" ni composants redondants."""
+    return posixpath.normpath(path.replace("\\", "/"))
+
+
+class Issue(NamedTuple):
+    """Un problème du rapport d'audit (schéma "problemes" de l'Auditeur)."""
+    fichier: str
+    ligne: int
+    type: str
+    severite: str
+    description: str
+    suggestion: str = ""
+    source: str = "llm"
+
+    @classmethod
+    def from_probleme(cls, probleme: dict, fichier: Optional[str] = None) -> "Issue":
+        """Construit un enregistrement depuis un dictionnaire du rapport JSON."""
+        try:
+            ligne = int(probleme.get("ligne") or 1)
+        except (TypeError, ValueError):
+            ligne = 1
+        return cls(
+            fichier=fichier or str(probleme.get("fichier", "")),
+            ligne=ligne,
+            type=str(probleme.get("type", "general")).lower(),
+            severite=str(probleme.get("severite", "mineur")).lower(),
+            description=str(probleme.get("description", "")),
+            suggestion=str(probleme.get("suggestion", "")),
+            source=str(probleme.get("source", "llm")),
+        )
+
+    def to_probleme(self) -> dict:
+        """Dictionnaire au format du rapport (attendu par les prompts)."""
+        return self._asdict()
+
+
+class IssueStore:
+    """
+    Ensemble de problèmes indexés par fichier, type et sévérité.
+    """
+
+    __slots__ = ("_issues", "_by_file", "_by_type", "_by_severity", "_known_files")
+
+    def __init__(self, issues: Iterable[Issue] = (), known_files: Iterable[str] = ()):
+        """
+        Args:
+            issues: Problèmes initiaux
+            known_files: Fichiers du dépôt ; les chemins approximatifs renvoyés
+                par le LLM ("mod.py" pour "pkg/mod.py") y sont rattachés
+        """
+        self._issues: List[Issue] = []
+        self._by_file: Dict[str, List[Issue]] = {}
+        self._by_type: Dict[str, List[Issue]] = {}
+        self._by_severity: Dict[str, List[Issue]] = {}
+        self._known_files = list(known_files)
+        for issue in issues:
+            self.add(issue)
+
+    # ------------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------------
+
+    def _resolve_file(self, fichier: str) -> str:
+        """
+        Rattache le chemin cité par un problème à un fichier connu.
+
+        La correspondance porte sur des composants de chemin entiers
+        ("src/data.py" se rattache à "data.py", jamais à "a.py") ; le
+        fichier connu le plus long (le plus précis) l'emporte.
+        """
+        normalized = _normalize_path(fichier)
+        matches = [
+            known for known in self._known_files
+            if normalized == _normalize_path(known) or normalized.endswith("/" + _normalize_path(known))
+        ]
+        if matches:
+            return max(matches, key=lambda known: len(_normalize_path(known)))
+        for known in self._known_files:
+            if _normalize_path(known).endswith("/" + normalized):
+                return known
+        basename = posixpath.basename(normalized)
+        for known in self._known_files:
+            if posixpath.basename(_normalize_path(known)) == basename:
+                return known
+        return fichier
+
+    def add(self, issue) -> Issue:
+        """Ajoute un problème (Issue ou dictionnaire du rapport) et met à jour les index."""
+        if not isinstance(issue, Issue):
+            issue = Issue.from_probleme(issue)
+        if self._known_files:
+            issue = issue._replace(fichier=self._resolve_file(issue.fichier))
+        self._issues.append(issue)
+        self._by_file.setdefault(issue.fichier, []).append(issue)
+        self._by_type.setdefault(issue.type, []).append(issue)
+        self._by_severity.setdefault(issue.severite, []).append(issue)
+        return issue
+
+    @classmethod
+    def from_problemes(cls, problemes: Iterable[dict], known_files: Iterable[str] = ()) -> "IssueStore":
+        """Construit le magasin depuis la liste "problemes" du rapport."""
+        store = cls(known_files=known_files)
+        for probleme in problemes:
+            if isinstance(probleme, dict):
+                store.add(probleme)
+        return store
+
+    @classmethod
+    def from_audit_report(cls, audit_report, known_files: Iterable[str] = ()) -> Optional["IssueStore"]:
+        """
+        Parse un rapport d'audit (JSON texte ou déjà décodé).
+
+        Returns:
+            Le magasin, ou None si le rapport n'est pas exploitable
+        """
+        if isinstance(audit_report, str):
+            try:
+                audit_report = json.loads(audit_report)
+            except (json.JSONDecodeError, TypeError):
+                return None
+        if isinstance(audit_report, dict):
+            audit_report = audit_report.get("problemes")
+        if not isinstance(audit_report, list):
+            return None
+        return cls.from_problemes(audit_report, known_files)
+
+    # ------------------------------------------------------------------
+    # Requêtes
+    # ------------------------------------------------------------------
+
+    def for_file(self, filepath: str) -> List[Issue]:
+        """Problèmes d'un fichier (O(1))."""
+        return list(self._by_file.get(filepath, ()))
+
+    def by_type(self, issue_type: str) -> List[Issue]:
+        """Problèmes d'un type (bug, pep8, documentation, naming, ...)."""
+        return list(self._by_type.get(issue_type.lower(), ()))
+
+    def by_severity(self, severite: str) -> List[Issue]:
+        """Problèmes d'une sévérité (critique, majeur, mineur)."""
+        return list(self._by_severity.get(severite.lower(), ()))
+
+    def files(self) -> List[str]:
+        """Fichiers ayant au moins un problème."""
+        return list(self._by_file)
+
+    def counts(self) -> Dict[str, Dict[str, int]]:
+        """Nombre de problèmes par type et par sévérité."""
+        return {
+            "type": {key: len(items) for key, items in self._by_type.items()},
+            "severite": {key: len(items) for key, items in self._by_severity.items()},
+        }
+
+    def problemes_for_file(self, filepath: str) -> List[dict]:
+        """Problèmes d'un fichier au format dictionnaire du rapport."""
+        return [issue.to_probleme() for issue in self._by_file.get(filepath, ())]
+
+    def summary(self, max_chars: int = 1000, files: Optional[Iterable[str]] = None) -> str:
+        """
+        Résumé compact, une ligne par problème, les plus graves d'abord.
+
+        Args:
+            max_chars: Taille maximale du résumé
+            files: Limiter aux problèmes de ces fichiers
+
+        Returns:
+            Lignes "fichier:ligne [type/sévérité] description"
+        """
+        if files is None:
+            issues = self._issues
+        else:
+            issues = [issue for f in files for issue in self._by_file.get(f, ())]
+        rank = {severite: i for i, severite in enumerate(SEVERITES)}
+        ordered = sorted(issues, key=lambda issue: (rank.get(issue.severite, len(SEVERITES)), issue.fichier, issue.ligne))
+
+        lines, size = [], 0
+        for issue in ordered:
+            line = f"{issue.fichier}:{issue.ligne} [{issue.type}/{issue.severite}] {issue.description}"
+            if size + len(line) + 1 > max_chars:
+                lines.append(f"... ({len(ordered) - len(lines)} problème(s) non affiché(s))")
+                break
+            lines.append(line)
+            size += len(line) + 1
+        return "\n".join(lines) if lines else "Aucun problème détecté"
+
+    def __len__(self) -> int:
+        return len(self._issues)
+
+    def __iter__(self) -> Iterator[Issue]:
+        return iter(self._issues)
+
+    # ------------------------------------------------------------------
+    # Sérialisation (checkpoints)
+    # ------------------------------------------------------------------
+
+    def to_dict(self) -> dict:
+        """Forme JSON compacte : une liste de valeurs par problème."""
+        return {
+            "fields": list(Issue._fields),
+            "issues": [list(issue) for issue in self._issues],
+            "known_files": self._known_files,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "IssueStore":
+        """Inverse de to_dict."""
+        fields = data.get("fields", list(Issue._fields))
+        store = cls()
+        for values in data.get("issues", []):
+            store.add(Issue(**dict(zip(fields, values))))
+        store._known_files = list(data.get("known_files", []))
+        return store
+
+
+def issue_store_from_state(state: dict) -> Optional[IssueStore]:
+    """
+    Magasin de problèmes de l'état, reconstruit depuis audit_report si absent
+    (état issu d'une ancienne version ou d'un checkpoint).
+    """
+    store = state.get("issue_store")
+    if isinstance(store, IssueStore):
+        return store
+    if isinstance(store, dict):
+        store = IssueStore.from_dict(store)
+    else:
+        store = IssueStore.from_audit_report(state.get("audit_report"), state.get("python_files") or [])
+    if store is not None:
+        state["issue_store"] = store
+    return store
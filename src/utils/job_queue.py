@@ -0,0 +1,312 @@
+"""
+File de tâches durable (SQLite) pour répartir le workflow sur plusieurs workers.
+
+Une exécution est découpée en tâches : "auditor", "fix_file" (un fichier),
+"fixer" (agrégation des corrections) et "judge". Chaque worker
+(`python main.py worker`) prend une tâche avec un bail (lease) renouvelé
+tant qu'elle tourne ; un worker qui meurt laisse expirer son bail et la
+tâche est reprise par un autre. Une tâche en échec est relancée avec un
+délai croissant jusqu'à max_attempts, puis marquée "failed". Le résultat de
+chaque tâche terminée est conservé dans job_results.
+
+Plusieurs processus, éventuellement sur plusieurs machines partageant le
+fichier, peuvent utiliser la même file : chaque prise de tâche se fait dans
+une transaction BEGIN IMMEDIATE.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional
+
+from src.config import (
+    JOB_QUEUE_DB, JOB_QUEUE_JOURNAL_MODE, JOB_LEASE_SECONDS, JOB_MAX_ATTEMPTS, JOB_RETRY_DELAY
+)
+
+JOB_PENDING = "pending"
+JOB_LEASED = "leased"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+
+class JobQueue:
+    """
+    File de tâches avec baux, reprises et résultats.
+    """
+
+    def __init__(
+        self,
+        db_path: str = JOB_QUEUE_DB,
+        lease_seconds: float = JOB_LEASE_SECONDS,
+        max_attempts: int = JOB_MAX_ATTEMPTS,
+        retry_delay: float = JOB_RETRY_DELAY,
+        journal_mode: str = JOB_QUEUE_JOURNAL_MODE
+    ):
+        """
+        Args:
+            db_path: Fichier SQLite de la file
+            lease_seconds: Durée d'un bail (renouvelé par heartbeat)
+            max_attempts: Tentatives par défaut d'une tâche
+            retry_delay: Délai avant la 1re reprise (doublé à chaque échec)
+            journal_mode: WAL en local ; DELETE sur un système de fichiers réseau
+        """
+        self.db_path = db_path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.journal_mode = journal_mode
+        self._local = threading.local()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Une connexion par thread (et par processus après un fork)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=60, isolation_level=None)
+        conn.execute(f"PRAGMA journal_mode={self.journal_mode}")
+        conn.executescript(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " kind TEXT NOT NULL,"
+            " run_id TEXT,"
+            " payload_json TEXT NOT NULL,"
+            " dedup_key TEXT UNIQUE,"
+            " wait_for TEXT,"
+            " priority INTEGER NOT NULL DEFAULT 0,"
+            " status TEXT NOT NULL,"
+            " attempts INTEGER NOT NULL DEFAULT 0,"
+            " max_attempts INTEGER NOT NULL,"
+            " available_at REAL NOT NULL,"
+            " lease_owner TEXT,"
+            " lease_expires REAL,"
+            " error TEXT,"
+            " created_at REAL NOT NULL,"
+            " updated_at REAL NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, priority, id);"
+            "CREATE INDEX IF NOT EXISTS idx_jobs_run ON jobs(run_id, kind, status);"
+            "CREATE TABLE IF NOT EXISTS job_results ("
+            " job_id INTEGER PRIMARY KEY,"
+            " run_id TEXT,"
+            " kind TEXT NOT NULL,"
+            " success INTEGER NOT NULL,"
+            " result_json TEXT NOT NULL,"
+            " created_at REAL NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS idx_job_results_run ON job_results(run_id, job_id);"
+        )
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        """Transaction en écriture exclusive (sérialise les prises de tâches)."""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    # ------------------------------------------------------------------
+    # Soumission
+    # ------------------------------------------------------------------
+
+    def submit_many(self, jobs: Iterable[Dict]) -> List[Optional[int]]:
+        """
+        Ajoute plusieurs tâches dans une même transaction.
+
+        Chaque tâche est un dict : kind, payload (dict), run_id, dedup_key
+        (une tâche de même clé déjà soumise n'est pas dupliquée), wait_for
+        (type de tâche : pas de prise tant qu'une tâche de ce type reste
+        ouverte pour le même run_id), priority, max_attempts.
+
+        Returns:
+            Identifiants des tâches créées (None pour une tâche dédupliquée)
+        """
+        now = time.time()
+        ids = []
+        with self._transaction() as conn:
+            for job in jobs:
+                cursor = conn.execute(
+                    "INSERT OR IGNORE INTO jobs (kind, run_id, payload_json, dedup_key, wait_for, priority,"
+                    " status, max_attempts, available_at, created_at, updated_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        job["kind"], job.get("run_id"),
+                        json.dumps(job.get("payload") or {}, ensure_ascii=False),
+                        job.get("dedup_key"), job.get("wait_for"), job.get("priority", 0),
+                        JOB_PENDING, job.get("max_attempts") or self.max_attempts, now, now, now,
+                    )
+                )
+                ids.append(cursor.lastrowid if cursor.rowcount else None)
+        return ids
+
+    def submit(self, kind: str, payload: Optional[Dict] = None, run_id: Optional[str] = None, **options) -> Optional[int]:
+        """Ajoute une tâche (options : voir submit_many)."""
+        return self.submit_many([dict(options, kind=kind, payload=payload, run_id=run_id)])[0]
+
+    # ------------------------------------------------------------------
+    # Baux
+    # ------------------------------------------------------------------
+
+    def lease(self, owner: str, kinds: Optional[Iterable[str]] = None) -> Optional[Dict]:
+        """
+        Prend la prochaine tâche disponible (en attente, ou dont le bail a expiré).
+
+        Args:
+            owner: Identifiant du worker (ex: "hote:pid")
+            kinds: Types de tâches acceptés (None = tous)
+
+        Returns:
+            {"id", "kind", "run_id", "payload", "attempts", "max_attempts"}, ou None
+        """
+        now = time.time()
+        kinds = list(kinds) if kinds else None
+        with self._transaction() as conn:
+            # Baux expirés sans tentative restante : échec définitif
+            expired = conn.execute(
+                "SELECT id, run_id, kind FROM jobs WHERE status = ? AND lease_expires < ? AND attempts >= max_attempts",
+                (JOB_LEASED, now)
+            ).fetchall()
+            for job_id, run_id, kind in expired:
+                self._finish(conn, job_id, run_id, kind, JOB_FAILED, {"error": "Bail expiré"}, "Bail expiré", now)
+
+            query = (
+                "SELECT id, kind, run_id, payload_json, attempts, max_attempts FROM jobs AS j"
+                " WHERE ((status = ? AND available_at <= ?) OR (status = ? AND lease_expires < ?))"
+                " AND (wait_for IS NULL OR NOT EXISTS ("
+                "   SELECT 1 FROM jobs AS o WHERE o.run_id = j.run_id AND o.kind = j.wait_for"
+                "   AND o.status IN (?, ?)))"
+            )
+            params = [JOB_PENDING, now, JOB_LEASED, now, JOB_PENDING, JOB_LEASED]
+            if kinds:
+                query += f" AND kind IN ({', '.join('?' for _ in kinds)})"
+                params.extend(kinds)
+            row = conn.execute(query + " ORDER BY priority DESC, id LIMIT 1", params).fetchone()
+            if row is None:
+                return None
+
+            conn.execute(
+                "UPDATE jobs SET status = ?, attempts = attempts + 1, lease_owner = ?, lease_expires = ?,"
+                " updated_at = ? WHERE id = ?",
+                (JOB_LEASED, owner, now + self.lease_seconds, now, row[0])
+            )
+        return {
+            "id": row[0], "kind": row[1], "run_id": row[2], "payload": json.loads(row[3]),
+            "attempts": row[4] + 1, "max_attempts": row[5],
+        }
+
+    def heartbeat(self, job_id: int, owner: str) -> bool:
+        """Prolonge le bail ; False si la tâche n'appartient plus à ce worker."""
+        cursor = self._connect().execute(
+            "UPDATE jobs SET lease_expires = ?, updated_at = ? WHERE id = ? AND status = ? AND lease_owner = ?",
+            (time.time() + self.lease_seconds, time.time(), job_id, JOB_LEASED, owner)
+        )
+        return cursor.rowcount == 1
+
+    def _finish(self, conn, job_id, run_id, kind, status, result, error, now):
+        conn.execute(
+            "UPDATE jobs SET status = ?, error = ?, lease_owner = NULL, lease_expires = NULL, updated_at = ?"
+            " WHERE id = ?",
+            (status, error, now, job_id)
+        )
+        conn.execute(
+            "INSERT OR REPLACE INTO job_results (job_id, run_id, kind, success, result_json, created_at)"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            (job_id, run_id, kind, int(status == JOB_DONE),
+             json.dumps(result, ensure_ascii=False, default=str), now)
+        )
+
+    def complete(self, job_id: int, owner: str, result: Optional[Dict] = None) -> bool:
+        """
+        Marque une tâche terminée et enregistre son résultat.
+
+        Returns:
+            False si le bail avait été perdu (la tâche a été reprise ailleurs)
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT run_id, kind FROM jobs WHERE id = ? AND status = ? AND lease_owner = ?",
+                (job_id, JOB_LEASED, owner)
+            ).fetchone()
+            if row is None:
+                return False
+            self._finish(conn, job_id, row[0], row[1], JOB_DONE, result or {}, None, now)
+        return True
+
+    def fail(self, job_id: int, owner: str, error: str) -> Optional[str]:
+        """
+        Enregistre l'échec d'une tentative.
+
+        Returns:
+            "pending" si la tâche sera relancée, "failed" si les tentatives sont
+            épuisées, None si le bail avait été perdu
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT run_id, kind, attempts, max_attempts FROM jobs"
+                " WHERE id = ? AND status = ? AND lease_owner = ?",
+                (job_id, JOB_LEASED, owner)
+            ).fetchone()
+            if row is None:
+                return None
+            run_id, kind, attempts, max_attempts = row
+            if attempts >= max_attempts:
+                self._finish(conn, job_id, run_id, kind, JOB_FAILED, {"error": error}, error, now)
+                return JOB_FAILED
+            conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, lease_owner = NULL, lease_expires = NULL,"
+                " available_at = ?, updated_at = ? WHERE id = ?",
+                (JOB_PENDING, error, now + self.retry_delay * 2 ** (attempts - 1), now, job_id)
+            )
+        return JOB_PENDING
+
+    # ------------------------------------------------------------------
+    # Consultation
+    # ------------------------------------------------------------------
+
+    def stats(self, run_id: Optional[str] = None) -> Dict[str, Dict[str, int]]:
+        """Nombre de tâches par type et par statut ({kind: {status: n}})."""
+        query = "SELECT kind, status, COUNT(*) FROM jobs"
+        params = ()
+        if run_id is not None:
+            query += " WHERE run_id = ?"
+            params = (run_id,)
+        stats: Dict[str, Dict[str, int]] = {}
+        for kind, status, count in self._connect().execute(query + " GROUP BY kind, status", params):
+            stats.setdefault(kind, {})[status] = count
+        return stats
+
+    def open_jobs(self, run_id: Optional[str] = None) -> int:
+        """Tâches en attente ou en cours (pour une exécution, ou en tout)."""
+        query = "SELECT COUNT(*) FROM jobs WHERE status IN (?, ?)"
+        params = [JOB_PENDING, JOB_LEASED]
+        if run_id is not None:
+            query += " AND run_id = ?"
+            params.append(run_id)
+        return self._connect().execute(query, params).fetchone()[0]
+
+    def results(self, run_id: str) -> List[Dict]:
+        """Résultats des tâches terminées d'une exécution, dans l'ordre des tâches."""
+        rows = self._connect().execute(
+            "SELECT job_id, kind, success, result_json, created_at FROM job_results"
+            " WHERE run_id = ? ORDER BY job_id",
+            (run_id,)
+        ).fetchall()
+        return [
+            {"job_id": r[0], "kind": r[1], "success": bool(r[2]), "result": json.loads(r[3]), "finished_at": r[4]}
+            for r in rows
+        ]
+
+
+# Instance globale (la base SQLite est créée au premier accès)
+job_queue = JobQueue()
@@ -0,0 +1,248 @@
+"""
+Cache persistant des réponses LLM, adressé par contenu.
+
+La clé est le hash SHA-256 de (modèle, prompt, configuration de génération) :
+relancer main.py sur le même dossier renvoie les réponses déjà payées sans
+appel réseau. Stockage SQLite en mode WAL pour que plusieurs exécutions
+parallèles partagent le même cache. Éviction LRU par taille et par âge.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from src.config import LLM_CACHE_DB, LLM_CACHE_MAX_MB, LLM_CACHE_MAX_AGE_DAYS, LLM_CACHE_BYPASS
+
+
+class LLMCache:
+    """
+    Cache clé/valeur des réponses LLM avec éviction LRU.
+    """
+
+    # Nombre d'insertions entre deux passes d'éviction
+    EVICTION_INTERVAL = 20
+
+    def __init__(
+        self,
+        db_path: str = LLM_CACHE_DB,
+        max_bytes: int = int(LLM_CACHE_MAX_MB * 1024 * 1024),
+        max_age_seconds: float = LLM_CACHE_MAX_AGE_DAYS * 86400,
+        bypass: bool = LLM_CACHE_BYPASS
+    ):
+        """
+        Args:
+            db_path: Fichier SQLite du cache
+            max_bytes: Taille maximale cumulée des réponses stockées
+            max_age_seconds: Âge maximal depuis le dernier accès
+            bypass: Si True, le cache n'est ni lu ni écrit
+        """
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.bypass = bypass
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._puts_since_eviction = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        """Une connexion par thread (et par processus après un fork)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            " key TEXT PRIMARY KEY,"
+            " model TEXT NOT NULL,"
+            " response TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " last_access REAL NOT NULL,"
+            " hits INTEGER NOT NULL DEFAULT 0)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_access ON llm_cache(last_access)")
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    @staticmethod
+    def make_key(model_name: str, prompt: str, generation_config: Optional[dict] = None) -> str:
+        """
+        Calcule la clé de cache.
+
+        Args:
+            model_name: Modèle interrogé
+            prompt: Prompt complet
+            generation_config: Paramètres de génération (température, ...)
+
+        Returns:
+            Hash SHA-256 hexadécimal
+        """
+        payload = json.dumps(
+            {"model": model_name, "prompt": prompt, "config": generation_config or {}},
+            sort_keys=True,
+            ensure_ascii=False,
+            default=str
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, model_name: str, prompt: str, generation_config: Optional[dict] = None) -> Optional[str]:
+        """
+        Cherche une réponse en cache.
+
+        Returns:
+            La réponse, ou None si absente, expirée ou si le cache est contourné
+        """
+        if self.bypass:
+            return None
+
+        key = self.make_key(model_name, prompt, generation_config)
+        now = time.time()
+        try:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT response, last_access FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and now - row[1] > self.max_age_seconds:
+                conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                row = None
+            if row is not None:
+                conn.execute(
+                    "UPDATE llm_cache SET last_access = ?, hits = hits + 1 WHERE key = ?",
+                    (now, key)
+                )
+        except sqlite3.Error as e:
+            print(f"  ⚠️  Cache LLM indisponible: {e}")
+            row = None
+
+        with self._lock:
+            if row is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+        return row[0] if row is not None else None
+
+    def put(self, model_name: str, prompt: str, response: str, generation_config: Optional[dict] = None):
+        """Enregistre une réponse (remplace une éventuelle entrée existante)."""
+        if self.bypass or response is None:
+            return
+
+        key = self.make_key(model_name, prompt, generation_config)
+        now = time.time()
+        try:
+            self._connect().execute(
+                "INSERT OR REPLACE INTO llm_cache"
+                " (key, model, response, size, created_at, last_access, hits)"
+                " VALUES (?, ?, ?, ?, ?, ?, 0)",
+                (key, model_name, response, len(response.encode("utf-8")), now, now)
+            )
+        except sqlite3.Error as e:
+            print(f"  ⚠️  Écriture du cache LLM impossible: {e}")
+            return
+
+        with self._lock:
+            self._puts_since_eviction += 1
+            run_eviction = self._puts_since_eviction >= self.EVICTION_INTERVAL
+            if run_eviction:
+                self._puts_since_eviction = 0
+        if run_eviction:
+            self.evict()
+
+    def delete(self, model_name: str, prompt: str, generation_config: Optional[dict] = None) -> bool:
+        """
+        Supprime une réponse (rejetée par l'appelant : JSON invalide, code qui ne compile pas...).
+
+        Returns:
+            True si une entrée a été supprimée
+        """
+        key = self.make_key(model_name, prompt, generation_config)
+        try:
+            return self._connect().execute("DELETE FROM llm_cache WHERE key = ?", (key,)).rowcount > 0
+        except sqlite3.Error as e:
+            print(f"  ⚠️  Suppression dans le cache LLM impossible: {e}")
+            return False
+
+    def evict(self) -> int:
+        """
+        Supprime les entrées expirées puis les moins récemment utilisées
+        jusqu'à repasser sous la taille maximale.
+
+        Returns:
+            Nombre d'entrées supprimées
+        """
+        try:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                removed = conn.execute(
+                    "DELETE FROM llm_cache WHERE last_access < ?",
+                    (time.time() - self.max_age_seconds,)
+                ).rowcount
+
+                total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+                if total > self.max_bytes:
+                    excess = total - self.max_bytes
+                    freed = 0
+                    victims = []
+                    for key, size in conn.execute(
+                        "SELECT key, size FROM llm_cache ORDER BY last_access ASC"
+                    ):
+                        if freed >= excess:
+                            break
+                        victims.append((key,))
+                        freed += size
+                    conn.executemany("DELETE FROM llm_cache WHERE key = ?", victims)
+                    removed += len(victims)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            return removed
+        except sqlite3.Error as e:
+            print(f"  ⚠️  Éviction du cache LLM impossible: {e}")
+            return 0
+
+    def clear(self):
+        """Vide entièrement le cache."""
+        self._connect().execute("DELETE FROM llm_cache")
+
+    def get_stats(self) -> dict:
+        """
+        Retourne les compteurs du cache.
+
+        Returns:
+            Dictionnaire (hits/misses de ce processus, taux, entrées, taille)
+        """
+        with self._lock:
+            hits, misses = self._hits, self._misses
+        entries, size = 0, 0
+        if not self.bypass:
+            try:
+                entries, size = self._connect().execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache"
+                ).fetchone()
+            except sqlite3.Error:
+                pass
+        total = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / total if total else 0.0,
+            "entries": entries,
+            "size_bytes": size,
+            "bypass": self.bypass
+        }
+
+
+# Instance globale (la base SQLite est ouverte au premier accès)
+llm_cache = LLMCache()
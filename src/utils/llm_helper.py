@@ -1,30 +1,275 @@
 """
 Helper functions for LLM API calls with retry logic.
 Centralizes all Gemini API interactions to avoid code duplication.
+
+Two entry points are available:
+- call_gemini_with_retry: blocking call, one request at a time
+- acall_llm / gather_llm: asyncio API, many requests in flight at once
+  (bounded by LLM_MAX_CONCURRENCY)
+
+In batch mode (main.py --targets) every worker process also holds a slot
+of a semaphore shared by the whole batch while a request is in flight, and
+token usage is accounted per process (see get_token_usage).
 """
+import asyncio
+import threading
 import time
-import google.generativeai as genai
-from google.api_core import exceptions
-from src.config import DEFAULT_MODEL, MAX_RETRIES, DEV_MODE
+import weakref
+from contextlib import asynccontextmanager, contextmanager
+from typing import Callable, Dict, List, Optional
+
+from src.config import DEFAULT_MODEL, MAX_RETRIES, DEV_MODE, LLM_MAX_CONCURRENCY, GOOGLE_API_KEY
+from src.utils.rate_limiter import rate_limiter
+from src.utils.llm_cache import llm_cache
+from src.utils.token_estimator import token_estimator
+
+
+# google.generativeai is imported and configured on first use, not at import time
+_GENAI = None
+_GENAI_LOCK = threading.Lock()
+
+# Model instances are reused across calls instead of being rebuilt per attempt
+_MODEL_CACHE = {}
+_MODEL_LOCK = threading.Lock()
+
+# One semaphore per event loop (asyncio primitives are bound to their loop)
+_SEMAPHORES = weakref.WeakKeyDictionary()
+
+# Cross-process semaphore shared by the workers of a batch run (None = no global cap)
+_GLOBAL_SLOTS = None
+
+# Tokens reported by the API (usage_metadata) in this process
+_USAGE = {"calls": 0, "prompt_tokens": 0, "output_tokens": 0, "total_tokens": 0}
+_USAGE_LOCK = threading.Lock()
+
+
+def set_global_llm_slots(semaphore) -> None:
+    """
+    Installs a semaphore shared with other processes (e.g. a
+    multiprocessing.BoundedSemaphore created by the batch parent): every
+    API request then holds one of its slots while in flight.
+    """
+    global _GLOBAL_SLOTS
+    _GLOBAL_SLOTS = semaphore
+
+
+@contextmanager
+def _global_slot():
+    if _GLOBAL_SLOTS is None:
+        yield
+        return
+    _GLOBAL_SLOTS.acquire()
+    try:
+        yield
+    finally:
+        _GLOBAL_SLOTS.release()
+
+
+@asynccontextmanager
+async def _aglobal_slot():
+    if _GLOBAL_SLOTS is None:
+        yield
+        return
+    # The shared semaphore blocks: wait for it off the event loop
+    await asyncio.get_running_loop().run_in_executor(None, _GLOBAL_SLOTS.acquire)
+    try:
+        yield
+    finally:
+        _GLOBAL_SLOTS.release()
+
+
+def _record_usage(response, prompt) -> None:
+    usage = getattr(response, "usage_metadata", None)
+    # Calibrates estimate_tokens against the model's own tokenizer
+    if isinstance(prompt, str):
+        token_estimator.observe(len(prompt), getattr(usage, "prompt_token_count", 0) or 0)
+    with _USAGE_LOCK:
+        _USAGE["calls"] += 1
+        _USAGE["prompt_tokens"] += getattr(usage, "prompt_token_count", 0) or 0
+        _USAGE["output_tokens"] += getattr(usage, "candidates_token_count", 0) or 0
+        _USAGE["total_tokens"] += getattr(usage, "total_token_count", 0) or 0
+
+
+def get_token_usage() -> Dict[str, int]:
+    """API calls and tokens (prompt/output/total) used by this process since the last reset."""
+    with _USAGE_LOCK:
+        return dict(_USAGE)
+
+
+def reset_token_usage() -> None:
+    """Resets the per-process token counters (e.g. before each target of a batch)."""
+    with _USAGE_LOCK:
+        for key in _USAGE:
+            _USAGE[key] = 0
+
+
+def get_genai():
+    """
+    Returns the google.generativeai module, configured with GOOGLE_API_KEY.
+    
+    The SDK (and grpc behind it) is only imported by the first API call,
+    so importing the agents stays cheap.
+    """
+    global _GENAI
+    if _GENAI is None:
+        with _GENAI_LOCK:
+            if _GENAI is None:
+                import google.generativeai as genai
+                if not DEV_MODE:
+                    genai.configure(api_key=GOOGLE_API_KEY)
+                _GENAI = genai
+    return _GENAI
+
+
+def _is_quota_error(e: Exception) -> bool:
+    from google.api_core import exceptions
+    return isinstance(e, exceptions.ResourceExhausted)
+
+
+def get_model(model_name: str = DEFAULT_MODEL) -> "genai.GenerativeModel":
+    """
+    Returns a shared GenerativeModel instance for the given model name.
+    
+    Args:
+        model_name: Model identifier (e.g., 'gemini-2.0-flash-exp')
+    
+    Returns:
+        Cached genai.GenerativeModel
+    """
+    model = _MODEL_CACHE.get(model_name)
+    if model is None:
+        with _MODEL_LOCK:
+            model = _MODEL_CACHE.get(model_name)
+            if model is None:
+                model = get_genai().GenerativeModel(model_name)
+                _MODEL_CACHE[model_name] = model
+    return model
+
+
+def _on_quota_exhausted(model_name: str, attempt: int, max_retries: int) -> float:
+    """
+    Handles a ResourceExhausted error: shrinks the shared rate limit.
+    
+    The next rate_limiter.acquire() waits for the cooldown, so callers
+    do not need to sleep themselves.
+    
+    Returns:
+        Cooldown imposed by the rate limiter (seconds)
+    
+    Raises:
+        Exception: If this was the last attempt
+    """
+    cooldown = rate_limiter.record_throttle(model_name)
+    print(f"  ⚠️  Rate limit atteint (tentative {attempt + 1}/{max_retries})")
+    
+    if attempt < max_retries - 1:
+        print(f"  ⏱️  Débit réduit, prochain essai dans ~{cooldown:.0f}s...")
+        return cooldown
+    
+    # Max retries reached
+    print(f"  ❌ Quota épuisé après {max_retries} tentatives")
+    print(f"  💡 Solutions:")
+    print(f"     1. Activez DEV_MODE=True dans config.py")
+    print(f"     2. Attendez 1-2 minutes avant de réessayer")
+    print(f"     3. Vérifiez votre quota sur https://aistudio.google.com/")
+    raise Exception(f"Quota épuisé après {max_retries} tentatives")
+
+
+def _extra_tokens_used(response, estimated_tokens: int) -> int:
+    """Tokens reported by the API beyond the amount reserved before the call."""
+    usage = getattr(response, "usage_metadata", None)
+    total = getattr(usage, "total_token_count", 0) or 0
+    return max(0, total - estimated_tokens)
+
+
+def _raise_api_error(e: Exception):
+    """Converts a non-retryable API error into the exception raised to agents."""
+    from google.api_core import exceptions
+    
+    if isinstance(e, exceptions.InvalidArgument):
+        # Invalid request (bad prompt, wrong parameters)
+        print(f"  ❌ Requête invalide: {str(e)}")
+        raise Exception(f"Requête invalide: {str(e)}")
+    
+    if isinstance(e, exceptions.PermissionDenied):
+        # API key issues
+        print(f"  ❌ Erreur d'authentification: {str(e)}")
+        print(f"  💡 Vérifiez votre clé API dans .env")
+        raise Exception(f"Erreur d'authentification: {str(e)}")
+    
+    # Other errors
+    print(f"  ❌ Erreur inattendue: {type(e).__name__}: {str(e)}")
+    raise Exception(f"Erreur Gemini: {str(e)}")
+
+
+def _accepted(validate: Optional[Callable[[str], bool]], response: str) -> bool:
+    if validate is None:
+        return True
+    try:
+        return bool(validate(response))
+    except Exception:
+        return False
+
+
+def _cached_response(
+    model_name: str,
+    prompt: str,
+    generation_config: Optional[dict],
+    validate: Optional[Callable[[str], bool]]
+) -> Optional[str]:
+    """Cached response, or None (a cached response rejected by validate is dropped)."""
+    cached = llm_cache.get(model_name, prompt, generation_config)
+    if cached is None:
+        return None
+    if not _accepted(validate, cached):
+        llm_cache.delete(model_name, prompt, generation_config)
+        print("  🗑️  Réponse en cache rejetée: nouvel appel au LLM")
+        return None
+    print("  💾 Réponse servie depuis le cache LLM")
+    return cached
+
+
+def _store_response(
+    model_name: str,
+    prompt: str,
+    response: str,
+    generation_config: Optional[dict],
+    validate: Optional[Callable[[str], bool]]
+):
+    """Caches a response only once the caller's validate accepts it."""
+    if _accepted(validate, response):
+        llm_cache.put(model_name, prompt, response, generation_config)
 
 
 def call_gemini_with_retry(
     prompt: str, 
     model_name: str = DEFAULT_MODEL, 
     max_retries: int = MAX_RETRIES,
-    mock_response: str = None
+    mock_response: str = None,
+    generation_config: Optional[dict] = None,
+    use_cache: bool = True,
+    validate: Optional[Callable[[str], bool]] = None
 ) -> str:
     """
     Calls Gemini API with retry logic or returns mock in DEV_MODE.
     
-    Implements exponential backoff and rate limit handling.
-    In production, adds delays between calls to respect rate limits.
+    Responses are served from the persistent LLM cache when the same
+    (model, prompt, generation config) was already answered.
+    
+    Calls are paced by the shared adaptive rate limiter (RPM/TPM token
+    buckets); a ResourceExhausted error shrinks the allowed rate for
+    every process using the same API key.
     
     Args:
         prompt: The prompt to send to the LLM
         model_name: Model identifier (e.g., 'gemini-2.0-flash-exp')
         max_retries: Maximum number of retry attempts
         mock_response: Response to return in DEV_MODE
+        generation_config: Optional generation parameters (temperature, ...)
+        use_cache: Set to False to skip the response cache for this call
+        validate: Caller's acceptance check (valid JSON, code that compiles...).
+            A rejected response is still returned but never cached, so a
+            retry or a later run asks the model again
     
     Returns:
         LLM response text
@@ -42,73 +287,209 @@ def call_gemini_with_retry(
         
         return mock_response
     
+    if use_cache:
+        cached = _cached_response(model_name, prompt, generation_config, validate)
+        if cached is not None:
+            return cached
+    
+    model = get_model(model_name)
+    estimated_tokens = estimate_tokens(prompt)
+    
     for attempt in range(max_retries):
+        # Rate limit management: wait for a slot in the shared token buckets
+        waited = rate_limiter.acquire(model_name, estimated_tokens)
+        if waited >= 1:
+            print(f"  ⏳ Limiteur de débit: attente de {waited:.1f}s")
+        
         try:
-            model = genai.GenerativeModel(model_name)
-            
-            # Rate limit management: add delays between calls
-            if attempt > 0:
-                # Exponential backoff for retries
-                wait_time = 10 * (2 ** (attempt - 1))  # 10s, 20s, 40s
-                print(f"  ⏳ Retry {attempt + 1}/{max_retries} dans {wait_time}s...")
-                time.sleep(wait_time)
-            else:
-                # Normal delay between calls: 4s allows ~15 calls/minute
-                time.sleep(7)
-            
-            # Make the API call
-            response = model.generate_content(prompt)
+            with _global_slot():
+                response = model.generate_content(prompt, generation_config=generation_config)
+            _record_usage(response, prompt)
+            rate_limiter.record_success(model_name, _extra_tokens_used(response, estimated_tokens))
+            if use_cache:
+                _store_response(model_name, prompt, response.text, generation_config, validate)
             return response.text
             
-        except exceptions.ResourceExhausted as e:
-            print(f"  ⚠️  Rate limit atteint (tentative {attempt + 1}/{max_retries})")
-            
-            if attempt < max_retries - 1:
-                # Long wait for rate limit: 60s per attempt
-                wait_time = 60 * (attempt + 1)  # 60s, 120s, 180s
-                print(f"  ⏱️  Attente de {wait_time}s avant retry...")
-                time.sleep(wait_time)
-            else:
-                # Max retries reached
-                print(f"  ❌ Quota épuisé après {max_retries} tentatives")
-                print(f"  💡 Solutions:")
-                print(f"     1. Activez DEV_MODE=True dans config.py")
-                print(f"     2. Attendez 1-2 minutes avant de réessayer")
-                print(f"     3. Vérifiez votre quota sur https://aistudio.google.com/")
-                raise Exception(f"Quota épuisé après {max_retries} tentatives")
-                
-        except exceptions.InvalidArgument as e:
-            # Invalid request (bad prompt, wrong parameters)
-            print(f"  ❌ Requête invalide: {str(e)}")
-            raise Exception(f"Requête invalide: {str(e)}")
-            
-        except exceptions.PermissionDenied as e:
-            # API key issues
-            print(f"  ❌ Erreur d'authentification: {str(e)}")
-            print(f"  💡 Vérifiez votre clé API dans .env")
-            raise Exception(f"Erreur d'authentification: {str(e)}")
-            
         except Exception as e:
-            # Other errors
-            print(f"  ❌ Erreur inattendue: {type(e).__name__}: {str(e)}")
-            raise Exception(f"Erreur Gemini: {str(e)}")
+            if not _is_quota_error(e):
+                _raise_api_error(e)
+            _on_quota_exhausted(model_name, attempt, max_retries)
+    
+    raise Exception(f"Max retries ({max_retries}) reached without success")
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+    """Returns the concurrency semaphore bound to the running event loop."""
+    loop = asyncio.get_running_loop()
+    semaphore = _SEMAPHORES.get(loop)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(max(1, LLM_MAX_CONCURRENCY))
+        _SEMAPHORES[loop] = semaphore
+    return semaphore
+
+
+async def acall_llm(
+    prompt: str,
+    model_name: str = DEFAULT_MODEL,
+    max_retries: int = MAX_RETRIES,
+    mock_response: str = None,
+    generation_config: Optional[dict] = None,
+    use_cache: bool = True,
+    validate: Optional[Callable[[str], bool]] = None
+) -> str:
+    """
+    Async version of call_gemini_with_retry.
+    
+    At most LLM_MAX_CONCURRENCY requests are in flight per event loop,
+    and every request is paced by the shared rate limiter; the semaphore
+    is only held during the API call itself.
+    
+    Args:
+        prompt: The prompt to send to the LLM
+        model_name: Model identifier (e.g., 'gemini-2.0-flash-exp')
+        max_retries: Maximum number of retry attempts
+        mock_response: Response to return in DEV_MODE
+        generation_config: Optional generation parameters (temperature, ...)
+        use_cache: Set to False to skip the response cache for this call
+        validate: Caller's acceptance check (valid JSON, code that compiles...).
+            A rejected response is still returned but never cached, so a
+            retry or a later run asks the model again
+    
+    Returns:
+        LLM response text
+        
+    Raises:
+        Exception: If quota is exhausted or other API errors occur
+    """
+    if DEV_MODE:
+        print("  🔧 MODE DEV - Réponse simulée")
+        await asyncio.sleep(0.5)  # Simulate API delay
+        return mock_response if mock_response is not None else "# Mock response in DEV mode"
+    
+    if use_cache:
+        cached = _cached_response(model_name, prompt, generation_config, validate)
+        if cached is not None:
+            return cached
+    
+    model = get_model(model_name)
+    semaphore = _get_semaphore()
+    estimated_tokens = estimate_tokens(prompt)
+    
+    for attempt in range(max_retries):
+        await rate_limiter.aacquire(model_name, estimated_tokens)
+        
+        try:
+            async with semaphore, _aglobal_slot():
+                response = await model.generate_content_async(prompt, generation_config=generation_config)
+            _record_usage(response, prompt)
+            await rate_limiter.arecord_success(model_name, _extra_tokens_used(response, estimated_tokens))
+            if use_cache:
+                _store_response(model_name, prompt, response.text, generation_config, validate)
+            return response.text
+        
+        except Exception as e:
+            if not _is_quota_error(e):
+                _raise_api_error(e)
+            # record_throttle écrit dans SQLite : hors de la boucle d'événements
+            await asyncio.get_running_loop().run_in_executor(
+                None, _on_quota_exhausted, model_name, attempt, max_retries
+            )
     
     raise Exception(f"Max retries ({max_retries}) reached without success")
 
 
+async def gather_llm(
+    prompts: List[str],
+    model_name: str = DEFAULT_MODEL,
+    max_retries: int = MAX_RETRIES,
+    mock_responses: Optional[List[str]] = None,
+    return_exceptions: bool = False,
+    validate: Optional[Callable[[str], bool]] = None
+) -> list:
+    """
+    Sends several prompts concurrently and returns responses in prompt order.
+    
+    Args:
+        prompts: Prompts to send
+        model_name: Model identifier
+        max_retries: Maximum number of retry attempts per prompt
+        mock_responses: Responses to return in DEV_MODE (one per prompt)
+        return_exceptions: If True, failed prompts yield their exception
+            instead of cancelling the whole batch
+        validate: Acceptance check applied to each response before caching
+    
+    Returns:
+        List of response texts (or exceptions), same order as prompts
+    """
+    mocks = mock_responses if mock_responses is not None else [None] * len(prompts)
+    return await asyncio.gather(
+        *(
+            acall_llm(prompt, model_name=model_name, max_retries=max_retries, mock_response=mock, validate=validate)
+            for prompt, mock in zip(prompts, mocks)
+        ),
+        return_exceptions=return_exceptions
+    )
+
+
+def call_llm_batch(
+    prompts: List[str],
+    model_name: str = DEFAULT_MODEL,
+    max_retries: int = MAX_RETRIES,
+    mock_responses: Optional[List[str]] = None,
+    return_exceptions: bool = False,
+    validate: Optional[Callable[[str], bool]] = None
+) -> list:
+    """
+    Blocking wrapper around gather_llm for synchronous agent code.
+    
+    Works whether or not an event loop is already running in this thread
+    (in the latter case the batch runs on a helper thread).
+    
+    Returns:
+        List of response texts (or exceptions), same order as prompts
+    """
+    coro_factory = lambda: gather_llm(
+        prompts,
+        model_name=model_name,
+        max_retries=max_retries,
+        mock_responses=mock_responses,
+        return_exceptions=return_exceptions,
+        validate=validate
+    )
+    
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro_factory())
+    
+    result = {}
+    
+    def runner():
+        try:
+            result["value"] = asyncio.run(coro_factory())
+        except BaseException as e:
+            result["error"] = e
+    
+    thread = threading.Thread(target=runner, name="llm-batch")
+    thread.start()
+    thread.join()
+    if "error" in result:
+        raise result["error"]
+    return result["value"]
+
+
 def estimate_tokens(text: str) -> int:
     """
-    Rough estimation of token count.
+    Fast estimation of token count.
     
     Args:
         text: Text to estimate
         
     Returns:
-        Estimated token count (rough approximation)
+        Estimated token count: characters divided by the chars/token ratio
+        calibrated on the usage reported by the API (~3 until calibrated)
     """
-    # Rough estimate: ~4 characters per token for English/code
-    # ~2-3 characters per token for French
-    return len(text) // 3
+    return token_estimator.estimate(text)
 
 
 def truncate_for_context(text: str, max_tokens: int = 2000) -> str:
@@ -127,8 +508,8 @@ def truncate_for_context(text: str, max_tokens: int = 2000) -> str:
     if estimated_tokens <= max_tokens:
         return text
     
-    # Calculate how many characters to keep
-    max_chars = max_tokens * 3
+    # Same calibrated chars/token ratio as estimate_tokens and the rate limiter
+    max_chars = int(max_tokens * token_estimator.chars_per_token)
     truncated = text[:max_chars]
     
     return truncated + f"\n\n... [Tronqué: {estimated_tokens - max_tokens} tokens supprimés]"
\ No newline at end of file
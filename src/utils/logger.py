@@ -1,12 +1,32 @@
+import atexit
+import glob
 import json
 import os
+import queue
+import threading
+import time
 import uuid
+from contextlib import contextmanager
 from datetime import datetime
 from enum import Enum
 
-# Chemin du fichier de logs
+try:
+    import fcntl
+except ImportError:  # Windows : exports non sérialisés entre processus
+    fcntl = None
+
+# Chemin du fichier de logs (format liste attendu par validate_logs.py)
 LOG_FILE = os.path.join("logs", "experiment_data.json")
 
+# Journal append-only (JSON Lines) alimenté par le writer en arrière-plan
+JSONL_LOG_FILE = os.path.join("logs", "experiment_data.jsonl")
+
+# Intervalle maximal (secondes) entre deux écritures sur disque
+FLUSH_INTERVAL = float(os.getenv("LOG_FLUSH_INTERVAL", "1.0"))
+
+# Nombre d'entrées accumulées avant une écriture immédiate
+FLUSH_BATCH_SIZE = int(os.getenv("LOG_FLUSH_BATCH_SIZE", "50"))
+
 class ActionType(str, Enum):
     """
     Énumération des types d'actions possibles pour standardiser l'analyse.
@@ -16,10 +36,122 @@ class ActionType(str, Enum):
     DEBUG = "DEBUG"             # Analyse d'erreurs d'exécution
     FIX = "FIX"                 # Application de correctifs
 
+
+class _JsonlWriter:
+    """
+    Writer bufferisé : les entrées sont mises en file et un thread dédié
+    les ajoute par lots à la fin du fichier JSONL.
+
+    Le coût d'un appel à log_experiment ne dépend donc plus de la taille
+    de l'historique (plus de relecture/réécriture complète du fichier).
+    """
+
+    _FLUSH = object()  # Marqueur de vidage forcé
+
+    def __init__(self, path: str, flush_interval: float, batch_size: int):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self._pid = None
+        self._queue = None
+        self._thread = None
+
+    def _ensure_started(self):
+        """Démarre le thread (ou le redémarre après un fork)."""
+        with self._lock:
+            if self._pid == os.getpid() and self._thread and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._queue = queue.Queue()
+            self._thread = threading.Thread(
+                target=self._run, name="experiment-log-writer", daemon=True
+            )
+            self._thread.start()
+
+    def submit(self, entry: dict):
+        """Ajoute une entrée à la file d'écriture (non bloquant)."""
+        self._ensure_started()
+        self._queue.put(entry)
+
+    def flush(self):
+        """Bloque jusqu'à ce que toutes les entrées en attente soient écrites."""
+        if self._queue is None or self._pid != os.getpid():
+            return
+        self._queue.put(self._FLUSH)
+        self._queue.join()
+
+    def _write(self, batch: list):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        lines = []
+        for entry in batch:
+            try:
+                # default=str : un objet non sérialisable dans details ne doit pas tuer le thread
+                lines.append(json.dumps(entry, ensure_ascii=False, default=str) + "\n")
+            except (TypeError, ValueError) as e:
+                print(f"⚠️ Attention : Entrée de log non sérialisable ignorée ({e}).")
+        lines = "".join(lines)
+        # Ouverture par lot : un export concurrent peut renommer le fichier sans perte
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(lines)
+
+    def _run(self):
+        batch = []
+        pending_markers = 0
+        last_write = time.monotonic()
+
+        while True:
+            timeout = max(0.0, self.flush_interval - (time.monotonic() - last_write))
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if item is self._FLUSH:
+                pending_markers += 1
+            elif item is not None:
+                batch.append(item)
+
+            due = time.monotonic() - last_write >= self.flush_interval
+            if pending_markers or len(batch) >= self.batch_size or (batch and due):
+                try:
+                    if batch:
+                        self._write(batch)
+                except (OSError, TypeError, ValueError) as e:
+                    print(f"⚠️ Attention : Écriture des logs impossible ({e}). {len(batch)} entrée(s) perdue(s).")
+                finally:
+                    for _ in range(len(batch) + pending_markers):
+                        self._queue.task_done()
+                    batch = []
+                    pending_markers = 0
+                    last_write = time.monotonic()
+            elif due:
+                last_write = time.monotonic()
+
+
+_writer = _JsonlWriter(JSONL_LOG_FILE, FLUSH_INTERVAL, FLUSH_BATCH_SIZE)
+
+
+def flush_logs():
+    """
+    Force l'écriture sur disque de toutes les entrées en attente.
+
+    Appelée automatiquement à la sortie du processus.
+    """
+    _writer.flush()
+
+
+atexit.register(flush_logs)
+
+
 def log_experiment(agent_name: str, model_used: str, action: ActionType, details: dict, status: str):
     """
     Enregistre une interaction d'agent pour l'analyse scientifique.
 
+    L'entrée est ajoutée au journal append-only `logs/experiment_data.jsonl`
+    par un thread d'écriture bufferisé. Utiliser `export_experiment_data()`
+    pour produire le fichier `logs/experiment_data.json` (format liste).
+
     Args:
         agent_name (str): Nom de l'agent (ex: "Auditor", "Fixer").
         model_used (str): Modèle LLM utilisé (ex: "gemini-1.5-flash").
@@ -56,9 +188,6 @@ def log_experiment(agent_name: str, model_used: str, action: ActionType, details
             )
 
     # --- 3. PRÉPARATION DE L'ENTRÉE ---
-    # Création du dossier logs s'il n'existe pas
-    os.makedirs("logs", exist_ok=True)
-    
     entry = {
         "id": str(uuid.uuid4()),  # ID unique pour éviter les doublons lors de la fusion des données
         "timestamp": datetime.now().isoformat(),
@@ -69,21 +198,94 @@ def log_experiment(agent_name: str, model_used: str, action: ActionType, details
         "status": status
     }
 
-    # --- 4. LECTURE & ÉCRITURE ROBUSTE ---
-    data = []
-    if os.path.exists(LOG_FILE):
+    # --- 4. ÉCRITURE APPEND-ONLY (thread en arrière-plan) ---
+    _writer.submit(entry)
+
+
+@contextmanager
+def _export_lock(json_path: str):
+    """Verrou exclusif entre processus pendant un export (libéré même après un crash)."""
+    if fcntl is None:
+        yield
+        return
+    os.makedirs(os.path.dirname(json_path) or ".", exist_ok=True)
+    with open(f"{json_path}.lock", "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
         try:
-            with open(LOG_FILE, 'r', encoding='utf-8') as f:
-                content = f.read().strip()
-                if content: # Vérifie que le fichier n'est pas juste vide
-                    data = json.loads(content)
-        except json.JSONDecodeError:
-            # Si le fichier est corrompu, on repart à zéro (ou on pourrait sauvegarder un backup)
-            print(f"⚠️ Attention : Le fichier de logs {LOG_FILE} était corrompu. Une nouvelle liste a été créée.")
-            data = []
-
-    data.append(entry)
-    
-    # Écriture
-    with open(LOG_FILE, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=4, ensure_ascii=False)
\ No newline at end of file
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def export_experiment_data(jsonl_path: str = JSONL_LOG_FILE, json_path: str = LOG_FILE) -> int:
+    """
+    Fusionne le journal JSONL dans le fichier JSON (liste) attendu par validate_logs.py.
+
+    Les entrées déjà présentes (même "id") ne sont pas dupliquées. Le journal
+    JSONL fusionné est ensuite supprimé pour que chaque entrée ne soit relue
+    qu'une seule fois. Les fichiers `*.exporting` laissés par un export
+    interrompu (crash) sont fusionnés au passage.
+
+    Args:
+        jsonl_path: Journal append-only à fusionner
+        json_path: Fichier de sortie au format liste
+
+    Returns:
+        Nombre d'entrées ajoutées au fichier JSON
+    """
+    flush_logs()
+
+    with _export_lock(json_path):
+        # Renommage atomique : les écritures concurrentes repartent sur un nouveau fichier
+        try:
+            os.replace(jsonl_path, f"{jsonl_path}.{os.getpid()}.exporting")
+        except FileNotFoundError:
+            pass  # Rien de nouveau (ou déjà pris par un autre export)
+
+        pending = sorted(glob.glob(f"{glob.escape(jsonl_path)}.*.exporting"))
+        if not pending:
+            return 0
+
+        data = []
+        if os.path.exists(json_path):
+            try:
+                with open(json_path, 'r', encoding='utf-8') as f:
+                    content = f.read().strip()
+                    if content:
+                        data = json.loads(content)
+            except json.JSONDecodeError:
+                print(f"⚠️ Attention : Le fichier de logs {json_path} était corrompu. Une nouvelle liste a été créée.")
+                data = []
+
+        seen_ids = {entry.get("id") for entry in data if isinstance(entry, dict)}
+        added = 0
+        for exporting_path in pending:
+            with open(exporting_path, 'r', encoding='utf-8') as f:
+                for line_number, line in enumerate(f, 1):
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        print(f"⚠️ Attention : Ligne {line_number} ignorée dans {exporting_path} (JSON invalide).")
+                        continue
+                    if entry.get("id") in seen_ids:
+                        continue
+                    seen_ids.add(entry.get("id"))
+                    data.append(entry)
+                    added += 1
+
+        # Écriture atomique du fichier liste
+        os.makedirs(os.path.dirname(json_path) or ".", exist_ok=True)
+        tmp_path = f"{json_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=4, ensure_ascii=False)
+        os.replace(tmp_path, json_path)
+        for exporting_path in pending:
+            try:
+                os.remove(exporting_path)
+            except FileNotFoundError:
+                pass
+
+    return added
@@ -0,0 +1,263 @@
+"""
+Limiteur de débit adaptatif partagé entre processus.
+
+Deux seaux à jetons (requêtes/minute et tokens/minute) sont stockés dans
+un fichier SQLite : plusieurs exécutions de main.py utilisant la même clé
+API se coordonnent via le verrou d'écriture de SQLite (BEGIN IMMEDIATE).
+
+Le débit suit une politique AIMD :
+- succès  → augmentation additive du facteur de débit
+- 429 (ResourceExhausted) → diminution multiplicative + pause commune
+"""
+
+import asyncio
+import hashlib
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+
+from src.config import GOOGLE_API_KEY, RATE_LIMIT_DB, RATE_LIMIT_RPM, RATE_LIMIT_TPM
+
+
+class RateLimiter:
+    """
+    Seaux à jetons RPM/TPM persistés dans SQLite, avec ajustement AIMD.
+    """
+
+    def __init__(
+        self,
+        db_path: str = RATE_LIMIT_DB,
+        rpm: float = RATE_LIMIT_RPM,
+        tpm: float = RATE_LIMIT_TPM,
+        min_factor: float = 0.1,
+        decrease_factor: float = 0.5,
+        min_cooldown: float = 5.0
+    ):
+        """
+        Args:
+            db_path: Fichier SQLite partagé
+            rpm: Requêtes par minute autorisées (débit maximal)
+            tpm: Tokens par minute autorisés (débit maximal)
+            min_factor: Facteur de débit minimal après réductions successives
+            decrease_factor: Facteur multiplicatif appliqué sur un 429
+            min_cooldown: Pause minimale (secondes) imposée après un 429
+        """
+        self.db_path = db_path
+        self.rpm = max(rpm, 1e-6)
+        self.tpm = max(tpm, 1e-6)
+        self.min_factor = min_factor
+        self.decrease_factor = decrease_factor
+        self.min_cooldown = min_cooldown
+        # Augmentation additive : retour au débit maximal après ~1 minute de succès
+        self.increase_step = 1.0 / max(self.rpm, 1.0)
+        self._initialized = False
+
+    # ------------------------------------------------------------------
+    # Stockage
+    # ------------------------------------------------------------------
+
+    @contextmanager
+    def _transaction(self):
+        """Ouvre une transaction exclusive en écriture (verrou inter-processus)."""
+        if not self._initialized:
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        try:
+            if not self._initialized:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS limiter_state ("
+                    " scope TEXT PRIMARY KEY,"
+                    " request_tokens REAL NOT NULL,"
+                    " token_tokens REAL NOT NULL,"
+                    " factor REAL NOT NULL,"
+                    " updated_at REAL NOT NULL,"
+                    " blocked_until REAL NOT NULL)"
+                )
+                self._initialized = True
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        finally:
+            conn.close()
+
+    @staticmethod
+    def scope_for(model_name: str) -> str:
+        """Clé de partage : une entrée par (clé API, modèle)."""
+        key_hash = hashlib.sha256((GOOGLE_API_KEY or "").encode("utf-8")).hexdigest()[:12]
+        return f"{key_hash}:{model_name}"
+
+    def _load(self, conn, scope: str, now: float) -> dict:
+        """Lit l'état du scope et recharge les seaux selon le temps écoulé."""
+        row = conn.execute(
+            "SELECT request_tokens, token_tokens, factor, updated_at, blocked_until"
+            " FROM limiter_state WHERE scope = ?",
+            (scope,)
+        ).fetchone()
+
+        if row is None:
+            return {
+                "request_tokens": self.rpm,
+                "token_tokens": self.tpm,
+                "factor": 1.0,
+                "blocked_until": 0.0
+            }
+
+        request_tokens, token_tokens, factor, updated_at, blocked_until = row
+        elapsed = max(0.0, now - updated_at)
+        req_capacity, tok_capacity = self.rpm * factor, self.tpm * factor
+        return {
+            "request_tokens": min(req_capacity, request_tokens + elapsed * req_capacity / 60.0),
+            "token_tokens": min(tok_capacity, token_tokens + elapsed * tok_capacity / 60.0),
+            "factor": factor,
+            "blocked_until": blocked_until
+        }
+
+    @staticmethod
+    def _save(conn, scope: str, state: dict, now: float):
+        conn.execute(
+            "INSERT OR REPLACE INTO limiter_state"
+            " (scope, request_tokens, token_tokens, factor, updated_at, blocked_until)"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            (scope, state["request_tokens"], state["token_tokens"],
+             state["factor"], now, state["blocked_until"])
+        )
+
+    # ------------------------------------------------------------------
+    # API publique
+    # ------------------------------------------------------------------
+
+    def try_acquire(self, model_name: str, tokens: int = 0) -> float:
+        """
+        Tente de réserver une requête et `tokens` tokens.
+
+        Args:
+            model_name: Modèle appelé (les quotas sont par modèle)
+            tokens: Estimation des tokens de la requête
+
+        Returns:
+            0.0 si la réservation est faite, sinon le temps d'attente conseillé (s)
+        """
+        scope = self.scope_for(model_name)
+        now = time.time()
+        with self._transaction() as conn:
+            state = self._load(conn, scope, now)
+            req_rate = self.rpm * state["factor"] / 60.0
+            tok_rate = self.tpm * state["factor"] / 60.0
+            # Une requête plus grosse que le seau ne doit pas bloquer indéfiniment
+            cost = min(float(tokens), self.tpm * state["factor"])
+
+            wait = max(
+                state["blocked_until"] - now,
+                (1.0 - state["request_tokens"]) / req_rate,
+                (cost - state["token_tokens"]) / tok_rate,
+                0.0
+            )
+            if wait <= 0:
+                state["request_tokens"] -= 1.0
+                state["token_tokens"] -= cost
+            self._save(conn, scope, state, now)
+        return wait
+
+    def acquire(self, model_name: str, tokens: int = 0) -> float:
+        """
+        Bloque jusqu'à obtention d'un créneau.
+
+        Returns:
+            Temps total passé à attendre (s)
+        """
+        waited = 0.0
+        while True:
+            wait = self.try_acquire(model_name, tokens)
+            if wait <= 0:
+                return waited
+            time.sleep(wait)
+            waited += wait
+
+    async def aacquire(self, model_name: str, tokens: int = 0) -> float:
+        """
+        Version asyncio de acquire().
+
+        La transaction SQLite (qui peut attendre le verrou d'un autre
+        processus) s'exécute hors de la boucle d'événements.
+        """
+        loop = asyncio.get_running_loop()
+        waited = 0.0
+        while True:
+            wait = await loop.run_in_executor(None, self.try_acquire, model_name, tokens)
+            if wait <= 0:
+                return waited
+            await asyncio.sleep(wait)
+            waited += wait
+
+    def record_success(self, model_name: str, extra_tokens: int = 0):
+        """
+        Augmentation additive du débit après un appel réussi.
+
+        Args:
+            model_name: Modèle appelé
+            extra_tokens: Tokens consommés au-delà de l'estimation réservée
+                (ex: tokens de sortie rapportés par l'API)
+        """
+        scope = self.scope_for(model_name)
+        now = time.time()
+        with self._transaction() as conn:
+            state = self._load(conn, scope, now)
+            state["factor"] = min(1.0, state["factor"] + self.increase_step)
+            if extra_tokens > 0:
+                state["token_tokens"] -= extra_tokens
+            self._save(conn, scope, state, now)
+
+    async def arecord_success(self, model_name: str, extra_tokens: int = 0):
+        """Version asyncio de record_success() (SQLite hors de la boucle d'événements)."""
+        await asyncio.get_running_loop().run_in_executor(None, self.record_success, model_name, extra_tokens)
+
+    def record_throttle(self, model_name: str) -> float:
+        """
+        Diminution multiplicative après un ResourceExhausted.
+
+        Les seaux sont vidés et tous les processus partageant la clé
+        marquent une pause commune.
+
+        Returns:
+            Durée de la pause imposée (s)
+        """
+        scope = self.scope_for(model_name)
+        now = time.time()
+        with self._transaction() as conn:
+            state = self._load(conn, scope, now)
+            state["factor"] = max(self.min_factor, state["factor"] * self.decrease_factor)
+            cooldown = max(self.min_cooldown, 60.0 / (self.rpm * state["factor"]))
+            state["request_tokens"] = 0.0
+            state["token_tokens"] = 0.0
+            state["blocked_until"] = max(state["blocked_until"], now + cooldown)
+            self._save(conn, scope, state, now)
+        return max(0.0, state["blocked_until"] - now)
+
+    def get_stats(self, model_name: str) -> dict:
+        """
+        Retourne l'état courant du limiteur pour un modèle.
+
+        Returns:
+            Dictionnaire (facteur, débits effectifs, jetons disponibles)
+        """
+        scope = self.scope_for(model_name)
+        now = time.time()
+        with self._transaction() as conn:
+            state = self._load(conn, scope, now)
+        return {
+            "factor": state["factor"],
+            "rpm_effectif": self.rpm * state["factor"],
+            "tpm_effectif": self.tpm * state["factor"],
+            "requetes_disponibles": state["request_tokens"],
+            "tokens_disponibles": state["token_tokens"],
+            "bloque_pour": max(0.0, state["blocked_until"] - now)
+        }
+
+
+# Instance globale (la base SQLite est créée au premier appel)
+rate_limiter = RateLimiter()
@@ -0,0 +1,403 @@
+"""
+Suite de régression des tests générés par le Juge.
+
+Chaque test généré est rattaché aux fonctions/classes qu'il exerce et mis
+en cache par définition, sous la clé (module, nom, hash de la signature).
+D'une itération (ou d'une exécution) à l'autre :
+- les tests qui ont passé sont conservés tant que la signature des
+  définitions couvertes ne change pas (suite de régression persistante),
+  même s'ils échouent ensuite : leur échec est une régression signalée.
+  Un test qui échoue REGRESSION_MAX_FAILURES fois de suite contre un
+  corps différent de celui qu'il validait est retiré (test erroné) ;
+- le LLM n'est sollicité que pour les définitions dont la signature ou le
+  corps a changé, qui n'ont encore aucun test valide ou dont un test en
+  cache échoue.
+
+Les tests sont identifiés par (module couvert, nom) : deux tests homonymes
+de modules différents sont renommés dans le fichier rendu.
+"""
+
+import ast
+import os
+import re
+from typing import Dict, List, Optional, Set, Tuple, Union
+
+from src.config import CACHE_DIR
+from src.utils.file_status import module_name
+from src.utils.result_cache import result_cache, hash_content, make_key
+
+NAMESPACE = "tests"
+
+# Échecs consécutifs (contre un corps modifié) avant de retirer un test en cache
+REGRESSION_MAX_FAILURES = 2
+
+_PYTEST_OUTCOME = re.compile(r"::(\w+)(?:::(\w+))?(?:\[[^\]]*\])?\s+(PASSED|FAILED|ERROR|SKIPPED|XFAIL|XPASS)")
+
+
+def _without_docstring(body: list) -> list:
+    first = body[0] if body else None
+    if isinstance(first, ast.Expr) and isinstance(first.value, ast.Constant) and isinstance(first.value.value, str):
+        return body[1:]
+    return body
+
+
+def _signature(node) -> str:
+    """Signature textuelle d'une fonction, ou d'une classe (bases + signatures des méthodes)."""
+    if isinstance(node, ast.ClassDef):
+        methods = [
+            _signature(child) for child in node.body
+            if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef))
+            and (not child.name.startswith("_") or child.name == "__init__")
+        ]
+        bases = ", ".join(ast.unparse(base) for base in node.bases)
+        return f"class {node.name}({bases}): " + "; ".join(methods)
+    returns = f" -> {ast.unparse(node.returns)}" if node.returns else ""
+    return f"def {node.name}({ast.unparse(node.args)}){returns}"
+
+
+def definition_hashes(code: str) -> Dict[str, Tuple[str, str]]:
+    """
+    Hash de la signature et du corps de chaque fonction/classe de premier niveau.
+
+    Les docstrings sont ignorées : documenter une fonction ne rend pas ses tests obsolètes.
+
+    Returns:
+        {nom: (hash signature, hash corps)} ({} si le code ne compile pas)
+    """
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return {}
+    hashes = {}
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            body = "\n".join(ast.dump(stmt) for stmt in _without_docstring(node.body))
+            hashes[node.name] = (hash_content(_signature(node)), hash_content(body))
+    return hashes
+
+
+def _module_aliases(filepath: str) -> Set[str]:
+    """Noms sous lesquels un test peut importer le module ('pkg.mod', 'mod')."""
+    name = module_name(filepath)
+    return {name, name.rsplit(".", 1)[-1]}
+
+
+def split_test_file(content: str, modules: Dict[str, Set[str]]) -> Tuple[List[dict], Dict[str, str], List[str]]:
+    """
+    Découpe un fichier de test généré en unités : un test de premier niveau
+    (fonction test_* ou classe Test*) avec ses imports, les éléments de
+    support qu'il utilise et les définitions qu'il couvre.
+
+    Args:
+        content: Fichier de test
+        modules: {module: noms des définitions} du code testé
+
+    Returns:
+        (unités, éléments de support {nom: source} (fixtures, helpers, constantes),
+         lignes d'import)
+    """
+    tree = ast.parse(content)
+    imports, support, units = [], {}, []
+    imported = {}  # nom local -> (module, définition) ou (module, None) pour "import mod"
+    support_uses = {}  # élément de support -> noms qu'il utilise
+
+    for node in tree.body:
+        segment = ast.get_source_segment(content, node)
+        if segment is None:
+            continue
+        decorators = "".join(
+            f"@{ast.get_source_segment(content, d)}\n" for d in getattr(node, "decorator_list", [])
+        )
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            imports.append(segment)
+            for alias in node.names:
+                if isinstance(node, ast.ImportFrom) and node.module in modules:
+                    imported[alias.asname or alias.name] = (node.module, alias.name)
+                elif isinstance(node, ast.Import) and alias.name in modules:
+                    imported[alias.asname or alias.name] = (alias.name, None)
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)) and \
+                node.name.lower().startswith("test"):
+            covers, uses = set(), set()
+            for child in ast.walk(node):
+                if isinstance(child, ast.Name):
+                    uses.add(child.id)
+                    target = imported.get(child.id)
+                    if target and target[1]:
+                        covers.add(target)
+                elif isinstance(child, ast.Attribute) and isinstance(child.value, ast.Name):
+                    target = imported.get(child.value.id)
+                    if target and target[1] is None and child.attr in modules[target[0]]:
+                        covers.add((target[0], child.attr))
+                elif isinstance(child, ast.arg):
+                    uses.add(child.arg)  # fixtures demandées en paramètre
+            units.append({
+                "name": node.name,
+                "source": decorators + segment,
+                "imports": [],
+                "support": sorted(uses),
+                "covers": sorted([list(c) for c in covers]),
+            })
+        else:
+            names = [t.id for t in ast.walk(node) if isinstance(t, ast.Name) and isinstance(t.ctx, ast.Store)]
+            name = getattr(node, "name", None) or (names[0] if names else f"_stmt_{len(support)}")
+            support[name] = decorators + segment
+            support_uses[name] = {
+                t.id if isinstance(t, ast.Name) else t.arg
+                for t in ast.walk(node) if isinstance(t, (ast.Name, ast.arg))
+            }
+
+    for unit in units:
+        unit["imports"] = imports
+        # Fermeture transitive : une fixture peut dépendre d'une constante, etc.
+        needed, pending = set(), [name for name in unit["support"] if name in support]
+        while pending:
+            name = pending.pop()
+            if name not in needed:
+                needed.add(name)
+                pending.extend(dep for dep in support_uses[name] if dep in support and dep != name)
+        unit["support"] = [name for name in support if name in needed]
+    return units, support, imports
+
+
+def parse_outcomes(pytest_output: str) -> Dict[str, bool]:
+    """
+    Résultat par test de premier niveau depuis la sortie `pytest -v`.
+
+    Une classe Test* n'a passé que si toutes ses méthodes ont passé.
+    """
+    outcomes = {}
+    for match in _PYTEST_OUTCOME.finditer(pytest_output):
+        name, outcome = match.group(1), match.group(3)
+        passed = outcome in ("PASSED", "XFAIL", "SKIPPED")
+        outcomes[name] = outcomes.get(name, True) and passed
+    return outcomes
+
+
+def outcomes_from_results(outcomes: Dict[str, str]) -> Dict[str, bool]:
+    """
+    Résultat par test de premier niveau depuis les résultats structurés
+    ({nodeid: passed|failed|error|skipped}, voir compact_test_results).
+    """
+    results = {}
+    for nodeid, outcome in outcomes.items():
+        parts = nodeid.split("::")
+        if len(parts) < 2:
+            continue
+        name = parts[1].split("[", 1)[0]
+        results[name] = results.get(name, True) and outcome in ("passed", "skipped")
+    return results
+
+
+class RegressionSuite:
+    """
+    Tests réutilisables pour un ensemble de fichiers de code, et définitions à (re)couvrir.
+    """
+
+    def __init__(self, code_files: Dict[str, str], target_dir: str, cache=result_cache):
+        """
+        Args:
+            code_files: {chemin: code} du code à tester (relatif à target_dir)
+            target_dir: Dossier du projet (fait partie de la clé de cache :
+                deux projets peuvent avoir un module "utils.helper" identique)
+            cache: Cache de résultats (espace de noms "tests")
+        """
+        self.cache = cache
+        self.target = hash_content(os.path.abspath(target_dir))
+        self.modules: Dict[str, Set[str]] = {}        # alias de module -> définitions
+        self.definitions: Dict[Tuple[str, str], Tuple[str, str]] = {}  # (module, def) -> hashes
+        self.files_by_module: Dict[str, str] = {}
+        for filepath, code in code_files.items():
+            hashes = definition_hashes(code)
+            canonical = module_name(filepath)
+            for alias in _module_aliases(filepath):
+                self.modules[alias] = set(hashes)
+                self.files_by_module[alias] = filepath
+            for name, pair in hashes.items():
+                self.definitions[(canonical, name)] = pair
+
+        self.units: Dict[str, dict] = {}  # "module::nom" -> unité
+        self.support: Dict[str, str] = {}
+        self.imports: List[str] = []
+        self.stale: List[Tuple[str, str]] = []
+        self.cached: Dict[Tuple[str, str], dict] = {}  # (module, def) -> enregistrement du cache
+        self.regressions: List[str] = []
+        self.evicted: List[str] = []
+        self._load()
+
+    def _key(self, module: str, name: str) -> str:
+        return make_key(self.target, module, name, self.definitions[(module, name)][0])
+
+    def _canonical(self, module: str) -> str:
+        filepath = self.files_by_module.get(module)
+        return module_name(filepath) if filepath else module
+
+    def _load(self):
+        for (module, name), (_, body_hash) in self.definitions.items():
+            record = self.cache.get(NAMESPACE, self._key(module, name))
+            tests = (record or {}).get("tests", [])
+            if tests:
+                # Noms éventuellement modifiés par _add_unit (homonymes d'autres modules)
+                record["tests"] = [self._add_unit(unit, record.get("support", {})) for unit in tests]
+                self.cached[(module, name)] = record
+            if record is None or record.get("body_hash") != body_hash or not tests or record.get("failing"):
+                self.stale.append((module, name))
+
+    def _unit_module(self, unit: dict) -> str:
+        covers = unit.get("covers") or []
+        return self._canonical(covers[0][0]) if covers else ""
+
+    def _add_unit(self, unit: dict, support: Dict[str, str]) -> dict:
+        """
+        Ajoute une unité (elle remplace celle de même module et même nom).
+        Un homonyme d'un autre module est renommé dans sa source.
+
+        Returns:
+            L'unité enregistrée
+        """
+        module = self._unit_module(unit)
+        key = f"{module}::{unit['name']}"
+        if key not in self.units and any(other["name"] == unit["name"] for other in self.units.values()):
+            taken = {other["name"] for other in self.units.values()}
+            base = f"{unit['name']}_{re.sub(r'[^0-9A-Za-z_]', '_', module) or 'x'}"
+            new_name, counter = base, 1
+            while new_name in taken:
+                counter += 1
+                new_name = f"{base}_{counter}"
+            source = re.sub(
+                rf"^(\s*(?:async\s+)?(?:def|class)\s+){re.escape(unit['name'])}\b",
+                lambda match: match.group(1) + new_name, unit["source"], count=1, flags=re.M
+            )
+            unit = dict(unit, name=new_name, source=source)
+            key = f"{module}::{new_name}"
+        self.units[key] = unit
+        for line in unit.get("imports", []):
+            if line not in self.imports:
+                self.imports.append(line)
+        for name in unit.get("support", []):
+            if name in support:
+                self.support[name] = support[name]
+        return unit
+
+    @property
+    def reused(self) -> int:
+        """Nombre de tests repris de la suite de régression."""
+        return len(self.units)
+
+    def stale_targets(self) -> List[str]:
+        """Définitions à couvrir par de nouveaux tests ('module.nom')."""
+        return [f"{module}.{name}" for module, name in self.stale]
+
+    def stale_files(self) -> List[str]:
+        """Fichiers contenant au moins une définition à couvrir."""
+        return sorted({self.files_by_module[module] for module, _ in self.stale if module in self.files_by_module})
+
+    def add_generated(self, content: str):
+        """Intègre un fichier de tests fraîchement généré (ses tests remplacent les homonymes)."""
+        units, support, _ = split_test_file(content, self.modules)
+        self.support.update(support)
+        for unit in units:
+            self._add_unit(unit, support)
+
+    def render(self) -> str:
+        """Fichier de test complet : imports, support puis tests."""
+        parts = ["\n".join(self.imports)] if self.imports else ["import pytest"]
+        parts.extend(self.support.values())
+        parts.extend(unit["source"] for unit in self.units.values())
+        return "\n\n\n".join(parts) + "\n"
+
+    def record_results(self, results: Union[Dict[str, str], str]) -> Dict[str, bool]:
+        """
+        Met à jour le cache après exécution : les tests qui ont passé sont
+        associés aux définitions qu'ils couvrent. Un test déjà en cache qui
+        échoue est conservé (la signature n'a pas changé, sinon la clé
+        diffère), ajouté à `regressions`, et sa définition redevient à
+        couvrir. Après REGRESSION_MAX_FAILURES échecs contre un corps
+        différent de celui qu'il validait, il est retiré (`evicted`).
+
+        Args:
+            results: {nodeid: issue} structuré, ou sortie `pytest -v` brute
+
+        Returns:
+            {nom du test: passé}
+        """
+        if isinstance(results, str):
+            outcomes = parse_outcomes(results)
+        else:
+            outcomes = outcomes_from_results(results)
+        names = {unit["name"] for unit in self.units.values()}
+        outcomes = {name: passed for name, passed in outcomes.items() if name in names}
+        if not outcomes:
+            # Erreur de collecte (import cassé...) : ne pas effacer la suite existante
+            return outcomes
+        passing_by_def: Dict[Tuple[str, str], List[dict]] = {}
+        for unit in self.units.values():
+            if not outcomes.get(unit["name"], False):
+                continue
+            for module, name in unit.get("covers", []):
+                key = (self._canonical(module), name)
+                if key in self.definitions:
+                    passing_by_def.setdefault(key, []).append(unit)
+
+        regressions, evicted = set(), set()
+        for (module, name), (_, body_hash) in self.definitions.items():
+            tests = [
+                dict(unit, failures=0, passed_body=body_hash)
+                for unit in passing_by_def.get((module, name), [])
+            ]
+            support = {
+                support_name: self.support[support_name]
+                for unit in tests for support_name in unit.get("support", [])
+                if support_name in self.support
+            }
+            record = self.cached.get((module, name), {})
+            passing = {unit["name"] for unit in tests}
+            failing = []
+            for unit in record.get("tests", []):
+                if unit["name"] in passing:
+                    continue
+                if outcomes.get(unit["name"]) is False:
+                    failures = unit.get("failures", 0) + 1
+                    if failures >= REGRESSION_MAX_FAILURES and unit.get("passed_body", body_hash) != body_hash:
+                        evicted.add(unit["name"])
+                        continue
+                    regressions.add(unit["name"])
+                    failing.append(unit["name"])
+                    unit = dict(unit, failures=failures)
+                tests.append(unit)
+                for support_name in unit.get("support", []):
+                    if support_name in record.get("support", {}):
+                        support.setdefault(support_name, record["support"][support_name])
+            self.cache.put(NAMESPACE, self._key(module, name), {
+                "body_hash": body_hash,
+                "tests": tests,
+                "support": support,
+                "failing": failing,
+            })
+        self.regressions = sorted(regressions)
+        self.evicted = sorted(evicted)
+        return outcomes
+
+    def export(self, target_dir: str, outcomes: Dict[str, bool]) -> Optional[str]:
+        """
+        Écrit les tests qui passent dans CACHE_DIR/regression/ (lisible, rejouable).
+
+        Returns:
+            Chemin du fichier écrit, ou None si aucun test ne passe
+        """
+        passing = [unit for unit in self.units.values() if outcomes.get(unit["name"])]
+        if not passing:
+            return None
+        needed = {name for unit in passing for name in unit.get("support", [])}
+        parts = ["\n".join(self.imports)]
+        parts.extend(source for name, source in self.support.items() if name in needed)
+        parts.extend(unit["source"] for unit in passing)
+
+        target = os.path.abspath(target_dir)
+        path = os.path.join(
+            CACHE_DIR, "regression",
+            f"test_{os.path.basename(target) or 'root'}_{hash_content(target)[:8]}.py"
+        )
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n\n\n".join(parts) + "\n")
+        return path
@@ -0,0 +1,203 @@
+"""
+Cache persistant des résultats d'analyse par fichier.
+
+Chaque entrée appartient à un espace de noms ("pylint", "audit", ...) et
+est adressée par une clé calculée par l'appelant à partir du contenu du
+fichier (hash SHA-256) et de tout ce qui influence le résultat (version
+de pylint, fichier de configuration, modèle, ...). Un fichier inchangé ne
+coûte donc rien aux itérations ni aux exécutions suivantes.
+Stockage SQLite en mode WAL, partagé entre exécutions parallèles.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Optional
+
+from src.config import RESULT_CACHE_DB, RESULT_CACHE_MAX_AGE_DAYS, RESULT_CACHE_BYPASS
+
+
+def hash_content(content) -> str:
+    """Hash SHA-256 hexadécimal d'une chaîne ou de bytes."""
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    return hashlib.sha256(content).hexdigest()
+
+
+def hash_file(filepath: str) -> Optional[str]:
+    """Hash SHA-256 du contenu d'un fichier (None s'il est illisible)."""
+    try:
+        with open(filepath, "rb") as f:
+            return hash_content(f.read())
+    except OSError:
+        return None
+
+
+def make_key(*parts) -> str:
+    """Combine plusieurs composantes (sérialisables JSON) en une clé unique."""
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hash_content(payload)
+
+
+class ResultCache:
+    """
+    Stockage clé/valeur JSON par espace de noms, avec compteurs hits/misses.
+    """
+
+    # Nombre d'insertions entre deux purges des entrées expirées
+    EVICTION_INTERVAL = 50
+
+    def __init__(
+        self,
+        db_path: str = RESULT_CACHE_DB,
+        max_age_seconds: float = RESULT_CACHE_MAX_AGE_DAYS * 86400,
+        bypass: bool = RESULT_CACHE_BYPASS
+    ):
+        """
+        Args:
+            db_path: Fichier SQLite du cache
+            max_age_seconds: Âge maximal depuis le dernier accès
+            bypass: Si True, le cache n'est ni lu ni écrit
+        """
+        self.db_path = db_path
+        self.max_age_seconds = max_age_seconds
+        self.bypass = bypass
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._hits = {}
+        self._misses = {}
+        self._puts_since_eviction = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        """Une connexion par thread (et par processus après un fork)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS result_cache ("
+            " namespace TEXT NOT NULL,"
+            " key TEXT NOT NULL,"
+            " value TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " last_access REAL NOT NULL,"
+            " PRIMARY KEY (namespace, key))"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_result_cache_access ON result_cache(last_access)")
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    def _count(self, namespace: str, hit: bool):
+        with self._lock:
+            counters = self._hits if hit else self._misses
+            counters[namespace] = counters.get(namespace, 0) + 1
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        """
+        Cherche un résultat en cache.
+
+        Returns:
+            La valeur désérialisée, ou None si absente, expirée ou si le cache est contourné
+        """
+        if self.bypass:
+            return None
+
+        now = time.time()
+        value = None
+        try:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT value, last_access FROM result_cache WHERE namespace = ? AND key = ?",
+                (namespace, key)
+            ).fetchone()
+            if row is not None and now - row[1] <= self.max_age_seconds:
+                conn.execute(
+                    "UPDATE result_cache SET last_access = ? WHERE namespace = ? AND key = ?",
+                    (now, namespace, key)
+                )
+                value = json.loads(row[0])
+        except (sqlite3.Error, ValueError) as e:
+            print(f"  ⚠️  Cache de résultats indisponible: {e}")
+            value = None
+
+        self._count(namespace, value is not None)
+        return value
+
+    def put(self, namespace: str, key: str, value: Any):
+        """Enregistre un résultat (remplace une éventuelle entrée existante)."""
+        if self.bypass or value is None:
+            return
+
+        now = time.time()
+        try:
+            self._connect().execute(
+                "INSERT OR REPLACE INTO result_cache (namespace, key, value, created_at, last_access)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (namespace, key, json.dumps(value, ensure_ascii=False, default=str), now, now)
+            )
+        except sqlite3.Error as e:
+            print(f"  ⚠️  Écriture du cache de résultats impossible: {e}")
+            return
+
+        with self._lock:
+            self._puts_since_eviction += 1
+            run_eviction = self._puts_since_eviction >= self.EVICTION_INTERVAL
+            if run_eviction:
+                self._puts_since_eviction = 0
+        if run_eviction:
+            self.evict()
+
+    def evict(self) -> int:
+        """
+        Supprime les entrées non consultées depuis plus de max_age_seconds.
+
+        Returns:
+            Nombre d'entrées supprimées
+        """
+        try:
+            return self._connect().execute(
+                "DELETE FROM result_cache WHERE last_access < ?",
+                (time.time() - self.max_age_seconds,)
+            ).rowcount
+        except sqlite3.Error as e:
+            print(f"  ⚠️  Éviction du cache de résultats impossible: {e}")
+            return 0
+
+    def clear(self, namespace: Optional[str] = None):
+        """Vide le cache (ou un seul espace de noms)."""
+        if namespace is None:
+            self._connect().execute("DELETE FROM result_cache")
+        else:
+            self._connect().execute("DELETE FROM result_cache WHERE namespace = ?", (namespace,))
+
+    def get_stats(self) -> dict:
+        """
+        Retourne les compteurs du cache par espace de noms.
+
+        Returns:
+            {namespace: {"hits", "misses", "hit_rate"}} pour ce processus
+        """
+        with self._lock:
+            namespaces = set(self._hits) | set(self._misses)
+            stats = {}
+            for namespace in sorted(namespaces):
+                hits = self._hits.get(namespace, 0)
+                misses = self._misses.get(namespace, 0)
+                stats[namespace] = {
+                    "hits": hits,
+                    "misses": misses,
+                    "hit_rate": hits / (hits + misses) if hits + misses else 0.0
+                }
+        return stats
+
+
+# Instance globale partagée par les outils et les agents
+result_cache = ResultCache()
@@ -0,0 +1,254 @@
+"""
+Mode serveur : API HTTP locale devant la file de tâches.
+
+`python main.py serve` importe une seule fois les dépendances lourdes
+(langgraph, google.generativeai, tiktoken, pylint, prompts système), puis
+lance des processus workers par fork : ils héritent de cet état initialisé
+et traitent les tâches de la file (voir job_queue) en parallèle. L'API
+écoute en TCP (127.0.0.1 par défaut) ou sur un socket Unix.
+
+Endpoints (JSON) :
+    GET  /health                 workers actifs, tâches par statut
+    POST /runs                   {"target_dir", "since"?, "fixer_workers"?} -> {"run_id"}
+    GET  /runs                   dernières exécutions
+    GET  /runs/<run_id>          statut et avancement des tâches
+    GET  /runs/<run_id>/results  résultats des tâches et état final
+"""
+
+import json
+import multiprocessing
+import os
+import re
+import socketserver
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Taille maximale du corps d'une requête
+MAX_BODY_BYTES = 1 << 20
+
+_RUN_PATH = re.compile(r"^/runs/([0-9a-f]+)(/results)?$")
+
+
+class WorkerSupervisor:
+    """
+    Processus workers forkés depuis le serveur, relancés s'ils s'arrêtent.
+    """
+
+    def __init__(self, target: Callable, count: int, interval: float = 2.0):
+        """
+        Args:
+            target: Fonction exécutée par chaque worker (sans argument)
+            count: Nombre de workers
+            interval: Période de surveillance (secondes)
+        """
+        self.target = target
+        self.count = max(1, count)
+        self.interval = interval
+        self._processes: List[multiprocessing.Process] = []
+        self._stop = threading.Event()
+        self._watcher = None
+
+    def _spawn(self, index: int) -> multiprocessing.Process:
+        # Non démon : un worker lance lui-même des processus (lint_server, pytest_pool)
+        process = multiprocessing.Process(target=self.target, name=f"swarm-worker-{index}", daemon=False)
+        process.start()
+        return process
+
+    def start(self):
+        """Lance les workers (avant les threads du serveur HTTP) et leur surveillance."""
+        self._processes = [self._spawn(index) for index in range(self.count)]
+        self._watcher = threading.Thread(target=self._watch, name="worker-supervisor", daemon=True)
+        self._watcher.start()
+
+    def _watch(self):
+        while not self._stop.wait(self.interval):
+            for index, process in enumerate(self._processes):
+                if not process.is_alive() and not self._stop.is_set():
+                    process.join()
+                    print(f"⚠️  Worker {process.name} arrêté (code {process.exitcode}) : relance")
+                    self._processes[index] = self._spawn(index)
+
+    def alive(self) -> int:
+        """Nombre de workers en vie."""
+        return sum(1 for process in self._processes if process.is_alive())
+
+    def stop(self, timeout: float = 5.0):
+        """
+        Arrête les workers. Une tâche interrompue garde son bail jusqu'à
+        expiration, puis est reprise (par ce serveur ou un autre worker).
+        """
+        self._stop.set()
+        for process in self._processes:
+            process.terminate()
+        for process in self._processes:
+            process.join(timeout=timeout)
+            if process.is_alive():
+                process.kill()
+                process.join()
+
+
+class SwarmAPI:
+    """
+    Traitement des requêtes, indépendant du transport HTTP.
+    """
+
+    def __init__(self, queue, store, submit: Callable[[Dict], str], supervisor: Optional[WorkerSupervisor] = None):
+        """
+        Args:
+            queue: File de tâches (JobQueue)
+            store: Stockage des exécutions et checkpoints (CheckpointStore)
+            submit: Soumet une exécution à partir du corps de POST /runs, renvoie son run_id
+            supervisor: Workers du serveur (pour /health)
+        """
+        self.queue = queue
+        self.store = store
+        self.submit = submit
+        self.supervisor = supervisor
+        self.started_at = time.time()
+
+    def handle(self, method: str, path: str, body: Optional[Dict]) -> Tuple[int, Dict]:
+        """
+        Returns:
+            (code HTTP, réponse JSON)
+        """
+        path = path.split("?", 1)[0].rstrip("/") or "/"
+        if method == "GET" and path == "/health":
+            return 200, self.health()
+        if path == "/runs":
+            if method == "POST":
+                return self.create_run(body)
+            if method == "GET":
+                return 200, {"success": True, "runs": [self._run_status(run) for run in self.store.list_runs()]}
+            return 405, {"success": False, "error": f"Méthode {method} non supportée sur {path}"}
+
+        match = _RUN_PATH.match(path)
+        if match and method == "GET":
+            run = self.store.get_run(match.group(1))
+            if run is None:
+                return 404, {"success": False, "error": f"Exécution inconnue : {match.group(1)}"}
+            if match.group(2):
+                return 200, self.run_results(run)
+            return 200, dict(self._run_status(run), success=True)
+        return 404, {"success": False, "error": f"Route inconnue : {method} {path}"}
+
+    def health(self) -> Dict:
+        stats = self.queue.stats()
+        totals: Dict[str, int] = {}
+        for counts in stats.values():
+            for status, count in counts.items():
+                totals[status] = totals.get(status, 0) + count
+        return {
+            "success": True,
+            "pid": os.getpid(),
+            "uptime": round(time.time() - self.started_at, 1),
+            "workers": self.supervisor.alive() if self.supervisor else 0,
+            "jobs": totals,
+        }
+
+    def create_run(self, body: Optional[Dict]) -> Tuple[int, Dict]:
+        if not isinstance(body, dict) or not body.get("target_dir"):
+            return 400, {"success": False, "error": "Corps JSON attendu : {\"target_dir\": ...}"}
+        if not os.path.isdir(body["target_dir"]):
+            return 400, {"success": False, "error": f"Le dossier '{body['target_dir']}' n'existe pas"}
+        run_id = self.submit(body)
+        return 202, {"success": True, "run_id": run_id, "status_url": f"/runs/{run_id}"}
+
+    def _run_status(self, run: Dict) -> Dict:
+        stats = self.queue.stats(run["run_id"])
+        return dict(run, jobs=stats, open_jobs=self.queue.open_jobs(run["run_id"]))
+
+    def run_results(self, run: Dict) -> Dict:
+        """Résultats des tâches et résumé du dernier état persisté."""
+        loaded = self.store.load_latest(run["run_id"])
+        summary = None
+        if loaded is not None:
+            last_node, state = loaded
+            summary = {
+                "last_node": last_node,
+                "status": state.get("status"),
+                "iterations": state.get("iteration_count"),
+                "score_before": state.get("pylint_score_before"),
+                "score_after": state.get("pylint_score_after"),
+                "test_passed": state.get("test_passed"),
+                "test_output": state.get("test_output"),
+                "changes_made": state.get("changes_made"),
+                "file_status": state.get("file_status"),
+            }
+        return {
+            "success": True,
+            "run_id": run["run_id"],
+            "status": run["status"],
+            "summary": summary,
+            "jobs": self.queue.results(run["run_id"]),
+        }
+
+
+def _make_handler(api: SwarmAPI):
+    class Handler(BaseHTTPRequestHandler):
+        server_version = "RefactoringSwarm/1.0"
+
+        def _respond(self, code: int, payload: Dict):
+            data = json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _dispatch(self, method: str):
+            body = None
+            length = int(self.headers.get("Content-Length") or 0)
+            if length > MAX_BODY_BYTES:
+                return self._respond(413, {"success": False, "error": "Corps de requête trop volumineux"})
+            if length:
+                try:
+                    body = json.loads(self.rfile.read(length))
+                except ValueError as e:
+                    return self._respond(400, {"success": False, "error": f"JSON invalide : {e}"})
+            try:
+                code, payload = api.handle(method, self.path, body)
+            except Exception as e:
+                code, payload = 500, {"success": False, "error": f"{type(e).__name__}: {e}"}
+            self._respond(code, payload)
+
+        def do_GET(self):
+            self._dispatch("GET")
+
+        def do_POST(self):
+            self._dispatch("POST")
+
+        def address_string(self):
+            # Socket Unix : pas d'adresse client
+            return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+        def log_message(self, format, *args):
+            print(f"🌐 {self.address_string()} - {format % args}")
+
+    return Handler
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def server_bind(self):
+        socketserver.UnixStreamServer.server_bind(self)
+        self.server_name, self.server_port = "localhost", 0
+
+
+def make_server(api: SwarmAPI, host: str = "127.0.0.1", port: int = 8765, unix_socket: Optional[str] = None):
+    """
+    Crée le serveur HTTP (TCP, ou socket Unix si unix_socket est donné).
+
+    Returns:
+        Serveur socketserver (serve_forever / shutdown / server_close)
+    """
+    handler = _make_handler(api)
+    if unix_socket:
+        if os.path.exists(unix_socket):
+            os.unlink(unix_socket)
+        return _UnixHTTPServer(unix_socket, handler)
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
@@ -0,0 +1,147 @@
+"""
+Estimation rapide du nombre de tokens, calibrée sur l'usage réel du modèle.
+
+Le ratio caractères/token est ajusté à chaque réponse de l'API à partir du
+prompt_token_count rapporté par le modèle (moyenne glissante), puis
+persisté dans le cache local toutes les SAVE_EVERY_SAMPLES mesures et à la
+sortie du processus : les exécutions suivantes partent d'une estimation
+déjà calibrée. Plusieurs processus partagent le fichier : chaque
+sauvegarde fusionne ses nouvelles mesures avec celles déjà écrites. Sert au limiteur de débit et de repli au
+PromptOptimizer quand le vocabulaire tiktoken n'est pas disponible.
+"""
+
+import atexit
+import json
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+from src.config import TOKEN_CALIBRATION_FILE
+
+# Ratio par défaut (~3 caractères par token : code et texte français mélangés)
+DEFAULT_CHARS_PER_TOKEN = 3.0
+
+# Les prompts trop courts donnent un ratio bruité (tokens fixes du format)
+MIN_CALIBRATION_CHARS = 200
+
+# Nombre de nouvelles mesures entre deux écritures du fichier
+SAVE_EVERY_SAMPLES = 20
+
+
+class TokenEstimator:
+    """
+    Estimateur caractères/token calibré par l'usage rapporté par l'API.
+    """
+
+    def __init__(self, path: str = TOKEN_CALIBRATION_FILE, alpha: float = 0.05):
+        """
+        Args:
+            path: Fichier JSON de calibration (None = pas de persistance)
+            alpha: Poids d'une nouvelle mesure une fois la calibration établie
+        """
+        self.path = path
+        self.alpha = alpha
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._chars_per_token = DEFAULT_CHARS_PER_TOKEN
+        self._samples = 0
+        self._synced: Optional[Tuple[float, int]] = None  # contenu du fichier au dernier chargement/écriture
+        self._pending = 0  # mesures pas encore écrites
+        self._atexit_registered = False
+
+    def _read(self) -> Optional[Tuple[float, int]]:
+        """(chars_per_token, samples) du fichier, ou None s'il est absent ou invalide."""
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            if float(data["chars_per_token"]) > 0:
+                return float(data["chars_per_token"]), int(data.get("samples", 0))
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        return None
+
+    def _load(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        if not self.path:
+            return
+        self._synced = self._read()
+        if self._synced is not None:
+            self._chars_per_token, self._samples = self._synced
+
+    def _save(self):
+        """
+        Écrit la calibration. Si un autre processus a écrit entre-temps, ses
+        mesures et les nôtres sont fusionnées (moyenne pondérée par le
+        nombre de mesures) au lieu d'être écrasées.
+        """
+        if not self.path or not self._pending:
+            return
+        on_disk = self._read()
+        if on_disk is not None and on_disk != self._synced:
+            disk_ratio, disk_samples = on_disk
+            total = disk_samples + self._pending
+            self._chars_per_token = (disk_ratio * disk_samples + self._chars_per_token * self._pending) / total
+            self._samples = total
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            tmp = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"chars_per_token": self._chars_per_token, "samples": self._samples}, f)
+            os.replace(tmp, self.path)
+            self._synced = (self._chars_per_token, self._samples)
+            self._pending = 0
+        except OSError:
+            pass
+
+    def flush(self):
+        """Écrit les mesures en attente (appelée à la sortie du processus)."""
+        with self._lock:
+            self._save()
+
+    @property
+    def chars_per_token(self) -> float:
+        with self._lock:
+            self._load()
+            return self._chars_per_token
+
+    def estimate(self, text: str) -> int:
+        """Nombre de tokens estimé (calcul en O(1) sur la longueur du texte)."""
+        return int(len(text) / self.chars_per_token)
+
+    def observe(self, prompt_chars: int, reported_tokens: int):
+        """
+        Ajuste le ratio avec une mesure réelle.
+
+        Moyenne simple sur les premières mesures, puis moyenne glissante
+        exponentielle (suit les changements de modèle ou de contenu).
+
+        Args:
+            prompt_chars: Longueur du prompt envoyé (caractères)
+            reported_tokens: prompt_token_count rapporté par l'API
+        """
+        if reported_tokens <= 0 or prompt_chars < MIN_CALIBRATION_CHARS:
+            return
+        sample = prompt_chars / reported_tokens
+        with self._lock:
+            self._load()
+            weight = max(self.alpha, 1.0 / (self._samples + 1))
+            self._chars_per_token += weight * (sample - self._chars_per_token)
+            self._samples += 1
+            self._pending += 1
+            if self.path and not self._atexit_registered:
+                atexit.register(self.flush)
+                self._atexit_registered = True
+            if self._pending >= SAVE_EVERY_SAMPLES:
+                self._save()
+
+    def get_stats(self) -> Dict:
+        """Ratio courant et nombre de mesures de calibration."""
+        with self._lock:
+            self._load()
+            return {"chars_per_token": round(self._chars_per_token, 3), "samples": self._samples}
+
+
+# Instance globale (calibration chargée au premier usage)
+token_estimator = TokenEstimator()
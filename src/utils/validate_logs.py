@@ -11,12 +11,17 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../"
 if sys.platform == "win32":
     sys.stdout.reconfigure(encoding='utf-8')
 
-from src.utils.logger import ActionType
+from src.utils.logger import ActionType, JSONL_LOG_FILE, export_experiment_data
 
 LOG_FILE = Path("logs/experiment_data.json")
 
 def validate_logs():
     print(f"🔍 Validating logs from: {LOG_FILE}")
+
+    # Merge pending append-only entries into the list-shaped file first
+    if os.path.exists(JSONL_LOG_FILE):
+        exported = export_experiment_data(json_path=str(LOG_FILE))
+        print(f"📥 Merged {exported} pending entries from {JSONL_LOG_FILE}")
     
     if not LOG_FILE.exists():
         print("❌ Log file not found!")
@@ -0,0 +1,72 @@
+"""
+Espace de travail des artefacts générés et règles d'exclusion des fichiers.
+
+Les tests du Juge et les fichiers temporaires sont écrits dans
+WORKSPACE_DIR (sous CACHE_DIR), jamais dans le dossier cible : une
+exécution suivante ne les audite pas et ne les "corrige" pas. La
+découverte des fichiers (voir tools/discovery.py) ignore aussi les
+caches, environnements virtuels et motifs configurés (DISCOVERY_EXCLUDE).
+"""
+
+import os
+from typing import Iterable, List, Optional
+
+from src.config import CACHE_DIR, WORKSPACE_DIR, DISCOVERY_EXCLUDE
+from src.tools.discovery import DEFAULT_EXCLUDES, IgnoreRules
+from src.utils.result_cache import hash_content
+
+# Artefacts écrits dans le dossier cible par les versions précédentes du Juge
+GENERATED_PATTERNS = ("test_iteration_*.py",)
+
+
+def _inside(path: str, directory: str) -> bool:
+    path, directory = os.path.abspath(path), os.path.abspath(directory)
+    return path == directory or path.startswith(directory + os.sep)
+
+
+def internal_dirs(target_dir: str) -> List[str]:
+    """Dossiers internes (cache, espace de travail) situés dans le dossier cible, relatifs à celui-ci."""
+    return [
+        os.path.relpath(os.path.abspath(directory), os.path.abspath(target_dir))
+        for directory in (CACHE_DIR, WORKSPACE_DIR)
+        if _inside(directory, target_dir) and os.path.abspath(directory) != os.path.abspath(target_dir)
+    ]
+
+
+def exclude_patterns(target_dir: Optional[str] = None, extra: Optional[Iterable[str]] = None) -> List[str]:
+    """
+    Motifs exclus (syntaxe .gitignore) : dossiers par défaut, artefacts
+    générés, DISCOVERY_EXCLUDE, `extra` et, si target_dir est donné, les
+    dossiers internes qu'il contient.
+    """
+    internes = [
+        "/" + path.replace(os.sep, "/").replace("[", "\\[").replace("*", "\\*").replace("?", "\\?") + "/"
+        for path in (internal_dirs(target_dir) if target_dir else [])
+    ]
+    return [*DEFAULT_EXCLUDES, *GENERATED_PATTERNS, *DISCOVERY_EXCLUDE, *(extra or ()), *internes]
+
+
+def is_excluded(rel_path: str, patterns: Optional[Iterable[str]] = None) -> bool:
+    """
+    True si le chemin (relatif au dossier cible) ou l'un de ses dossiers
+    correspond à un motif d'exclusion (syntaxe .gitignore).
+    """
+    rules = IgnoreRules(exclude_patterns() if patterns is None else patterns)
+    parts = rel_path.replace("\\", "/").strip("/").split("/")
+    for depth in range(1, len(parts) + 1):
+        if rules.match("/".join(parts[:depth]), is_dir=depth < len(parts)):
+            return True
+    return False
+
+
+def workspace_dir(target_dir: str) -> str:
+    """
+    Dossier de travail propre à un dossier cible (créé si besoin).
+
+    Returns:
+        WORKSPACE_DIR/<nom du dossier>_<hash du chemin absolu>
+    """
+    target = os.path.abspath(target_dir)
+    path = os.path.join(WORKSPACE_DIR, f"{os.path.basename(target) or 'root'}_{hash_content(target)[:8]}")
+    os.makedirs(path, exist_ok=True)
+    return path
@@ -0,0 +1,43 @@
+"""Test scandir-based file discovery and its ignore rules."""
+import os
+import tempfile
+
+try:
+    from src.tools.discovery import DEFAULT_EXCLUDES, IgnoreRules, discover_python_files, iter_files
+
+    with tempfile.TemporaryDirectory() as root:
+        layout = {
+            "app.py": "", "pkg/mod.py": "", "pkg/gen/out.py": "", "pkg/gen/keep.py": "",
+            "venv/lib/site.py": "", ".git/hook.py": "", "node_modules/x/n.py": "",
+            "docs/conf.py": "", "notes.txt": "",
+            ".gitignore": "docs/\n", "pkg/.gitignore": "gen/*\n!gen/keep.py\n",
+        }
+        for path, content in layout.items():
+            full = os.path.join(root, *path.split("/"))
+            os.makedirs(os.path.dirname(full), exist_ok=True)
+            with open(full, "w", encoding="utf-8") as f:
+                f.write(content)
+
+        found = [p.replace(os.sep, "/") for p in discover_python_files(root)]
+        if found == ["app.py", "pkg/mod.py", "pkg/gen/keep.py"]:
+            print("✅ Ignored directories pruned, nested .gitignore and negation honoured")
+        else:
+            print(f"❌ Unexpected discovery result: {found}")
+
+        entries = list(iter_files(root, suffixes=None, exclude=DEFAULT_EXCLUDES, with_stats=True))
+        if any(e.path == "notes.txt" for e in entries) and all(e.size is not None and e.mtime for e in entries):
+            print(f"✅ Streaming with sizes and mtimes: {len(entries)} files")
+        else:
+            print(f"❌ Stats missing: {entries}")
+
+    rules = IgnoreRules(["/build/", "**/tmp", "*.py[co]"])
+    checks = [
+        rules.match("build", True), not rules.match("src/build", True),
+        rules.match("a/b/tmp", False), rules.match("m.pyc", False), rules.match("m.py", False) is None,
+    ]
+    print("✅ Anchored, ** and character-class patterns" if all(checks) else f"❌ Pattern checks: {checks}")
+
+except ImportError as e:
+    print(f"❌ Cannot import discovery module: {e}")
+except Exception as e:
+    print(f"❌ Error testing discovery: {e}")
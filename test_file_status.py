@@ -0,0 +1,46 @@
+"""Test how failing tests are traced back to the files to re-fix."""
+try:
+    from src.utils.file_status import failure_names, implicated_files
+
+    code_files = {
+        "calc.py": "def add(a, b):\n    return a - b\n",
+        "cli.py": "def main():\n    pass\n\ndef run():\n    pass\n",
+        "store.py": "class Store:\n    def get(self, key):\n        return None\n",
+    }
+    failures = [{
+        "nodeid": "test_iteration_1.py::test_add",
+        "exc_type": "AssertionError",
+        "message": "assert -1 == 3",
+        "traceback": (
+            "test_iteration_1.py:6: in test_add\n"
+            "    assert add(1, 2) == 3\n"
+            "E   assert -1 == 3\n"
+            "E    +  where -1 = add(1, 2)\n"
+            "E   Note: run main first, config.get() returned None"
+        ),
+    }]
+
+    names = failure_names(failures[0]["traceback"])
+    if "add" in names and not names & {"main", "run", "get", "len"}:
+        print("✅ Names taken from frames and direct call sites only")
+    else:
+        print(f"❌ Failure names: {sorted(names)}")
+
+    implicated = implicated_files(list(code_files), "", code_files=code_files, tests_failed=True, failures=failures)
+    if implicated == {"calc.py"}:
+        print("✅ Only the file defining the called function is implicated")
+    else:
+        print(f"❌ Implicated: {sorted(implicated)}")
+
+    frame = [{"nodeid": "t.py::test_x", "exc_type": "KeyError", "message": "'k'",
+              "traceback": 'File "/tmp/sandbox/store_helpers.py", line 2, in lookup\nE   KeyError: \'k\''}]
+    helpers = {"helpers.py": "def lookup(d):\n    return d['k']\n", "cli.py": code_files["cli.py"]}
+    if implicated_files(list(helpers), "", code_files=helpers, tests_failed=True, failures=frame) == {"helpers.py"}:
+        print("✅ Function named in a traceback frame implicates its file")
+    else:
+        print("❌ Traceback frame not matched")
+
+except ImportError as e:
+    print(f"❌ Cannot import file status: {e}")
+except Exception as e:
+    print(f"❌ Error testing file status: {e}")
@@ -0,0 +1,58 @@
+"""Test the indexed issue store."""
+import json
+
+try:
+    from src.utils.issue_store import IssueStore, issue_store_from_state
+
+    report = json.dumps({
+        "score_qualite": 6,
+        "problemes": [
+            {"fichier": "calc.py", "ligne": 3, "type": "bug", "severite": "critique", "description": "Division par zéro"},
+            {"fichier": "pkg/utils.py", "ligne": 1, "type": "naming", "severite": "mineur", "description": "Nom 'fn'"},
+            {"fichier": "pkg/utils.py", "ligne": 5, "type": "documentation", "severite": "mineur", "description": "Pas de docstring"},
+        ],
+        "resume": "test"
+    })
+    store = IssueStore.from_audit_report(report, ["src/calc.py", "pkg/utils.py"])
+
+    if [i.ligne for i in store.for_file("src/calc.py")] == [3] and len(store.for_file("pkg/utils.py")) == 2:
+        print("✅ Issues indexed by (resolved) file")
+    else:
+        print(f"❌ Wrong per-file index: {store.files()}")
+
+    if len(store.by_type("bug")) == 1 and len(store.by_severity("mineur")) == 2:
+        print("✅ Type and severity indexes")
+    else:
+        print("❌ Wrong type/severity indexes")
+
+    if store.summary().splitlines()[0].startswith("src/calc.py:3 [bug/critique]"):
+        print("✅ Summary lists critical issues first")
+    else:
+        print("❌ Summary ordering")
+
+    restored = issue_store_from_state({"issue_store": json.loads(json.dumps(store.to_dict()))})
+    if restored is not None and list(restored) == list(store):
+        print("✅ Round-trip through checkpoint JSON")
+    else:
+        print("❌ Serialization round-trip failed")
+
+    # Correspondance sur des composants entiers : "src/data.py" n'est pas "a.py"
+    collisions = IssueStore(known_files=["a.py", "data.py", "pkg/data.py"])
+    resolved = [
+        collisions.add({"fichier": f, "ligne": 1, "type": "bug", "severite": "mineur", "description": "x"}).fichier
+        for f in ("src/data.py", "/tmp/sandbox/pkg/data.py", ".\\a.py", "metadata.py")
+    ]
+    if resolved == ["data.py", "pkg/data.py", "a.py", "metadata.py"]:
+        print("✅ Paths resolved on whole components, longest match first")
+    else:
+        print(f"❌ Path resolution: {resolved}")
+
+    if IssueStore.from_audit_report("pas du JSON") is None:
+        print("✅ Invalid report yields no store")
+    else:
+        print("❌ Invalid report should yield None")
+
+except ImportError as e:
+    print(f"❌ Cannot import issue store: {e}")
+except Exception as e:
+    print(f"❌ Error testing issue store: {e}")
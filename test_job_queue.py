@@ -0,0 +1,93 @@
+"""Test the SQLite job queue (leases, retries, fan-in, concurrent workers)."""
+import multiprocessing
+import os
+import tempfile
+import time
+
+
+def _drain(db_path, owner, out):
+    from src.utils.job_queue import JobQueue
+    queue = JobQueue(db_path=db_path)
+    taken = []
+    while True:
+        job = queue.lease(owner)
+        if job is None:
+            break
+        taken.append(job["id"])
+        queue.complete(job["id"], owner, {"by": owner})
+    out.put(taken)
+
+
+try:
+    from src.utils.job_queue import JobQueue
+
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = JobQueue(db_path=os.path.join(tmp, "jobs.db"), lease_seconds=60, max_attempts=2, retry_delay=0.05)
+
+        first = queue.submit("auditor", {"target_dir": "a"}, run_id="r1", dedup_key="r1:auditor")
+        again = queue.submit("auditor", {"target_dir": "a"}, run_id="r1", dedup_key="r1:auditor")
+        print("✅ Dedup key" if first and again is None else f"❌ Dedup failed: {first}, {again}")
+
+        # Fan-out / fan-in : "fixer" attend la fin des "fix_file" de la même exécution
+        queue.submit_many(
+            [{"kind": "fix_file", "run_id": "r2", "payload": {"filepath": f}, "priority": 1} for f in ("a.py", "b.py")]
+            + [{"kind": "fixer", "run_id": "r2", "wait_for": "fix_file", "priority": 1}]
+        )
+        leased = [queue.lease("w1"), queue.lease("w1")]
+        blocked = queue.lease("w1", kinds=["fixer"])
+        if [j["kind"] for j in leased] == ["fix_file", "fix_file"] and blocked is None:
+            print("✅ Priority order and fan-in blocked while files are open")
+        else:
+            print(f"❌ Unexpected leases: {leased}, {blocked}")
+        for job in leased:
+            queue.complete(job["id"], "w1", {"fixed": True})
+        fixer = queue.lease("w1", kinds=["fixer"])
+        print("✅ Fan-in job released" if fixer and fixer["kind"] == "fixer" else f"❌ Fixer not released: {fixer}")
+        queue.complete(fixer["id"], "w1")
+
+        # Reprise avec délai, puis échec définitif
+        job = queue.lease("w1")
+        statuses = [queue.fail(job["id"], "w1", "boom")]
+        immediate = queue.lease("w1")
+        time.sleep(0.1)
+        retried = queue.lease("w1")
+        statuses.append(queue.fail(retried["id"], "w1", "boom again"))
+        results = queue.results("r1")
+        if (
+            statuses == ["pending", "failed"] and immediate is None and retried["attempts"] == 2
+            and results and not results[-1]["success"] and results[-1]["result"]["error"] == "boom again"
+        ):
+            print("✅ Retry after backoff, then final failure recorded")
+        else:
+            print(f"❌ Retry handling: {statuses}, {immediate}, {retried}, {results}")
+
+        # Bail expiré : la tâche est reprise par un autre worker
+        short = JobQueue(db_path=queue.db_path, lease_seconds=0.05)
+        job_id = short.submit("judge", run_id="r3")
+        short.lease("dead-worker")
+        time.sleep(0.1)
+        stolen = short.lease("w2")
+        lost = short.complete(job_id, "dead-worker", {})
+        if stolen and stolen["id"] == job_id and not lost and short.complete(job_id, "w2", {"ok": 1}):
+            print("✅ Expired lease reclaimed, stale owner rejected")
+        else:
+            print(f"❌ Lease expiry: {stolen}, {lost}")
+
+        # Plusieurs processus : chaque tâche prise exactement une fois
+        ids = queue.submit_many([{"kind": "fix_file", "run_id": "r4", "payload": {"n": n}} for n in range(60)])
+        out = multiprocessing.Queue()
+        workers = [multiprocessing.Process(target=_drain, args=(queue.db_path, f"p{i}", out)) for i in range(4)]
+        for worker in workers:
+            worker.start()
+        taken = [job_id for _ in workers for job_id in out.get(timeout=60)]
+        for worker in workers:
+            worker.join()
+        if sorted(taken) == sorted(ids) and queue.stats("r4") == {"fix_file": {"done": 60}}:
+            print("✅ 4 workers drained 60 jobs without double lease")
+        else:
+            print(f"❌ Concurrent leasing: {len(taken)} taken, stats {queue.stats('r4')}")
+
+except ImportError as e:
+    print(f"❌ Cannot import job queue: {e}")
+except Exception as e:
+    print(f"❌ Error testing job queue: {e}")
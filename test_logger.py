@@ -0,0 +1,109 @@
+"""Test the append-only experiment logger and its JSON exporter."""
+import json
+import os
+import tempfile
+import threading
+
+try:
+    from src.utils import logger
+    from src.utils.logger import log_experiment, export_experiment_data, flush_logs, ActionType
+
+    with tempfile.TemporaryDirectory() as tmp:
+        jsonl_path = os.path.join(tmp, "experiment_data.jsonl")
+        json_path = os.path.join(tmp, "experiment_data.json")
+
+        # Rediriger le writer vers le dossier temporaire
+        original_path = logger._writer.path
+        logger._writer.path = jsonl_path
+        try:
+            with open(json_path, 'w', encoding='utf-8') as f:
+                json.dump([{"id": "legacy-entry", "agent": "Auditor"}], f)
+
+            for i in range(5):
+                log_experiment(
+                    agent_name="Tester",
+                    model_used="MOCK-DEV",
+                    action=ActionType.ANALYSIS,
+                    details={"input_prompt": f"prompt {i}", "output_response": "ok"},
+                    status="SUCCESS"
+                )
+            flush_logs()
+
+            with open(jsonl_path, 'r', encoding='utf-8') as f:
+                lines = [line for line in f if line.strip()]
+            if len(lines) == 5:
+                print("✅ JSONL writer flushed 5 entries")
+            else:
+                print(f"❌ JSONL writer wrote {len(lines)} entries (expected 5)")
+
+            added = export_experiment_data(jsonl_path=jsonl_path, json_path=json_path)
+            with open(json_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+
+            if added == 5 and len(data) == 6 and data[0]["id"] == "legacy-entry":
+                print("✅ Exporter merged entries into the list-shaped file")
+            else:
+                print(f"❌ Exporter produced {len(data)} entries (added={added})")
+
+            if not os.path.exists(jsonl_path) and export_experiment_data(jsonl_path, json_path) == 0:
+                print("✅ Exporter is idempotent")
+            else:
+                print("❌ Exporter left pending entries behind")
+
+            # Export interrompu (crash) : le fichier .exporting restant est repris
+            with open(f"{jsonl_path}.999999.exporting", 'w', encoding='utf-8') as f:
+                f.write(json.dumps({"id": "orphan-entry", "agent": "Fixer"}) + "\n")
+            recovered = export_experiment_data(jsonl_path, json_path)
+            with open(json_path, 'r', encoding='utf-8') as f:
+                ids = [entry["id"] for entry in json.load(f)]
+            if recovered == 1 and "orphan-entry" in ids and not os.path.exists(f"{jsonl_path}.999999.exporting"):
+                print("✅ Leftover .exporting file from a crashed export merged")
+            else:
+                print(f"❌ Leftover export not recovered ({recovered} added)")
+
+            # Exports concurrents : ni exception ni entrée perdue
+            for i in range(20):
+                log_experiment("Tester", "MOCK-DEV", ActionType.ANALYSIS, {"input_prompt": f"c{i}", "output_response": "ok"}, "SUCCESS")
+            flush_logs()
+            counts, errors = [], []
+
+            def concurrent_export():
+                try:
+                    counts.append(export_experiment_data(jsonl_path, json_path))
+                except Exception as e:
+                    errors.append(e)
+
+            exporters = [threading.Thread(target=concurrent_export) for _ in range(4)]
+            for exporter in exporters:
+                exporter.start()
+            for exporter in exporters:
+                exporter.join()
+            with open(json_path, 'r', encoding='utf-8') as f:
+                total = len(json.load(f))
+            if not errors and sum(counts) == 20 and total == 27:
+                print("✅ Concurrent exports serialized without losing entries")
+            else:
+                print(f"❌ Concurrent exports: {counts}, {errors}, {total} entries")
+
+            # Valeurs non sérialisables : le thread d'écriture doit survivre
+            circular = {}
+            circular["self"] = circular
+            for details in ({"input_prompt": "p", "output_response": object()}, {"input_prompt": "p", "output_response": circular}):
+                log_experiment("Tester", "MOCK-DEV", ActionType.ANALYSIS, details, "SUCCESS")
+            log_experiment("Tester", "MOCK-DEV", ActionType.ANALYSIS, {"input_prompt": "p", "output_response": "ok"}, "SUCCESS")
+            flusher = threading.Thread(target=flush_logs, daemon=True)
+            flusher.start()
+            flusher.join(timeout=10)
+            with open(jsonl_path, 'r', encoding='utf-8') as f:
+                lines = [line for line in f if line.strip()]
+            if not flusher.is_alive() and len(lines) == 2 and logger._writer._thread.is_alive():
+                print("✅ Unserializable entries do not kill the writer thread")
+            else:
+                print(f"❌ Writer after unserializable entry: flush hung={flusher.is_alive()}, {len(lines)} lines")
+        finally:
+            logger._writer.path = original_path
+
+except ImportError as e:
+    print(f"❌ Cannot import logger: {e}")
+except Exception as e:
+    print(f"❌ Error testing logger: {e}")
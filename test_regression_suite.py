@@ -0,0 +1,58 @@
+"""Test the persistent regression suite of generated tests."""
+import os
+import tempfile
+
+try:
+    from src.utils.regression_suite import RegressionSuite
+    from src.utils.result_cache import ResultCache
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ResultCache(db_path=os.path.join(tmp, "cache.db"), bypass=False)
+        code = {"calc.py": "def add(a, b):\n    return a + b\n"}
+        tests = (
+            "from calc import add\n\n"
+            "def test_add():\n    assert add(1, 2) == 3\n\n"
+            "def test_add_zero():\n    assert add(0, 0) == 0\n"
+        )
+
+        suite = RegressionSuite(code, "/project", cache=cache)
+        suite.add_generated(tests)
+        suite.record_results({"t.py::test_add": "passed", "t.py::test_add_zero": "passed"})
+        if RegressionSuite(code, "/project", cache=cache).reused == 2 and RegressionSuite(code, "/other", cache=cache).reused == 0:
+            print("✅ Passing tests reused, cache scoped per target")
+        else:
+            print("❌ Reuse / target scoping")
+
+        # Corps modifié, test_add échoue : conservé, signalé, définition à recouvrir
+        changed = {"calc.py": "def add(a, b):\n    return a - b\n"}
+        suite = RegressionSuite(changed, "/project", cache=cache)
+        suite.record_results({"t.py::test_add": "failed", "t.py::test_add_zero": "passed"})
+        again = RegressionSuite(changed, "/project", cache=cache)
+        if suite.regressions == ["test_add"] and again.reused == 2 and again.stale_targets() == ["calc.add"]:
+            print("✅ Failing cached test kept as regression, definition stale again")
+        else:
+            print(f"❌ Regression handling: {suite.regressions}, {again.reused}, {again.stale_targets()}")
+
+        # Second échec contre un corps modifié : le test est retiré
+        again.record_results({"t.py::test_add": "failed", "t.py::test_add_zero": "passed"})
+        final = RegressionSuite(changed, "/project", cache=cache)
+        if again.evicted == ["test_add"] and sorted(u["name"] for u in final.units.values()) == ["test_add_zero"]:
+            print("✅ Repeatedly failing test evicted")
+        else:
+            print(f"❌ Eviction: {again.evicted}, {[u['name'] for u in final.units.values()]}")
+
+        # Homonymes de modules différents : renommés dans le fichier rendu
+        two = {"a.py": "def run():\n    return 1\n", "b.py": "def run():\n    return 2\n"}
+        suite = RegressionSuite(two, "/two", cache=cache)
+        suite.add_generated("from a import run\n\ndef test_run():\n    assert run() == 1\n")
+        suite.add_generated("from b import run\n\ndef test_run():\n    assert run() == 2\n")
+        names = sorted(u["name"] for u in suite.units.values())
+        if len(names) == 2 and names[0] == "test_run" and "def test_run_b(" in suite.render():
+            print("✅ Same-named tests of different modules do not collide")
+        else:
+            print(f"❌ Homonyms: {names}")
+
+except ImportError as e:
+    print(f"❌ Cannot import regression suite: {e}")
+except Exception as e:
+    print(f"❌ Error testing regression suite: {e}")
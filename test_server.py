@@ -0,0 +1,125 @@
+"""Test the server-mode HTTP API (submit, status, results) over TCP and a Unix socket."""
+import http.client
+import json
+import os
+import socket
+import tempfile
+import threading
+
+_results = None
+_lint_target = None
+
+
+def _lint_once():
+    """Supervised worker: one lint call through the persistent lint server."""
+    from src.tools.lint_server import LintServer
+    server = LintServer(timeout=60)
+    _results.put(server.lint([_lint_target]))
+    server.stop()
+
+
+def _lint_in_daemon(out, target):
+    from src.tools.lint_server import LintServer
+    out.put(LintServer(timeout=60).lint([target]))
+
+
+try:
+    from src.utils.checkpoint import CheckpointStore
+    from src.utils.job_queue import JobQueue
+    from src.utils.server import SwarmAPI, WorkerSupervisor, make_server
+
+    def request(conn, method, path, body=None):
+        conn.request(method, path, body=json.dumps(body) if body is not None else None,
+                     headers={"Content-Type": "application/json"})
+        response = conn.getresponse()
+        return response.status, json.loads(response.read())
+
+    class UnixConnection(http.client.HTTPConnection):
+        def __init__(self, path):
+            super().__init__("localhost")
+            self.unix_path = path
+
+        def connect(self):
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.sock.connect(self.unix_path)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = JobQueue(db_path=os.path.join(tmp, "jobs.db"))
+        store = CheckpointStore(db_path=os.path.join(tmp, "checkpoints.db"))
+
+        def submit(body):
+            run_id = store.new_run(body["target_dir"])
+            queue.submit("auditor", {"target_dir": body["target_dir"]}, run_id=run_id)
+            return run_id
+
+        api = SwarmAPI(queue, store, submit)
+        server = make_server(api, "127.0.0.1", 0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        conn = http.client.HTTPConnection("127.0.0.1", server.server_address[1], timeout=10)
+
+        code, created = request(conn, "POST", "/runs", {"target_dir": tmp})
+        run_id = created.get("run_id")
+        code_status, status = request(conn, "GET", f"/runs/{run_id}")
+        if code == 202 and code_status == 200 and status["jobs"] == {"auditor": {"pending": 1}}:
+            print("✅ POST /runs queues an audit job, GET /runs/<id> reports it")
+        else:
+            print(f"❌ Submit/status: {code} {created}, {code_status} {status}")
+
+        job = queue.lease("w1")
+        queue.complete(job["id"], "w1", {"files": 3})
+        store.save(run_id, "judge", {"status": "success", "iteration_count": 2, "pylint_score_after": 9.1})
+        code, results = request(conn, "GET", f"/runs/{run_id}/results")
+        if code == 200 and results["jobs"][0]["result"] == {"files": 3} and results["summary"]["score_after"] == 9.1:
+            print("✅ GET /runs/<id>/results returns job results and final state")
+        else:
+            print(f"❌ Results: {code} {results}")
+
+        errors = [
+            request(conn, "POST", "/runs", {"target_dir": os.path.join(tmp, "missing")})[0],
+            request(conn, "GET", "/runs/abc123")[0],
+            request(conn, "GET", "/nope")[0],
+        ]
+        print("✅ 400/404 on bad input" if errors == [400, 404, 404] else f"❌ Error codes: {errors}")
+        server.shutdown()
+        server.server_close()
+
+        socket_path = os.path.join(tmp, "swarm.sock")
+        unix_server = make_server(api, unix_socket=socket_path)
+        threading.Thread(target=unix_server.serve_forever, daemon=True).start()
+        code, health = request(UnixConnection(socket_path), "GET", "/health")
+        if code == 200 and health["jobs"] == {"done": 1}:
+            print("✅ Unix socket transport")
+        else:
+            print(f"❌ Unix socket: {code} {health}")
+        unix_server.shutdown()
+        unix_server.server_close()
+
+        # Les workers supervisés peuvent lancer le serveur de lint (processus enfant)
+        import multiprocessing
+        _lint_target = os.path.join(tmp, "sample.py")
+        with open(_lint_target, "w") as f:
+            f.write("x = 1\n")
+        _results = multiprocessing.Queue()
+        supervisor = WorkerSupervisor(_lint_once, 1, interval=60)
+        supervisor.start()
+        response = _results.get(timeout=60)
+        supervisor.stop()
+        if "Lint server" not in str(response.get("error", "")):
+            print("✅ Lint server starts inside a supervised worker")
+        else:
+            print(f"❌ Lint in worker: {response}")
+
+        out = multiprocessing.Queue()
+        daemon = multiprocessing.Process(target=_lint_in_daemon, args=(out, _lint_target), daemon=True)
+        daemon.start()
+        response = out.get(timeout=60)
+        daemon.join()
+        if not response["success"] and "cannot start" in response["error"]:
+            print("✅ Lint server reports failure in a daemonic process (caller falls back)")
+        else:
+            print(f"❌ Daemonic fallback: {response}")
+
+except ImportError as e:
+    print(f"❌ Cannot import server modules: {e}")
+except Exception as e:
+    print(f"❌ Error testing server: {e}")
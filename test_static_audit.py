@@ -0,0 +1,41 @@
+"""Test the static pre-audit engine on the internal datasets."""
+import os
+
+try:
+    from src.tools.static_audit import static_audit_file
+
+    dataset = os.path.join("test_datasets", "internal")
+
+    def audit(name):
+        with open(os.path.join(dataset, name), "r", encoding="utf-8") as f:
+            return static_audit_file(name, f.read())
+
+    result = audit("case5_syntax.py")
+    if result["problemes"] and result["problemes"][0]["type"] == "bug" and "SyntaxError" in result["problemes"][0]["description"]:
+        print("✅ Syntax error reported as critical bug")
+    else:
+        print("❌ Syntax error not detected")
+
+    result = audit("case3_naming.py")
+    types = {p["type"] for p in result["problemes"]}
+    if {"naming", "documentation"} <= types and not result["needs_llm"]:
+        print("✅ Naming/docstring issues found without the LLM")
+    else:
+        print(f"❌ Unexpected naming audit: {types}, needs_llm={result['needs_llm']}")
+
+    result = audit("case2_bugs.py")
+    if result["needs_llm"] and result["reasons"]:
+        print(f"✅ Risky constructs sent to the LLM: {result['reasons']}")
+    else:
+        print("❌ Division/indexing should require the LLM")
+
+    result = static_audit_file("x.py", "def run():\n    return undefined_thing + 1\n")
+    if any("undefined_thing" in p["description"] and p["severite"] == "critique" for p in result["problemes"]):
+        print("✅ Undefined name detected")
+    else:
+        print("❌ Undefined name missed")
+
+except ImportError as e:
+    print(f"❌ Cannot import static audit engine: {e}")
+except Exception as e:
+    print(f"❌ Error testing static audit engine: {e}")
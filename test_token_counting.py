@@ -0,0 +1,109 @@
+"""Test memoized token counting and the calibrated token estimator."""
+import os
+import tempfile
+
+_tmp = tempfile.TemporaryDirectory()
+os.environ.setdefault("TOKEN_CALIBRATION_FILE", os.path.join(_tmp.name, "token_calibration.json"))
+
+
+class CountingEncoder:
+    """Stand-in tokenizer (one token per word) that records its calls."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def encode(self, text):
+        self.calls += 1
+        return text.split()
+
+    def encode_batch(self, texts):
+        self.calls += 1
+        return [text.split() for text in texts]
+
+
+try:
+    from src.utils.token_estimator import TokenEstimator
+    from src.prompts.prompt_optimizer import PromptOptimizer
+
+    path = os.path.join(_tmp.name, "calibration.json")
+    estimator = TokenEstimator(path=path)
+    before = estimator.estimate("x" * 300)
+    estimator.observe(3000, 750)   # 4 caractères par token
+    estimator.observe(10, 10)      # trop court : ignoré
+    unsaved = os.path.exists(path)
+    estimator.flush()
+    reloaded = TokenEstimator(path=path)
+    if (
+        before == 100 and estimator.estimate("x" * 300) == 75 and not unsaved
+        and reloaded.get_stats() == {"chars_per_token": 4.0, "samples": 1}
+    ):
+        print("✅ Estimator calibrated from reported usage, persisted on flush")
+    else:
+        print(f"❌ Calibration: {before}, {estimator.get_stats()}, {reloaded.get_stats()}, saved early={unsaved}")
+
+    # Deux processus sur le même fichier : les mesures sont fusionnées, pas écrasées
+    other = TokenEstimator(path=path)
+    reloaded.observe(2000, 1000)   # 2 caractères par token
+    other.observe(3000, 500)       # 6 caractères par token
+    reloaded.flush()
+    other.flush()
+    merged = TokenEstimator(path=path).get_stats()
+    if merged["samples"] == 3 and 2.0 < merged["chars_per_token"] < 6.0:
+        print("✅ Concurrent calibrations merged on save")
+    else:
+        print(f"❌ Merge on save: {merged}")
+
+    # La troncature utilise le même ratio calibré que l'estimation
+    from src.utils import llm_helper
+    original_estimator = llm_helper.token_estimator
+    calibrated = TokenEstimator(path=None)
+    calibrated.observe(4000, 1000)  # 4 caractères par token
+    llm_helper.token_estimator = calibrated
+    try:
+        kept = llm_helper.truncate_for_context("z" * 10000, max_tokens=500).split("\n\n... [Tronqué")[0]
+        ratio = calibrated.chars_per_token
+    finally:
+        llm_helper.token_estimator = original_estimator
+    if len(kept) == 2000 and ratio == 4.0:
+        print(f"✅ Truncation budget follows the calibrated ratio ({ratio:.2f} chars/token)")
+    else:
+        print(f"❌ Truncation kept {len(kept)} chars for ratio {ratio:.2f}")
+
+    optimizer = PromptOptimizer(cache_size=3)
+    optimizer._encoder = encoder = CountingEncoder()
+    first = optimizer.compter_tokens("def f(x): return x")
+    again = optimizer.compter_tokens("def f(x): return x")
+    if first == again == 4 and encoder.calls == 1:
+        print("✅ Counts memoized by text hash")
+    else:
+        print(f"❌ Memoization: {first}, {again}, {encoder.calls} encode calls")
+
+    encoder.calls = 0
+    counts = optimizer.compter_tokens_batch(["a b", "def f(x): return x", "a b", "c d e"])
+    if counts == [2, 4, 2, 3] and encoder.calls == 1:
+        print("✅ Batch API encodes only the uncached texts, in one call")
+    else:
+        print(f"❌ Batch counts: {counts}, {encoder.calls} encode calls")
+
+    system_prompt = "Tu es un auditeur de code Python. " * 20
+    encoder.calls = 0
+    for _ in range(5):
+        optimizer.analyser_prompt(system_prompt, f"user {_}")
+    if encoder.calls == 6 and len(optimizer._counts) == 3:
+        print("✅ System prompt counted once, LRU bounded")
+    else:
+        print(f"❌ System prompt caching: {encoder.calls} encode calls, {len(optimizer._counts)} cached")
+
+    offline = PromptOptimizer()
+    offline._encoder = False  # vocabulaire tiktoken indisponible
+    if offline.encoder is None and offline.compter_tokens("y" * 90) > 0:
+        print(f"✅ Offline fallback: {offline.compter_tokens('y' * 90)} estimated tokens for 90 chars")
+    else:
+        print("❌ Offline fallback failed")
+
+except ImportError as e:
+    print(f"❌ Cannot import token counting modules: {e}")
+except Exception as e:
+    print(f"❌ Error testing token counting: {e}")
+finally:
+    _tmp.cleanup()
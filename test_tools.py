@@ -55,5 +55,52 @@ if content is None:
 else:
     print("❌ SECURITY BREACH!")
 
+# Test 6: Structured pytest results
+print("\n[TEST 6] Structured pytest results...")
+import os
+import tempfile
+from src.tools.test_tools import run_pytest, compact_test_results, summarize_test_results
+
+with tempfile.TemporaryDirectory() as tmp:
+    test_path = os.path.join(tmp, "test_structured.py")
+    with open(test_path, "w", encoding="utf-8") as f:
+        f.write("def test_ok():\n    assert 1 + 1 == 2\n\n\ndef test_ko():\n    raise KeyError('x')\n")
+    result = run_pytest(test_path)
+    compact = compact_test_results(result)
+    failure = compact["failures"][0] if compact["failures"] else {}
+    if (
+        result["passed_tests"] == 1 and result["failed_tests"] == 1
+        and failure.get("nodeid") == "test_structured.py::test_ko"
+        and failure.get("exc_type") == "KeyError" and failure.get("line") == 6
+    ):
+        print("✅ Per-test records: nodeid, exception type and failing line")
+        print("   " + summarize_test_results(compact, max_tracebacks=0).replace("\n", "\n   "))
+    else:
+        print(f"❌ Unexpected results: {compact}")
+
+    # Test 7: Same run in a fork of the warm pytest pool
+    print("\n[TEST 7] Warm pytest pool...")
+    from src.tools.pytest_pool import fork_available, get_pytest_pool
+    if fork_available():
+        pooled = run_pytest(test_path, use_pool=True)
+        same = compact_test_results(pooled)["outcomes"] == compact["outcomes"]
+        print(f"{'✅' if same else '❌'} Pool run: {pooled['passed_tests']}/{pooled['total_tests']} "
+              f"passed in {pooled['execution_time']}s (subprocess: {result['execution_time']}s)")
+        get_pytest_pool().stop()
+    else:
+        print("⚠️  os.fork unavailable: subprocess fallback only")
+
+    # Test 8: Sharded run with a per-test timeout
+    print("\n[TEST 8] Sharded run with per-test timeout...")
+    slow_path = os.path.join(tmp, "test_sharded.py")
+    with open(slow_path, "w", encoding="utf-8") as f:
+        f.write("import time\n\n\ndef test_fast():\n    pass\n\n\ndef test_hang():\n    time.sleep(60)\n")
+    sharded = run_pytest(slow_path, workers=2, test_timeout=1)
+    hang = [t for t in sharded["tests"] if t["nodeid"].endswith("::test_hang")]
+    if sharded["shards"] == 2 and sharded["passed_tests"] == 1 and hang and "Timeout" in (hang[0]["message"] or ""):
+        print(f"✅ 2 shards merged, hanging test failed alone in {sharded['execution_time']}s")
+    else:
+        print(f"❌ Unexpected sharded results: {compact_test_results(sharded)}")
+
 print("\n" + "=" * 70)
 print("✅ All tests complete!")
\ No newline at end of file